@@ -0,0 +1,84 @@
+"""Benchmark the download path of the readers against replayed responses.
+
+The readers start from an empty cache, so every payload goes through ``_download_and_save``. A
+``ReplayAdapter`` serves the responses of a synthetic fixture, with configurable latency, 429/5xx
+rates and connection resets. Reports wall time, downloads per second and the faults the readers
+had to recover from.
+
+Usage::
+
+    python benchmarks/bench_fetch.py --matches 50 --latency 0.05 0.2 --throttle-rate 0.05 --reset-rate 0.01
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "soccerscraper"))
+
+CASES = {"FotMob": "read_games", "Scoresway": "read_events"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leagues", type=int, default=1)
+    parser.add_argument("--seasons", type=int, default=1, help="Seasons per league.")
+    parser.add_argument("--matches", type=int, default=20, help="Matches per season.")
+    parser.add_argument("--events", type=int, default=200, help="Events per event file.")
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.0],
+                        help="Fixed delay, or the bounds of a uniform delay, in seconds.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 5xx responses.")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Fraction of connection resets.")
+    parser.add_argument("--retry-after", type=int, help="Retry-After header of the 429 responses.")
+    parser.add_argument("--sources", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # Keep the logs of the benchmark out of the configured data directory
+        os.environ["SOCCERSCRAPER_DIR"] = str(workdir / "home")
+        from _replay import ReplayAdapter
+        from fixtures import SOURCES, fixture_leagues, synthesize
+        from fotmob import FotMob
+        from scoresway import Scoresway
+
+        fixture = synthesize(workdir / "fixture", args.leagues, args.seasons, args.matches, args.events, args.seed)
+        latency = args.latency[0] if len(args.latency) == 1 else tuple(args.latency[:2])
+        leagues = fixture_leagues(args.leagues)
+
+        print(f"\n{'case':<24}{'downloads':>10}{'wall s':>10}{'dl/s':>10}{'429':>8}{'5xx':>8}{'resets':>8}")
+        for source in args.sources:
+            replay = ReplayAdapter(
+                fixture / "responses" / SOURCES[source],
+                latency=latency,
+                throttle_rate=args.throttle_rate,
+                error_rate=args.error_rate,
+                reset_rate=args.reset_rate,
+                retry_after=args.retry_after,
+                seed=args.seed,
+            )
+            reader_class = {"FotMob": FotMob, "Scoresway": Scoresway}[source]
+            reader = reader_class(leagues=leagues, data_dir=workdir / "data" / source, transport=replay)
+            method = CASES[source]
+            start = time.perf_counter()
+            try:
+                getattr(reader, method)()
+                error = None
+            except Exception as e:
+                error = e
+            wall = time.perf_counter() - start
+            stats = replay.stats()
+            downloads = stats.get("served", 0)
+            print(f"{source + '.' + method:<24}{downloads:>10}{wall:>10.2f}{downloads / wall:>10.1f}"
+                  f"{stats.get('throttled', 0):>8}{stats.get('errors', 0):>8}{stats.get('resets', 0):>8}")
+            if error is not None:
+                print(f"  failed: {error!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare the decode and encode throughput of the installed JSON backends on cached payloads.
+
+Usage::
+
+    python benchmarks/bench_json.py [DIR ...] [--files N] [--repeat N]
+
+Without directories, the cached FotMob match details and Scoresway events in DATA_DIR are used.
+"""
+import sys
+import time
+import random
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "soccerscraper"))
+
+import _codec as codec
+from _cfg import DATA_DIR
+
+
+def sample(directory: Path, n_files: int) -> list[bytes]:
+    files = sorted(p for p in directory.iterdir() if p.is_file())
+    random.Random(0).shuffle(files)
+    return [p.read_bytes() for p in files[:n_files]]
+
+
+def throughput(func, payloads: list, n_bytes: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            func(payload)
+        best = min(best, time.perf_counter() - start)
+    return n_bytes / best / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dirs", nargs="*", type=Path)
+    parser.add_argument("--files", type=int, default=200, help="Number of files sampled per directory.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs is reported.")
+    args = parser.parse_args()
+
+    dirs = args.dirs or [Path(DATA_DIR, "FotMob", "matches"), Path(DATA_DIR, "scoresway", "events")]
+    backends = codec.available_backends()
+    print(f"Selected backend: {codec.BACKEND}")
+    for directory in dirs:
+        if not directory.is_dir():
+            print(f"Skipping {directory}: not a directory")
+            continue
+        raw = sample(directory, args.files)
+        if not raw:
+            print(f"Skipping {directory}: no files")
+            continue
+        n_bytes = sum(len(payload) for payload in raw)
+        decoded = [codec.loads(payload) for payload in raw]
+        print(f"\n{directory} ({len(raw)} files, {n_bytes / 1e6:.1f} MB)")
+        print(f"{'backend':<10}{'decode MB/s':>14}{'encode MB/s':>14}")
+        for name, (loads, dumps) in backends.items():
+            decode = throughput(loads, raw, n_bytes, args.repeat)
+            encode = throughput(dumps, decoded, n_bytes, args.repeat)
+            print(f"{name:<10}{decode:>14.1f}{encode:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark the read_* methods of the readers against offline fixtures.
+
+Every case runs in a fresh process on a copy of the fixture, and reports the wall time of the
+read_* call, the peak RSS of the process and the number of requests served per second. The readers
+cannot reach the network: a request that is not in the fixture fails the case.
+
+Usage::
+
+    python benchmarks/bench_read.py                       # synthetic scales
+    python benchmarks/bench_read.py --scales 1 10         # a subset of the scales
+    python benchmarks/bench_read.py --fixture fixtures/den --leagues DEN-Superliga   # recorded fixture
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "soccerscraper"))
+
+# Leagues, seasons per league, matches per season and events per event file of the synthetic scales
+SCALES = {
+    "1": (1, 1, 20, 200),
+    "10": (2, 5, 20, 200),
+    "100": (10, 10, 20, 200),
+    "events-1k": (2, 5, 100, 200),
+    "events-50k": (10, 10, 500, 200),
+}
+
+# Methods benchmarked at each scale. The event scales only benchmark the event files.
+CASES = {
+    "FotMob": ["read_leagues", "read_seasons", "read_schedule", "read_games"],
+    "Scoresway": ["read_leagues", "read_seasons", "read_matches", "read_events"],
+}
+EVENT_CASES = {"FotMob": ["read_games"], "Scoresway": ["read_events"]}
+
+
+def offline_reader(source: str):
+    """Return a reader class of `source` that counts its requests and never touches the network."""
+    import requests
+    from fotmob import FotMob
+    from scoresway import Scoresway
+
+    base = {"FotMob": FotMob, "Scoresway": Scoresway}[source]
+
+    class OfflineAdapter(requests.adapters.BaseAdapter):
+        def send(self, request, **kwargs):
+            raise requests.ConnectionError(f"{request.url} is not in the fixture")
+
+        def close(self):
+            pass
+
+    class OfflineReader(base):
+        source = base.source or base.__name__
+
+        def __init__(self, *args, **kwargs):
+            self.requests = 0
+            self._requests_lock = threading.Lock()
+            super().__init__(*args, **kwargs)
+
+        def _init_session(self, proxy=None):
+            session = requests.Session()
+            session.mount("http://", OfflineAdapter())
+            session.mount("https://", OfflineAdapter())
+            return session
+
+        def get(self, *args, **kwargs):
+            with self._requests_lock:
+                self.requests += 1
+            return super().get(*args, **kwargs)
+
+    return OfflineReader
+
+
+def run_case(source: str, method: str, data_dir: Path, leagues: list[str]) -> dict:
+    """Run a single case in this process and return its measurements."""
+    reader_class = offline_reader(source)
+    start = time.perf_counter()
+    reader = reader_class(leagues=leagues, data_dir=data_dir)
+    init_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = getattr(reader, method)()
+    wall = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return {
+        "source": source,
+        "method": method,
+        "rows": len(result),
+        "requests": reader.requests,
+        "init_s": round(init_time, 3),
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(reader.requests / wall, 1) if wall > 0 else None,
+        "peak_rss_mb": round(peak_rss / 1e6, 1),
+    }
+
+
+def run_isolated(source: str, method: str, fixture: Path, leagues: list[str], workdir: Path) -> dict:
+    """Run a case in a new process on a fresh copy of the fixture."""
+    data_dir = workdir / "data"
+    shutil.rmtree(data_dir, ignore_errors=True)
+    # copyfile gives the copies a fresh modification time, so that no cached season has expired
+    shutil.copytree(fixture / {"FotMob": "FotMob", "Scoresway": "scoresway"}[source], data_dir,
+                    copy_function=shutil.copyfile)
+    cmd = [sys.executable, __file__, "--run", source, method, str(data_dir), "--leagues", *leagues]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"source": source, "method": method, "error": proc.stderr.strip().splitlines()[-1:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def report(scale: str, results: list[dict]) -> None:
+    print(f"\nScale {scale}")
+    print(f"{'case':<28}{'rows':>10}{'requests':>10}{'wall s':>10}{'req/s':>10}{'peak MB':>10}")
+    for r in results:
+        case = f"{r['source']}.{r['method']}"
+        if "error" in r:
+            print(f"{case:<28} failed: {' '.join(r['error'])}")
+            continue
+        print(f"{case:<28}{r['rows']:>10}{r['requests']:>10}{r['wall_s']:>10.3f}"
+              f"{r['requests_per_s'] or 0:>10.1f}{r['peak_rss_mb']:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["1", "10", "100", "events-1k"])
+    parser.add_argument("--fixture", type=Path, help="Use a recorded fixture instead of the synthetic scales.")
+    parser.add_argument("--leagues", nargs="+", help="Leagues of the recorded fixture.")
+    parser.add_argument("--sources", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--keep", type=Path, help="Keep the generated fixtures in this directory.")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    parser.add_argument("--run", nargs=3, metavar=("SOURCE", "METHOD", "DATA_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        source, method, data_dir = args.run
+        print(json.dumps(run_case(source, method, Path(data_dir), args.leagues)))
+        return
+
+    all_results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # Keep the logs of the benchmark out of the configured data directory
+        os.environ["SOCCERSCRAPER_DIR"] = str(workdir / "home")
+        from fixtures import fixture_leagues, synthesize
+
+        if args.fixture is not None:
+            if not args.leagues:
+                parser.error("--leagues is required with --fixture")
+            scales = {"recorded": (args.fixture, args.leagues, CASES)}
+        else:
+            fixtures_dir = args.keep or workdir / "fixtures"
+            scales = {}
+            for scale in args.scales:
+                n_leagues, n_seasons, n_matches, n_events = SCALES[scale]
+                fixture = fixtures_dir / f"scale-{scale}"
+                if not fixture.exists():
+                    synthesize(fixture, n_leagues, n_seasons, n_matches, n_events)
+                cases = EVENT_CASES if scale.startswith("events") else CASES
+                scales[scale] = (fixture, fixture_leagues(n_leagues), cases)
+
+        for scale, (fixture, leagues, cases) in scales.items():
+            results = [
+                run_isolated(source, method, fixture, leagues, workdir)
+                for source in args.sources for method in cases[source]
+            ]
+            report(scale, results)
+            all_results[scale] = results
+
+    if args.json is not None:
+        with args.json.open("w", encoding="utf8") as fh:
+            json.dump(all_results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""Build offline cache directories for the benchmarks.
+
+A fixture is a data directory laid out exactly like the reader caches, with a ``FotMob`` and a
+``scoresway`` subdirectory. Readers pointed at a fixture answer every request from the cache:
+
+- ``FotMob/allLeagues.json``, ``leagues/{league}.json`` (leagues?id=), ``seasons/{league}_{season}.html``
+  (season JSON) and ``matches/{league}_{season}_{matchId}.html`` (matchDetails)
+- ``scoresway/leagues.json`` (competitions page), ``leagues/{league}.json`` (season selector),
+  ``seasons/{league}_{season}.html`` (JSONP match feed) and ``events/{league}_{date} {match}_{matchId}.html``
+  (JSONP matchevent feed)
+
+Synthetic fixtures also contain the raw HTTP responses in ``responses/{FotMob,scoresway}``, which a
+``_replay.ReplayAdapter`` serves to exercise the download path without the network.
+
+Usage::
+
+    # copy the cached files of some leagues from a real data directory
+    python benchmarks/fixtures.py record ~/soccerdata/data fixtures/den --leagues DEN-Superliga
+    # generate a synthetic fixture of 10 leagues with 10 seasons of 500 matches each
+    python benchmarks/fixtures.py synthesize fixtures/large --leagues 10 --seasons 10 --matches 500
+"""
+import sys
+import html
+import json
+import random
+import shutil
+import argparse
+
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "soccerscraper"))
+
+from _cfg import LEAGUE_DICT
+from _replay import ResponseStore
+from fotmob import FOTMOB_API, COOKIE_SERVER
+from scoresway import SCORESWAY_URL, SCORESWAY_API
+
+SOURCES = {"FotMob": "FotMob", "Scoresway": "scoresway"}
+# Outlet key in the urls of the Opta feeds used by Scoresway
+OPTA_OUTLET = "ft1tiv1inq7v1sk3y9tv12yh5"
+TEAMS = [
+    "Aldbury", "Brookfield", "Castlemere", "Dunmore", "Eastwick", "Fairhaven", "Glenrock", "Highmoor",
+    "Ironbridge", "Kingsford", "Larkhill", "Millbrook", "Northgate", "Oakridge", "Pinewood", "Queensbury",
+    "Ravenhill", "Stonebridge", "Thornbury", "Westmere",
+]
+
+
+def fixture_leagues(n_leagues: Optional[int] = None) -> list[str]:
+    """Return the canonical IDs of the leagues available in both FotMob and Scoresway.
+
+    Leagues with Opta events come first, so that even a single league fixture has event files.
+    """
+    leagues = sorted(
+        (k for k, v in LEAGUE_DICT.items()
+         if "FotMob" in v and "Scoresway" in v and "countryName" in v and "countryCode" in v),
+        key=lambda k: "optaEvents" not in LEAGUE_DICT[k],
+    )
+    if n_leagues is not None and n_leagues > len(leagues):
+        raise ValueError(f"At most {len(leagues)} leagues are available for synthetic fixtures.")
+    return leagues[:n_leagues]
+
+
+def record(src: Path, dst: Path, leagues: list[str]) -> Path:
+    """Copy the cached files of `leagues` from the data directory `src` to the fixture `dst`.
+
+    The copies get a fresh modification time, so that the readers treat them as up to date.
+    """
+    for source, folder in SOURCES.items():
+        src_dir, dst_dir = Path(src, folder), Path(dst, folder)
+        if not src_dir.is_dir():
+            print(f"Skipping {src_dir}: not a directory")
+            continue
+        files = [path for path in src_dir.glob("*.json")]
+        for subdir in ("leagues", "seasons", "matches", "events"):
+            files += [path for league in leagues for path in src_dir.glob(f"{subdir}/{league}[._]*")]
+        for path in files:
+            target = dst_dir / path.relative_to(src_dir)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, target)
+        print(f"Recorded {len(files)} {source} files in {dst_dir}")
+    return Path(dst)
+
+
+def synthesize(
+        dst: Path,
+        n_leagues: int = 1,
+        n_seasons: int = 1,
+        n_matches: int = 10,
+        n_events: int = 200,
+        seed: int = 0,
+) -> Path:
+    """Generate a synthetic fixture with the payload schemas of FotMob and Scoresway.
+
+    Besides the cache files, the raw HTTP responses are written to ``dst/responses/{source}`` as a
+    :class:`_replay.ResponseStore`, to replay the downloads with a :class:`_replay.ReplayAdapter`.
+
+    Parameters
+    ----------
+    dst : Path
+        Fixture directory.
+    n_leagues, n_seasons, n_matches : int
+        Number of leagues, seasons per league and matches per season.
+    n_events : int
+        Number of Opta events per Scoresway event file.
+    seed : int
+        Seed of the random generator. The same arguments always produce the same files.
+    """
+    rng = random.Random(seed)
+    leagues = fixture_leagues(n_leagues)
+    for source, folder in SOURCES.items():
+        store = ResponseStore(Path(dst, "responses", folder))
+        if source == "FotMob":
+            _synthesize_fotmob(Path(dst, folder), store, leagues, n_seasons, n_matches, rng)
+        else:
+            _synthesize_scoresway(Path(dst, folder), store, leagues, n_seasons, n_matches, n_events, rng)
+        store.save()
+    print(f"Synthesized {len(leagues) * n_seasons} seasons with {len(leagues) * n_seasons * n_matches} matches"
+          f" in {dst}")
+    return Path(dst)
+
+
+def _write(path: Path, data) -> bytes:
+    """Write `data` as JSON to the cache file `path` and return the bytes written."""
+    payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(payload)
+    return payload
+
+
+def _slug(name: str) -> str:
+    return name.lower().replace(" ", "-")
+
+
+def _season_id(league: int, year: int) -> str:
+    # Opta tournament calendar ids are alphanumeric. Ending in letters keeps the year regex of
+    # Scoresway._parse_seasons from matching inside the id.
+    return f"tc{league:03d}y{year}" + "abcdefghijklmn"
+
+
+def _seasons(n_seasons: int) -> list[int]:
+    """Return the start years of the most recent `n_seasons` completed seasons."""
+    last = datetime.now(timezone.utc).year - 1
+    return list(range(last - n_seasons + 1, last + 1))
+
+
+def _fixtures(rng: random.Random, year: int, n_matches: int) -> list[tuple[datetime, str, str, int, int]]:
+    """Return the kickoff, home team, away team and score of `n_matches` matches of a season."""
+    kickoff = datetime(year, 8, 1, 15, tzinfo=timezone.utc)
+    matches = []
+    for i in range(n_matches):
+        home, away = rng.sample(TEAMS, 2)
+        matches.append((kickoff + timedelta(days=i // 8, hours=2 * (i % 4)), home, away,
+                        rng.randint(0, 4), rng.randint(0, 4)))
+    return matches
+
+
+def _synthesize_fotmob(
+        root: Path,
+        store: ResponseStore,
+        leagues: list[str],
+        n_seasons: int,
+        n_matches: int,
+        rng: random.Random,
+) -> None:
+    # The FotMob API returns the cached JSON as is
+    store.add(COOKIE_SERVER, b'{"x-mas": "fixture"}')
+    countries = {}
+    match_id = 4000000
+    for i, lkey in enumerate(leagues):
+        info = LEAGUE_DICT[lkey]
+        league_id = 100 + i
+        name = info["FotMob"].split("-", 1)[1]
+        countries.setdefault(info["countryCode"], []).append(
+            {"id": league_id, "name": name, "pageUrl": f"/leagues/{league_id}/overview/{_slug(name)}"}
+        )
+        years = _seasons(n_seasons)
+        store.add(FOTMOB_API + f"leagues?id={league_id}", _write(
+            root / "leagues" / f"{lkey}.json",
+            {"details": {"id": league_id, "name": name},
+             "allAvailableSeasons": [f"{year}/{year + 1}" for year in reversed(years)]},
+        ))
+        for year in years:
+            season = f"{year}-{year + 1}"
+            all_matches = []
+            for rnd, (kickoff, home, away, home_goals, away_goals) in enumerate(_fixtures(rng, year, n_matches)):
+                match_id += 1
+                all_matches.append({
+                    "round": rnd // 8 + 1,
+                    "roundName": rnd // 8 + 1,
+                    "pageUrl": f"/matches/{_slug(home)}-vs-{_slug(away)}/{match_id}",
+                    "id": match_id,
+                    "home": {"name": home, "shortName": home, "id": 8000 + TEAMS.index(home)},
+                    "away": {"name": away, "shortName": away, "id": 8000 + TEAMS.index(away)},
+                    "notStarted": False,
+                    "status": {
+                        "utcTime": kickoff.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                        "finished": True,
+                        "started": True,
+                        "cancelled": False,
+                        "scoreStr": f"{home_goals} - {away_goals}",
+                        "reason": {"short": "FT", "long": "Full-Time"},
+                    },
+                })
+                shots = [
+                    {"id": rng.randrange(10 ** 9), "eventType": rng.choice(["Miss", "AttemptSaved", "Goal"]),
+                     "teamId": 8000 + TEAMS.index(rng.choice([home, away])), "playerName": f"Player {rng.randrange(99)}",
+                     "x": round(rng.uniform(60, 105), 2), "y": round(rng.uniform(0, 68), 2),
+                     "min": rng.randrange(95), "expectedGoals": round(rng.random() / 2, 4)}
+                    for _ in range(rng.randint(15, 35))
+                ]
+                details = {
+                    "general": {"matchId": str(match_id), "leagueId": league_id, "leagueName": name,
+                                "homeTeam": {"name": home}, "awayTeam": {"name": away},
+                                "matchTimeUTCDate": kickoff.strftime("%Y-%m-%dT%H:%M:%S.000Z")},
+                    "header": {"status": {"finished": True, "scoreStr": f"{home_goals} - {away_goals}"}},
+                    "content": {"shotmap": {"shots": shots}},
+                }
+                store.add(FOTMOB_API + f"matchDetails?matchId={match_id}",
+                          _write(root / "matches" / f"{lkey}_{season}_{match_id}.html", details))
+            store.add(FOTMOB_API + f"leagues?id={league_id}&season={year}/{year + 1}",
+                      _write(root / "seasons" / f"{lkey}_{season}.html", {"matches": {"allMatches": all_matches}}))
+
+    store.add(FOTMOB_API + "allLeagues", _write(root / "allLeagues.json", {
+        "international": [{"ccode": "INT", "name": "International", "leagues": []}],
+        "countries": [{"ccode": code, "name": code, "leagues": comps} for code, comps in countries.items()],
+    }))
+
+
+def _synthesize_scoresway(
+        root: Path,
+        store: ResponseStore,
+        leagues: list[str],
+        n_seasons: int,
+        n_matches: int,
+        n_events: int,
+        rng: random.Random,
+) -> None:
+    countries = {}
+    for i, lkey in enumerate(leagues):
+        info = LEAGUE_DICT[lkey]
+        comp_id = f"comp{i:021d}"
+        slug = _slug(info["Scoresway"])
+        countries.setdefault(info["countryName"], []).append(
+            {"id": comp_id, "name": info["Scoresway"], "url": f"/en_GB/soccer/{slug}/{comp_id}/fixtures"}
+        )
+        years = _seasons(n_seasons)
+        links = [f"/en_GB/soccer/{slug}-{year}-{year + 1}/{_season_id(i, year)}/fixtures" for year in years]
+        _write(root / "leagues" / f"{lkey}.json", {"allAvailableSeasons": links})
+        # The season selector of the results page
+        options = "".join(f'<option value="{html.escape(link)}">{link}</option>' for link in links)
+        store.add(SCORESWAY_URL + f"/en_GB/soccer/{slug}/{comp_id}/results",
+                  f'<html><body><div id="seasonlist"><select>{options}</select></div></body></html>'.encode())
+        for year in years:
+            season = f"{year}-{year + 1}"
+            all_matches = []
+            for kickoff, home, away, home_goals, away_goals in _fixtures(rng, year, n_matches):
+                match_id = f"m{rng.getrandbits(96):024x}"
+                date = kickoff.strftime("%Y-%m-%d")
+                description = f"{home} vs {away}"
+                contestants = [
+                    {"id": f"t{TEAMS.index(team):024d}", "name": team, "shortName": team, "officialName": f"{team} FC",
+                     "code": team[:3].upper(), "position": position, "country": {"id": "c1", "name": info["countryName"]}}
+                    for team, position in ((home, "home"), (away, "away"))
+                ]
+                all_matches.append({
+                    "matchInfo": {
+                        "id": match_id, "date": f"{date}Z", "time": kickoff.strftime("%H:%M:%SZ"),
+                        "week": str(len(all_matches) // 8 + 1), "description": description,
+                        "numberOfPeriods": 2, "periodLength": 45,
+                        "sport": {"id": "s1", "name": "Soccer"},
+                        "competition": {"id": comp_id, "name": info["Scoresway"], "competitionFormat": "Domestic league",
+                                        "country": {"id": "c1", "name": info["countryName"]}},
+                        "tournamentCalendar": {"id": _season_id(i, year), "startDate": f"{year}-07-15Z",
+                                               "endDate": f"{year + 1}-05-31Z", "name": season.replace("-", "/")},
+                        "stage": {"id": f"st{year}", "formatId": "f1", "startDate": f"{year}-07-15Z",
+                                  "endDate": f"{year + 1}-05-31Z", "name": "Regular Season"},
+                        "contestant": contestants,
+                        "venue": {"id": f"v{TEAMS.index(home)}", "neutral": "no", "longName": f"{home} Park",
+                                  "shortName": f"{home} Park"},
+                    },
+                    "liveData": {
+                        "matchDetails": {
+                            "periodId": 14, "matchStatus": "Played",
+                            "winner": "home" if home_goals > away_goals else "away" if away_goals > home_goals else "draw",
+                            "matchLengthMin": 94, "matchLengthSec": 12,
+                            "period": [
+                                {"id": p, "start": (kickoff + timedelta(minutes=60 * (p - 1))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                 "end": (kickoff + timedelta(minutes=60 * (p - 1) + 47)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                                 "lengthMin": 47, "lengthSec": 3}
+                                for p in (1, 2)
+                            ],
+                            "scores": {"ht": {"home": home_goals // 2, "away": away_goals // 2},
+                                       "ft": {"home": home_goals, "away": away_goals},
+                                       "total": {"home": home_goals, "away": away_goals}},
+                        },
+                        "matchDetailsExtra": {
+                            "attendance": str(rng.randint(1000, 40000)),
+                            "matchOfficial": [
+                                {"id": f"r{rng.getrandbits(64):016x}", "type": ref_type,
+                                 "firstName": "Alex", "lastName": f"Referee{rng.randrange(50)}"}
+                                for ref_type in ("Main", "Assistant referee 1", "Assistant referee 2", "Fourth official")
+                            ],
+                        },
+                    },
+                })
+                events = [
+                    {"id": rng.getrandbits(31) + 2 ** 31, "eventId": n + 1, "typeId": rng.randint(1, 80),
+                     "periodId": 1 if n < n_events // 2 else 2, "timeMin": 90 * n // max(n_events, 1),
+                     "timeSec": rng.randrange(60), "contestantId": rng.choice(contestants)["id"],
+                     "playerId": f"p{rng.randrange(40):024d}", "playerName": f"Player {rng.randrange(40)}",
+                     "outcome": rng.randint(0, 1), "x": round(rng.uniform(0, 100), 1), "y": round(rng.uniform(0, 100), 1),
+                     "timeStamp": (kickoff + timedelta(seconds=5400 * n // max(n_events, 1))).strftime(
+                         "%Y-%m-%dT%H:%M:%S.000Z"),
+                     "lastModified": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                     "qualifier": [{"id": rng.getrandbits(31), "qualifierId": rng.randint(1, 300), "value": "1"}
+                                   for _ in range(rng.randint(0, 4))]}
+                    for n in range(n_events)
+                ]
+                _write(root / "events" / f"{lkey}_{date} {description}_{match_id}.html", {"allEvents": events})
+                store.add(SCORESWAY_API + f"/matchevent/{OPTA_OUTLET}/{match_id}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets",
+                          json.dumps({"liveData": {"event": events}}).encode(), jsonp=True)
+            _write(root / "seasons" / f"{lkey}_{season}.html", {"allMatches": all_matches})
+            store.add(SCORESWAY_API + f"/match/{OPTA_OUTLET}/?_rt=c&tmcl={_season_id(i, year)}&live=yes&_pgSz=400"
+                                      "&_lcl=en&_fmt=jsonp&sps=widgets",
+                      json.dumps({"match": all_matches}).encode(), jsonp=True)
+
+    competitions = {"continents": [{
+        "id": "e1", "name": "Europe",
+        "countries": [{"id": f"c{i}", "name": country, "comps": comps} for i, (country, comps) in enumerate(countries.items())],
+    }]}
+    _write(root / "leagues.json", competitions)
+    store.add(SCORESWAY_URL + "/en_GB/soccer/competitions",
+              b'<html><body><script type="application/json">' + json.dumps(competitions).encode() + b"</script></body></html>")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build offline cache directories for the benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="Copy cached files from a data directory.")
+    rec.add_argument("src", type=Path, help="Data directory of the readers, e.g. DATA_DIR.")
+    rec.add_argument("dst", type=Path)
+    rec.add_argument("--leagues", nargs="+", required=True)
+    syn = commands.add_parser("synthesize", help="Generate synthetic payloads.")
+    syn.add_argument("dst", type=Path)
+    syn.add_argument("--leagues", type=int, default=1)
+    syn.add_argument("--seasons", type=int, default=1, help="Seasons per league.")
+    syn.add_argument("--matches", type=int, default=10, help="Matches per season.")
+    syn.add_argument("--events", type=int, default=200, help="Events per event file.")
+    syn.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.src, args.dst, args.leagues)
+    else:
+        synthesize(args.dst, args.leagues, args.seasons, args.matches, args.events, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+import os
+import time
+import argparse
+import threading
+
+from pathlib import Path
+from datetime import date, datetime, timedelta, timezone
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Optional, Union
+
+from _fs import connect
+from _cfg import MEMCACHE, LIVEMAXAGE, SHAREDDIR
+from _journal import JOURNAL_FILENAME
+
+
+def _stamp(filepath: Optional[Path]) -> Optional[tuple[int, int]]:
+    """Return the modification time and size of `filepath`, or None if it does not exist."""
+    if filepath is None:
+        return None
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ParsedCache:
+    """In-memory LRU cache of decoded JSON payloads.
+
+    Entries are keyed by cache path (or URL if the data is not stored on disk) and evicted in
+    least-recently-used order once the total size of the raw payloads exceeds `max_bytes`. An entry
+    is dropped when the file it was read from has been modified since.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget in bytes. A budget of 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int, Optional[tuple[int, int]]]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str, filepath: Optional[Path] = None) -> Optional[Any]:
+        """Return the decoded payload stored under `key`, or None if it is missing or outdated."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, size, stamp = entry
+            if stamp != _stamp(filepath):
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: Any, size: int, filepath: Optional[Path] = None) -> None:
+        """Store a decoded payload of `size` raw bytes under `key`."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (data, size, _stamp(filepath))
+            self._size += size
+            while self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        """Remove the entry stored under `key`."""
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def currsize(self) -> int:
+        """Total size in bytes of the raw payloads currently held."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
+# Shared by all readers, so that repeated read_* calls hit the same entries
+PARSED_CACHE = ParsedCache(MEMCACHE)
+
+
+class FreshnessPolicy:
+    """Decide how long cached season and match payloads stay fresh.
+
+    Payloads that can no longer change (finished seasons and matches) are frozen and never
+    downloaded again. All other season payloads expire after `live_max_age`. Subclass and override
+    :meth:`season_is_final`, :meth:`match_is_final` or :meth:`match_is_done` to change the rules.
+
+    Parameters
+    ----------
+    live_max_age : int or timedelta, optional
+        Maximum age of payloads that may still change. An int is interpreted as days.
+    final_statuses : iterable of str, optional
+        Match statuses of completed matches.
+    cancelled_statuses : iterable of str, optional
+        Match statuses of scheduled matches that will not be played.
+    """
+
+    def __init__(
+            self,
+            live_max_age: Optional[Union[int, timedelta]] = LIVEMAXAGE,
+            final_statuses: Iterable[str] = ("FT", "AET", "Pen", "Played"),
+            cancelled_statuses: Iterable[str] = ("PP", "Canc", "Ab", "Postponed", "Cancelled", "Abandoned"),
+    ):
+        self.live_max_age = live_max_age
+        self.final_statuses = set(final_statuses)
+        self.cancelled_statuses = set(cancelled_statuses)
+
+    def match_is_final(self, status: Optional[str]) -> bool:
+        """Return True if a match with `status` is complete."""
+        return status in self.final_statuses
+
+    def match_is_done(self, status: Optional[str]) -> bool:
+        """Return True if a match with `status` is complete or will not be played."""
+        return self.match_is_final(status) or status in self.cancelled_statuses
+
+    def season_is_final(self, end_date: Optional[str] = None, statuses: Iterable[Optional[str]] = ()) -> bool:
+        """Return True if a season has ended or all of its matches are complete or will not be played."""
+        if isinstance(end_date, str) and end_date:
+            if date.fromisoformat(end_date[:10]) < datetime.now(timezone.utc).date():
+                return True
+        statuses = list(statuses)
+        return (
+            any(self.match_is_final(status) for status in statuses)
+            and all(self.match_is_done(status) for status in statuses)
+        )
+
+
+MANIFEST_FILENAME = "manifest.sqlite"
+# Directory of the materialized tables, which are derived from the cache files
+TABLES_DIRNAME = "tables"
+
+_MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    url TEXT,
+    folder TEXT,
+    league TEXT,
+    season TEXT,
+    matchId TEXT,
+    fetched_at REAL,
+    size INTEGER,
+    status TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    frozen INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_folder_league ON entries (folder, league);
+CREATE INDEX IF NOT EXISTS entries_match ON entries (matchId);
+"""
+
+
+def path_fields(relpath: str) -> dict[str, Optional[str]]:
+    """Return the folder, league, season and matchId encoded in a cache path.
+
+    Cache files are named ``leagues/{league}``, ``seasons/{league}_{season}``,
+    ``matches/{league}_{season}_{matchId}`` and ``events/{league}_{date match}_{matchId}``.
+    """
+    folder, _, name = relpath.replace(os.sep, "/").rpartition("/")
+    parts = name.rsplit(".", 1)[0].split("_")
+    fields = {"folder": folder, "league": None, "season": None, "matchId": None}
+    if folder in ("leagues", "seasons", "matches", "events"):
+        fields["league"] = parts[0]
+    if folder in ("seasons", "matches") and len(parts) > 1:
+        fields["season"] = parts[1]
+    if folder in ("matches", "events") and len(parts) > 2:
+        fields["matchId"] = parts[-1]
+    return fields
+
+
+class CacheManifest:
+    """SQLite index of the files in a cache directory.
+
+    Each downloaded file is recorded with its url, league, season, matchId, download time, size,
+    status and HTTP validators (ETag, Last-Modified), so that cache lookups and file discovery do not
+    need to touch the file system and stale files can be revalidated.
+
+    Parameters
+    ----------
+    root : Path
+        Cache directory. The manifest is stored in ``root / MANIFEST_FILENAME``.
+    shared : bool
+        Whether the cache directory is shared by several machines.
+    """
+
+    def __init__(self, root: Path, shared: bool = SHAREDDIR):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_FILENAME
+        self.is_new = not self.path.exists()
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, shared)
+        self._conn.executescript(_MANIFEST_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        for column, definition in (("etag", "TEXT"), ("last_modified", "TEXT"), ("frozen", "INTEGER DEFAULT 0")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE entries ADD COLUMN {column} {definition}")
+
+    def _key(self, filepath: Path) -> str:
+        try:
+            return Path(filepath).relative_to(self.root).as_posix()
+        except ValueError:
+            return str(filepath)
+
+    def lookup(self, filepath: Path) -> Optional[tuple[float, int, str, int]]:
+        """Return the download time, size, status and frozen flag of `filepath`, or None if it is not indexed."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_at, size, status, frozen FROM entries WHERE path = ?", (self._key(filepath),)
+            ).fetchone()
+
+    def record(
+            self,
+            filepath: Path,
+            url: Optional[str] = None,
+            size: int = 0,
+            status: str = "ok",
+            fetched_at: Optional[float] = None,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+    ) -> None:
+        """Add or update the entry of `filepath`.
+
+        The frozen flag of an existing entry is kept, as are its url and validators unless new ones
+        are given.
+        """
+        key = self._key(filepath)
+        fields = path_fields(key)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entries"
+                " (path, url, folder, league, season, matchId, fetched_at, size, status, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (path) DO UPDATE SET"
+                " url = COALESCE(excluded.url, url), fetched_at = excluded.fetched_at, size = excluded.size,"
+                " status = excluded.status, etag = COALESCE(excluded.etag, etag),"
+                " last_modified = COALESCE(excluded.last_modified, last_modified)",
+                (key, url, fields["folder"], fields["league"], fields["season"], fields["matchId"],
+                 time.time() if fetched_at is None else fetched_at, size, status, etag, last_modified),
+            )
+
+    def validators(self, filepath: Path) -> tuple[Optional[str], Optional[str]]:
+        """Return the ETag and Last-Modified header stored for `filepath`."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM entries WHERE path = ? AND status = 'ok'", (self._key(filepath),)
+            ).fetchone()
+        return row if row is not None else (None, None)
+
+    def touch(self, filepath: Path) -> None:
+        """Set the download time of `filepath` to now."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET fetched_at = ? WHERE path = ?", (time.time(), self._key(filepath))
+            )
+
+    def freeze(self, filepath: Path) -> None:
+        """Mark `filepath` as final, so that it never expires."""
+        with self._lock:
+            self._conn.execute("UPDATE entries SET frozen = 1 WHERE path = ?", (self._key(filepath),))
+
+    def is_frozen(self, filepath: Path) -> bool:
+        """Return True if `filepath` has been marked as final."""
+        entry = self.lookup(filepath)
+        return entry is not None and entry[2] == "ok" and bool(entry[3])
+
+    def remove(self, filepath: Path) -> None:
+        """Remove the entry of `filepath`."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE path = ?", (self._key(filepath),))
+
+    def files(self, folder: str, leagues: Optional[Iterable[str]] = None) -> list[str]:
+        """Return the names of the cached files in `folder`, optionally restricted to `leagues`."""
+        query = "SELECT path FROM entries WHERE folder = ? AND status = 'ok'"
+        params: list = [folder]
+        if leagues is not None:
+            leagues = list(leagues)
+            query += f" AND league IN ({', '.join('?' * len(leagues))})"
+            params += leagues
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [path.rpartition("/")[2] for path, in rows]
+
+    def stamps(self, folder: str, leagues: Optional[Iterable[str]] = None) -> dict[str, tuple[float, int]]:
+        """Return the download time and size of the cached files in `folder`, keyed by file name."""
+        query = "SELECT path, fetched_at, size FROM entries WHERE folder = ? AND status = 'ok'"
+        params: list = [folder]
+        if leagues is not None:
+            leagues = list(leagues)
+            query += f" AND league IN ({', '.join('?' * len(leagues))})"
+            params += leagues
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {path.rpartition("/")[2]: (fetched_at, size) for path, fetched_at, size in rows}
+
+    def rebuild(self) -> int:
+        """Re-index all files in the cache directory. Returns the number of indexed files.
+
+        Files that were indexed before keep their url, validators and frozen flag. Entries recorded
+        by other readers while the directory is scanned are left as they are. The materialized tables
+        in the ``tables`` directory are not indexed.
+        """
+        started = time.time()
+        rows = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            # Skip the lock files and the temporary files of unfinished writes
+            dirnames[:] = [dirname for dirname in dirnames if not dirname.startswith(".")]
+            if Path(dirpath) == self.root:
+                dirnames[:] = [dirname for dirname in dirnames if dirname != TABLES_DIRNAME]
+            for filename in filenames:
+                if filename.startswith((MANIFEST_FILENAME, JOURNAL_FILENAME, ".")):
+                    continue
+                filepath = Path(dirpath, filename)
+                try:
+                    stat = filepath.stat()
+                except FileNotFoundError:
+                    continue
+                key = self._key(filepath)
+                fields = path_fields(key)
+                rows.append((key, fields["folder"], fields["league"], fields["season"], fields["matchId"],
+                             stat.st_mtime, stat.st_size, started))
+        found = {row[0] for row in rows}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO entries (path, folder, league, season, matchId, fetched_at, size, status)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, 'ok')"
+                    " ON CONFLICT (path) DO UPDATE SET fetched_at = excluded.fetched_at, size = excluded.size,"
+                    " status = 'ok' WHERE COALESCE(entries.fetched_at, 0) < ?",
+                    rows,
+                )
+                gone = [
+                    (path,) for path, fetched_at in self._conn.execute("SELECT path, fetched_at FROM entries")
+                    if path not in found and (fetched_at or 0) < started
+                ]
+                self._conn.executemany("DELETE FROM entries WHERE path = ?", gone)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the cache manifest of a data directory.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("data_dir", type=Path, help="Cache directory of a reader, e.g. DATA_DIR/FotMob.")
+    args = parser.parse_args()
+    manifest = CacheManifest(args.data_dir)
+    print(f"Indexed {manifest.rebuild()} files in {args.data_dir}")
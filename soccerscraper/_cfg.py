@@ -1,10 +1,12 @@
 import os
 import sys
 import json
+import logging
+import threading
 from pathlib import Path
-
-import logging.config
-from rich.logging import RichHandler
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any
 
 # Configuration
 NOCACHE = os.environ.get("SOCCERSCRAPER_NOCACHE", "False").lower() in ("true", "1", "t")
@@ -20,11 +22,44 @@ MAXAGE = None
 if os.environ.get("SOCCERSCRAPER_MAXAGE") is not None:
     MAXAGE = int(os.environ.get("SOCCERSCRAPER_MAXAGE", 0))
 
-# Create dirs
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+# Maximum age (hours) of cached seasons that are still in progress
+LIVEMAXAGE = timedelta(hours=float(os.environ.get("SOCCERSCRAPER_LIVEMAXAGE", 6)))
+# Seconds between two polls of a match in progress in the live mode
+LIVEPOLL = float(os.environ.get("SOCCERSCRAPER_LIVEPOLL", 15))
+
+# Concurrency
+MAXWORKERS = int(os.environ.get("SOCCERSCRAPER_MAXWORKERS", 8))
+MAXPERHOST = int(os.environ.get("SOCCERSCRAPER_MAXPERHOST", 4))
+# Download attempts per url, and the base and maximum delay (seconds) of the exponential backoff between them
+RETRIES = int(os.environ.get("SOCCERSCRAPER_RETRIES", 5))
+BACKOFF = float(os.environ.get("SOCCERSCRAPER_BACKOFF", 1))
+BACKOFFMAX = float(os.environ.get("SOCCERSCRAPER_BACKOFFMAX", 60))
+# Seconds to wait for a connection to a host and for the response to a request, before retrying
+CONNECTTIMEOUT = float(os.environ.get("SOCCERSCRAPER_CONNECTTIMEOUT", 10))
+READTIMEOUT = float(os.environ.get("SOCCERSCRAPER_READTIMEOUT", 30))
+# Shard of the fetch workload handled by this process, as "index/count" (e.g. "0/4"). Empty for all.
+SHARD = os.environ.get("SOCCERSCRAPER_SHARD", "")
+# The data directory is shared by several machines, e.g. on a network file system. Implied by a shard.
+SHAREDDIR = os.environ.get("SOCCERSCRAPER_SHAREDDIR", "False").lower() in ("true", "1", "t")
+# Runs of a resumable crawl in which an item may fail before it is given up
+CRAWLATTEMPTS = int(os.environ.get("SOCCERSCRAPER_CRAWLATTEMPTS", 3))
+# Initial and maximum request rate (requests per second) of the adaptive rate controller of each host
+RATE = float(os.environ.get("SOCCERSCRAPER_RATE", 2))
+MAXRATE = float(os.environ.get("SOCCERSCRAPER_MAXRATE", 20))
+# Sessions of the pool of a reader whose proxy is "tor" (one Tor circuit each) or a callable
+POOLSIZE = int(os.environ.get("SOCCERSCRAPER_POOLSIZE", 1))
+# Seconds a failing session is taken out of the pool
+QUARANTINE = float(os.environ.get("SOCCERSCRAPER_QUARANTINE", 60))
+# Processes used to parse cached files. 1 parses in the calling process.
+PARSEWORKERS = int(os.environ.get("SOCCERSCRAPER_PARSEWORKERS", 1))
+
+# JSON backend: "auto" (fastest installed of orjson, msgspec, json), "orjson", "msgspec" or "json"
+JSONBACKEND = os.environ.get("SOCCERSCRAPER_JSON", "auto").lower()
 
+# Memory budget (bytes) of decoded payloads kept in memory. 0 disables the in-memory cache.
+MEMCACHE = int(os.environ.get("SOCCERSCRAPER_MEMCACHE", 0))
+# Decoded match payloads kept in memory by each lazy match store (e.g. FotMob.read_games)
+STORECACHE = int(os.environ.get("SOCCERSCRAPER_STORECACHE", 64))
 
 LOGLEVEL = os.environ.get("SOCCERSCRAPER_LOGLEVEL", "INFO").upper()
 
@@ -66,6 +101,7 @@ logging_config = {
             "backupCount": 10,
             "formatter": "detailed",
             "level": logging.INFO,
+            "delay": True,
         },
         "error": {
             "class": "logging.handlers.RotatingFileHandler",
@@ -74,6 +110,7 @@ logging_config = {
             "backupCount": 10,
             "formatter": "detailed",
             "level": logging.ERROR,
+            "delay": True,
         },
     },
     "loggers": {
@@ -84,10 +121,31 @@ logging_config = {
         },
     },
 }
-logging.config.dictConfig(logging_config)
-logging.captureWarnings(True)
 logger = logging.getLogger("root")
-logger.handlers[0] = RichHandler(markup=True)
+
+_setup_lock = threading.Lock()
+_is_setup = False
+
+
+def setup() -> None:
+    """Create the directories and configure the logging of soccerscraper.
+
+    Runs once, when the first reader is created, so that importing the package has no side effects.
+    """
+    global _is_setup
+    with _setup_lock:
+        if _is_setup:
+            return
+        import logging.config
+        from rich.logging import RichHandler
+
+        LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        logging.config.dictConfig(logging_config)
+        logging.captureWarnings(True)
+        logger.handlers[0] = RichHandler(markup=True)
+        _is_setup = True
 
 
 # League dict
@@ -331,11 +389,22 @@ LEAGUE_DICT = {
 }
 
 # Team name replacements
-TEAMNAME_REPLACEMENTS = {}
-_f_custom_teamnname_replacements = CONFIG_DIR / "teamname_replacements.json"
-if _f_custom_teamnname_replacements.is_file():
-    with _f_custom_teamnname_replacements.open(encoding="utf8") as json_file:
-        for team, to_replace_list in json.load(json_file).items():
-            for to_replace in to_replace_list:
-                TEAMNAME_REPLACEMENTS[to_replace] = team
+@lru_cache(maxsize=None)
+def teamname_replacements() -> dict[str, str]:
+    """Return the custom team names in CONFIG_DIR/teamname_replacements.json, read on first use."""
+    replacements = {}
+    _f_custom_teamnname_replacements = CONFIG_DIR / "teamname_replacements.json"
+    if _f_custom_teamnname_replacements.is_file():
+        with _f_custom_teamnname_replacements.open(encoding="utf8") as json_file:
+            for team, to_replace_list in json.load(json_file).items():
+                for to_replace in to_replace_list:
+                    replacements[to_replace] = team
+    return replacements
+
+
 
+def __getattr__(name: str) -> Any:
+    # TEAMNAME_REPLACEMENTS used to be read at import. It is now read on first access.
+    if name == "TEAMNAME_REPLACEMENTS":
+        return teamname_replacements()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
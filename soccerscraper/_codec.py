@@ -0,0 +1,90 @@
+import json
+import importlib
+
+from typing import Any, Callable, IO, Union
+
+from _cfg import JSONBACKEND
+
+Buffer = Union[bytes, bytearray, memoryview, str]
+
+
+def _stdlib_loads(data: Buffer) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+def _orjson() -> tuple[Callable[[Buffer], Any], Callable[[Any], bytes]]:
+    orjson = importlib.import_module("orjson")
+    return orjson.loads, orjson.dumps
+
+
+def _msgspec() -> tuple[Callable[[Buffer], Any], Callable[[Any], bytes]]:
+    msgspec = importlib.import_module("msgspec")
+    return msgspec.json.decode, msgspec.json.encode
+
+
+_BACKENDS = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": lambda: (_stdlib_loads, _stdlib_dumps),
+}
+
+
+def available_backends() -> dict[str, tuple[Callable[[Buffer], Any], Callable[[Any], bytes]]]:
+    """Return the decode and encode functions of all installed JSON backends, fastest first."""
+    backends = {}
+    for name, factory in _BACKENDS.items():
+        try:
+            backends[name] = factory()
+        except ImportError:
+            continue
+    return backends
+
+
+def _select(name: str) -> tuple[str, Callable[[Buffer], Any], Callable[[Any], bytes]]:
+    backends = available_backends()
+    if name != "auto":
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown JSON backend '{name}'. Valid backends are: {', '.join(_BACKENDS)}")
+        if name not in backends:
+            raise ImportError(f"JSON backend '{name}' is not installed.")
+        return name, *backends[name]
+    name = next(iter(backends))
+    return name, *backends[name]
+
+
+BACKEND, _loads, _dumps = _select(JSONBACKEND)
+
+
+def loads(data: Buffer) -> Any:
+    """Decode JSON from bytes, a memoryview or a string.
+
+    Falls back to the standard library if the selected backend rejects the input (e.g. integers
+    that do not fit in 64 bits), so only genuinely invalid JSON raises a ValueError.
+    """
+    try:
+        return _loads(data)
+    except Exception:
+        if _loads is _stdlib_loads:
+            raise
+        return _stdlib_loads(data)
+
+
+def load(fh: IO[bytes]) -> Any:
+    """Decode JSON from a binary file."""
+    return loads(fh.read())
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode `obj` as UTF-8 JSON."""
+    try:
+        return _dumps(obj)
+    except Exception:
+        if _dumps is _stdlib_dumps:
+            raise
+        return _stdlib_dumps(obj)
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from collections.abc import Mapping
+
+from _cfg import logger
+
+# Output modes of the read_* methods. "object" keeps the columns as parsed from the payloads.
+DTYPES = ("object", "compact")
+
+_INT32 = np.iinfo(np.int32)
+
+
+def check_dtypes(dtypes: str) -> None:
+    """Raise a ValueError if `dtypes` is not a valid output mode."""
+    if dtypes not in DTYPES:
+        raise ValueError(f"dtypes must be one of {', '.join(DTYPES)}, not '{dtypes}'")
+
+
+def compact(df: pd.DataFrame, spec: Mapping[str, str], label: str = "dataframe") -> pd.DataFrame:
+    """Convert the columns of `df` to memory efficient dtypes.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to convert. Columns that are not in `spec` or not in `df` are left as they are.
+    spec : Mapping
+        Target of each column: ``"category"`` for repeated strings, ``"int"`` for nullable Int32
+        (Int64 if the values do not fit), ``"float"`` for float32 or a datetime format such as
+        ``"%Y-%m-%d"`` or ``"ISO8601"``. Datetimes are parsed as UTC and values that do not match
+        the format become NaT.
+    label : str
+        Name of the data in the memory report.
+
+    Returns
+    -------
+    pd.DataFrame
+        The converted data. ``df.attrs["memory"]`` holds the memory usage in bytes before and after.
+    """
+    before = df.memory_usage(deep=True).sum()
+    converted = {}
+    for col, kind in spec.items():
+        if col not in df.columns or isinstance(df[col], pd.DataFrame):
+            continue
+        if kind == "category":
+            converted[col] = _to_category(df[col])
+        elif kind == "int":
+            converted[col] = _to_int(df[col])
+        elif kind == "float":
+            converted[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        else:
+            converted[col] = _to_datetime(df[col], kind)
+    df = df.assign(**converted)
+    after = df.memory_usage(deep=True).sum()
+    df.attrs["memory"] = {"before": int(before), "after": int(after)}
+    logger.info(
+        f"Compacted {label}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB"
+        f" ({before / max(after, 1):.1f}x, {(before - after) / 1e6:.1f} MB saved)"
+    )
+    return df
+
+
+def expand(df: pd.DataFrame, date_formats: Mapping[str, str]) -> pd.DataFrame:
+    """Undo :func:`compact` for code that compares and concatenates plain strings.
+
+    Categoricals become object columns and the datetime columns in `date_formats` are formatted back
+    into strings.
+    """
+    converted = {}
+    for col, dtype in df.dtypes.items():
+        # Duplicate columns are left as they are, like in compact()
+        if isinstance(dtype, pd.CategoricalDtype) and not isinstance(df[col], pd.DataFrame):
+            converted[col] = df[col].astype(object)
+    for col, fmt in date_formats.items():
+        if col not in df.columns or isinstance(df[col], pd.DataFrame):
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            converted[col] = df[col].dt.strftime(fmt)
+    return df.assign(**converted) if converted else df
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    # Lists and dicts cannot be categories
+    if series.map(lambda x: isinstance(x, (list, dict))).any():
+        return series
+    return series.astype("category")
+
+
+def _to_int(series: pd.Series) -> pd.Series:
+    values = series.map(lambda x: x.strip() if isinstance(x, str) else x) if series.dtype == object else series
+    numbers = pd.to_numeric(values, errors="coerce")
+    valid = numbers.dropna()
+    if len(valid) < series.notna().sum() or not (valid % 1 == 0).all():
+        # Not an integer column (e.g. alphanumeric IDs)
+        return _to_category(series)
+    if len(valid) == 0 or (valid.min() >= _INT32.min and valid.max() <= _INT32.max):
+        return numbers.astype("Int32")
+    return numbers.astype("Int64")
+
+
+def _to_datetime(series: pd.Series, fmt: str) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.tz_localize("UTC") if series.dt.tz is None else series
+    if fmt != "ISO8601":
+        # Opta dates carry a trailing UTC designator, e.g. "2023-03-31Z"
+        series = series.map(lambda x: x.rstrip("Z") if isinstance(x, str) else x)
+    return pd.to_datetime(series, format=fmt, utc=True, errors="coerce")
@@ -0,0 +1,92 @@
+import re
+import html
+
+from typing import Any, Optional
+from collections.abc import Iterator
+
+import _codec as codec
+
+_SCRIPT_RE = re.compile(rb"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+_JSON_TYPE_RE = re.compile(rb"""\btype\s*=\s*["']?application/json\b""", re.IGNORECASE)
+_OPTION_RE = re.compile(rb"<option\b([^>]*)>", re.IGNORECASE)
+_VALUE_RE = re.compile(rb"""\bvalue\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+# Path of the JavaScript variables inside the JSONP responses of the Opta feeds
+JSONP_VARS = {
+    "allMatches": ("match",),
+    "allEvents": ("liveData", "event"),
+    "liveData": ("liveData",),
+}
+
+
+def json_scripts(raw: bytes) -> Iterator[bytes]:
+    """Yield the contents of all ``<script type="application/json">`` blocks in a page."""
+    if b"<script" not in raw and b"<SCRIPT" not in raw:
+        return
+    for match in _SCRIPT_RE.finditer(raw):
+        if _JSON_TYPE_RE.search(match.group(1)):
+            yield match.group(2)
+
+
+def option_values(raw: bytes, element_id: str) -> list[str]:
+    """Return the values of the ``<option>`` elements inside the element with id `element_id`."""
+    marker = re.search(rb"""\bid\s*=\s*["']?""" + re.escape(element_id.encode()) + rb"""["'\s>]""", raw)
+    if marker is None:
+        return []
+    end = raw.find(b"</div", marker.end())
+    block = raw[marker.end():end if end != -1 else len(raw)]
+    values = []
+    for option in _OPTION_RE.finditer(block):
+        value = _VALUE_RE.search(option.group(1))
+        values.append(html.unescape(next(v for v in value.groups() if v is not None).decode()) if value else "")
+    return values
+
+
+def jsonp_body(raw: bytes, callback: str) -> Optional[memoryview]:
+    """Return the argument of the JSONP call ``callback(...)`` in a response."""
+    start = raw.find(callback.encode() + b"(")
+    if start == -1:
+        return None
+    start += len(callback) + 1
+    end = raw.rfind(b")")
+    if end < start:
+        return None
+    return memoryview(raw)[start:end]
+
+
+def extract(raw: bytes, var: str, clbk: Optional[str] = None) -> Optional[dict[str, Any]]:
+    """Extract the JavaScript variable `var` from a downloaded page.
+
+    The variable is looked up in the JSON script blocks of the page, in the season selector or in
+    the JSONP response of callback `clbk`, in that order. Returns None if the page cannot be parsed.
+    """
+    data = {}
+    for script in json_scripts(raw):
+        try:
+            json_data = codec.loads(script)
+        except ValueError:
+            continue  # Skip if parsing fails
+        if isinstance(json_data, dict) and var in json_data:
+            data.update(json_data)
+
+    if var in data:
+        return data
+
+    links = option_values(raw, "seasonlist")
+    if links:
+        data[var] = links
+        return data
+
+    body = jsonp_body(raw, clbk) if clbk else None
+    if body is None:
+        return None
+    try:
+        jsonp_data = codec.loads(body)
+    except ValueError:
+        return None
+    if var in JSONP_VARS:
+        value = jsonp_data
+        for key in JSONP_VARS[var]:
+            value = value[key]
+        data[var] = value
+    return data
@@ -0,0 +1,92 @@
+import os
+import uuid
+import sqlite3
+import hashlib
+
+from pathlib import Path
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic, but downloads are not coordinated between processes
+    fcntl = None
+
+# Directory of the lock files, relative to a cache directory
+LOCKS_DIRNAME = ".locks"
+
+
+def atomic_write(filepath: Path, payload: bytes) -> None:
+    """Write `payload` to `filepath` through a temporary file, so that readers never see a partial file."""
+    tmp_path = filepath.with_name(f".{filepath.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with tmp_path.open(mode="wb") as fh:
+            fh.write(payload)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def lock_path(root: Path, filepath: Path) -> Path:
+    """Return the lock file that guards the downloads of `filepath` in the cache directory `root`.
+
+    Every file has its own lock, so that a slow download never holds up the downloads of other
+    files. The lock files are empty and spread over 256 subdirectories. They are named after the
+    path relative to `root`, so that machines that mount a shared cache directory at different
+    paths use the same lock.
+    """
+    try:
+        key = Path(filepath).relative_to(root).as_posix()
+    except ValueError:
+        key = str(filepath)
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return Path(root, LOCKS_DIRNAME, digest[:2], f"{digest[2:]}.lock")
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive advisory lock on `path`, shared by all threads and processes on the machine.
+
+    Yields whether the lock was acquired, which is always True if `blocking`.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        if fcntl is None:
+            acquired = True
+        else:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+            except BlockingIOError:
+                pass
+        yield acquired
+    finally:
+        if acquired and fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def connect(path: Path, shared: bool = False) -> sqlite3.Connection:
+    """Open the SQLite database at `path` for all threads, in autocommit mode.
+
+    Databases in a directory `shared` by several machines keep the rollback journal, since SQLite
+    does not support WAL on network file systems.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+    if shared:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def written_since(filepath: Path, timestamp: float) -> bool:
+    """Return True if `filepath` exists and was written at or after `timestamp`."""
+    try:
+        return filepath.stat().st_mtime >= timestamp
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import uuid
+import socket
+import argparse
+import threading
+
+from pathlib import Path
+from datetime import timedelta
+from typing import Optional
+
+from _fs import connect
+from _cfg import CRAWLATTEMPTS, SHAREDDIR
+
+JOURNAL_FILENAME = "journal.sqlite"
+
+# States of a crawl item
+PENDING, IN_FLIGHT, DONE, FAILED = "pending", "in_flight", "done", "failed"
+
+_JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    crawl TEXT,
+    item TEXT,
+    request TEXT,
+    state TEXT,
+    attempts INTEGER DEFAULT 0,
+    worker TEXT,
+    claimed_at REAL,
+    updated_at REAL,
+    error TEXT,
+    PRIMARY KEY (crawl, item)
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (crawl, state);
+CREATE TEMP TABLE IF NOT EXISTS planned (
+    plan TEXT,
+    crawl TEXT,
+    item TEXT,
+    PRIMARY KEY (plan, crawl, item)
+);
+"""
+
+
+def _dump_request(request: dict) -> str:
+    """Serialize the keyword arguments of a :meth:`Reader.get` call."""
+    encoded = dict(request)
+    if encoded.get("filepath") is not None:
+        encoded["filepath"] = str(encoded["filepath"])
+    if isinstance(encoded.get("max_age"), timedelta):
+        encoded["max_age"] = {"seconds": encoded["max_age"].total_seconds()}
+    return json.dumps(encoded)
+
+
+def _load_request(text: str) -> dict:
+    request = json.loads(text)
+    if request.get("filepath") is not None:
+        request["filepath"] = Path(request["filepath"])
+    if isinstance(request.get("max_age"), dict):
+        request["max_age"] = timedelta(seconds=request["max_age"]["seconds"])
+    return request
+
+
+def _is_running(pid: int) -> bool:
+    """Return whether a process with `pid` runs on this machine."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Runs under another user
+        return True
+    return True
+
+
+class CrawlJournal:
+    """SQLite queue of the items of resumable crawls, e.g. the event files of all played matches.
+
+    Every item (a matchId) is pending, in flight, done or failed. Workers claim pending items of
+    their plan in a transaction, so several threads or processes can work through the same items.
+    Failed items are claimed again in later runs until they failed `max_attempts` times. Items
+    claimed by a worker that did not report back within `lease` seconds, or by a process on this
+    machine that no longer runs, are claimed again.
+
+    Parameters
+    ----------
+    root : Path
+        Cache directory. The journal is stored in ``root / JOURNAL_FILENAME``.
+    max_attempts : int
+        Attempts after which a failed item is given up. See :meth:`reset`.
+    lease : float
+        Seconds after which an item in flight is considered abandoned.
+    shared : bool
+        Whether the cache directory is shared by several machines.
+    """
+
+    def __init__(
+            self,
+            root: Path,
+            max_attempts: int = CRAWLATTEMPTS,
+            lease: float = 900.0,
+            shared: bool = SHAREDDIR,
+    ):
+        self.root = Path(root)
+        self.path = self.root / JOURNAL_FILENAME
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, shared)
+        self._conn.executescript(_JOURNAL_SCHEMA)
+
+    def plan(self, crawl: str, requests: dict[str, dict]) -> str:
+        """Queue the items of `crawl`, keyed by item id, with the :meth:`Reader.get` arguments to fetch them.
+
+        New items and items that are done (i.e. need to be fetched again) become pending. Failed
+        items keep their attempt count and items in flight are left to their worker. Returns the id
+        of the plan, which restricts :meth:`claim` to these items. Pass it to :meth:`discard` when done.
+        """
+        now = time.time()
+        plan = uuid.uuid4().hex
+        rows = [(crawl, item, _dump_request(request), PENDING, now) for item, request in requests.items()]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO items (crawl, item, request, state, updated_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (crawl, item) DO UPDATE SET request = excluded.request,"
+                    " state = CASE WHEN state = 'done' THEN 'pending' ELSE state END,"
+                    " attempts = CASE WHEN state = 'done' THEN 0 ELSE attempts END",
+                    rows,
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO planned (plan, crawl, item) VALUES (?, ?, ?)",
+                    [(plan, crawl, item) for item in requests],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return plan
+
+    def claim(
+            self,
+            crawl: str,
+            plan: str,
+            limit: int,
+            retry_before: Optional[float] = None,
+    ) -> list[tuple[str, dict]]:
+        """Claim up to `limit` items of `plan` for this worker.
+
+        Pending items come first, then abandoned items in flight, then failed items with attempts
+        left that failed before `retry_before` (a time.time() value), so that a run does not retry
+        its own failures right away.
+        """
+        now = time.time()
+        retry_before = now if retry_before is None else retry_before
+        with self._lock:
+            self._expire_dead_workers(crawl)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT item, request FROM items WHERE crawl = ?"
+                    " AND item IN (SELECT item FROM planned WHERE plan = ? AND crawl = ?) AND ("
+                    " state = 'pending'"
+                    " OR (state = 'in_flight' AND claimed_at < ?)"
+                    " OR (state = 'failed' AND attempts < ? AND updated_at < ?))"
+                    " ORDER BY CASE state WHEN 'pending' THEN 0 WHEN 'in_flight' THEN 1 ELSE 2 END, rowid"
+                    " LIMIT ?",
+                    (crawl, plan, crawl, now - self.lease, self.max_attempts, retry_before, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE items SET state = 'in_flight', attempts = attempts + 1, worker = ?, claimed_at = ?"
+                    " WHERE crawl = ? AND item = ?",
+                    [(self.worker, now, crawl, item) for item, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(item, _load_request(request)) for item, request in rows]
+
+    def _expire_dead_workers(self, crawl: str) -> None:
+        """End the lease of the items in flight of the processes on this machine that no longer run."""
+        host = socket.gethostname()
+        workers = self._conn.execute(
+            "SELECT DISTINCT worker FROM items WHERE crawl = ? AND state = 'in_flight' AND worker LIKE ?",
+            (crawl, f"{host}:%"),
+        ).fetchall()
+        for (worker,) in workers:
+            if worker == self.worker or _is_running(int(worker.split(":")[-2])):
+                continue
+            self._conn.execute(
+                "UPDATE items SET claimed_at = 0 WHERE crawl = ? AND state = 'in_flight' AND worker = ?",
+                (crawl, worker),
+            )
+
+    def unfinished(self, crawl: str, plan: str) -> dict[str, str]:
+        """Return the items of `plan` that are not done, with their error or the worker holding them."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item, state, error, worker FROM items WHERE crawl = ? AND state != 'done'"
+                " AND item IN (SELECT item FROM planned WHERE plan = ? AND crawl = ?)",
+                (crawl, plan, crawl),
+            ).fetchall()
+        return {
+            item: error if state == FAILED else f"{state} in worker {worker}" if state == IN_FLIGHT else state
+            for item, state, error, worker in rows
+        }
+
+    def release_all(self, crawl: str, plan: str) -> None:
+        """Return the items of `plan` in flight in this worker to the queue, e.g. after an interrupt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET state = 'pending', attempts = MAX(attempts - 1, 0), updated_at = ?"
+                " WHERE crawl = ? AND state = 'in_flight' AND worker = ?"
+                " AND item IN (SELECT item FROM planned WHERE plan = ? AND crawl = ?)",
+                (time.time(), crawl, self.worker, plan, crawl),
+            )
+
+    def discard(self, plan: str) -> None:
+        """Forget the items of `plan`. The items themselves stay in the journal."""
+        with self._lock:
+            self._conn.execute("DELETE FROM planned WHERE plan = ?", (plan,))
+
+    def _finish(self, crawl: str, item: str, state: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET state = ?, error = ?, updated_at = ? WHERE crawl = ? AND item = ? AND worker = ?",
+                (state, error, time.time(), crawl, item, self.worker),
+            )
+
+    def complete(self, crawl: str, item: str) -> None:
+        """Mark an item claimed by this worker as done."""
+        self._finish(crawl, item, DONE)
+
+    def fail(self, crawl: str, item: str, error: str) -> None:
+        """Mark an item claimed by this worker as failed."""
+        self._finish(crawl, item, FAILED, error)
+
+    def release(self, crawl: str, item: str) -> None:
+        """Return an item claimed by this worker to the queue without counting the attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE items SET state = 'pending', attempts = MAX(attempts - 1, 0), updated_at = ?"
+                " WHERE crawl = ? AND item = ? AND worker = ?",
+                (time.time(), crawl, item, self.worker),
+            )
+
+    def failed(self, crawl: str, exhausted: bool = False) -> dict[str, str]:
+        """Return the errors of the failed items of `crawl`, optionally only those without attempts left."""
+        query = "SELECT item, error FROM items WHERE crawl = ? AND state = 'failed'"
+        params: list = [crawl]
+        if exhausted:
+            query += " AND attempts >= ?"
+            params.append(self.max_attempts)
+        with self._lock:
+            return dict(self._conn.execute(query, params).fetchall())
+
+    def counts(self, crawl: Optional[str] = None) -> dict[str, int]:
+        """Return the number of items by state, of one crawl or of all crawls."""
+        query = "SELECT state, COUNT(*) FROM items"
+        params: list = []
+        if crawl is not None:
+            query += " WHERE crawl = ?"
+            params.append(crawl)
+        with self._lock:
+            return dict(self._conn.execute(query + " GROUP BY state", params).fetchall())
+
+    def reset(self, crawl: str, states: tuple[str, ...] = (FAILED,)) -> int:
+        """Make the items of `crawl` in `states` pending again with no attempts. Returns their number."""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE items SET state = 'pending', attempts = 0, error = NULL"
+                f" WHERE crawl = ? AND state IN ({', '.join('?' * len(states))})",
+                (crawl, *states),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the crawl journal of a data directory.")
+    parser.add_argument("command", choices=["status", "failed", "reset"])
+    parser.add_argument("data_dir", type=Path, help="Cache directory of a reader, e.g. DATA_DIR/scoresway.")
+    parser.add_argument("--crawl", default="events", help="Name of the crawl, e.g. events or games.")
+    args = parser.parse_args()
+    journal = CrawlJournal(args.data_dir)
+    if args.command == "status":
+        print(journal.counts(args.crawl))
+    elif args.command == "failed":
+        for item, error in journal.failed(args.crawl).items():
+            print(f"{item}\t{error}")
+    else:
+        print(f"Reset {journal.reset(args.crawl)} failed items of {args.crawl}")
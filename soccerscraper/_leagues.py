@@ -0,0 +1,74 @@
+import pandas as pd
+
+from typing import Optional
+
+from _cfg import LEAGUE_DICT
+
+# Country field of LEAGUE_DICT used by each translation level
+LEVELS = {"name": "countryName", "code": "countryCode"}
+
+
+class LeagueRegistry:
+    """Compiled lookups between canonical league IDs and the league IDs of a data source.
+
+    Registries are built once per source from LEAGUE_DICT and shared by all readers of that source.
+    Use :meth:`for_source` instead of instantiating this class directly.
+
+    Parameters
+    ----------
+    source : str
+        Name of the data source in LEAGUE_DICT.
+    """
+
+    _registries: dict[str, "LeagueRegistry"] = {}
+
+    def __init__(self, source: str):
+        self.source = source
+        self.leagues = {k: v[source] for k, v in LEAGUE_DICT.items() if source in v}
+        self.available = sorted(self.leagues)
+        # Source league IDs are not unique across countries (e.g. "Serie A"), so the reverse
+        # lookups are keyed by source ID and country
+        self._index = {
+            level: pd.Series(
+                list(self.leagues),
+                index=pd.MultiIndex.from_tuples(
+                    [(v, LEAGUE_DICT[k].get(field)) for k, v in self.leagues.items()], names=["league", "country"]
+                ),
+                dtype=object,
+            )
+            for level, field in LEVELS.items()
+        }
+        for level in self._index:
+            self._index[level] = self._index[level][~self._index[level].index.duplicated(keep="last")]
+
+    @classmethod
+    def for_source(cls, source: str) -> "LeagueRegistry":
+        """Return the shared registry of `source`."""
+        if source not in cls._registries:
+            cls._registries[source] = cls(source)
+        return cls._registries[source]
+
+    def canonical(self, league: str, country: str, level: str = "name") -> Optional[str]:
+        """Return the canonical ID of source league `league` in `country`, or None if it is unknown."""
+        return self._lookup(level).get((league, country))
+
+    def translate(self, leagues: pd.Series, countries: pd.Series, level: str = "name") -> pd.Series:
+        """Map source league IDs to canonical IDs. Leagues that are not in the registry become NaN.
+
+        Parameters
+        ----------
+        leagues : pd.Series
+            Source league IDs.
+        countries : pd.Series
+            Country name (level "name") or country code (level "code") of each league.
+        level : str
+            Country field the leagues are matched on.
+        """
+        keys = pd.MultiIndex.from_arrays([leagues.to_numpy(), countries.to_numpy()])
+        canonical = self._lookup(level).reindex(keys).to_numpy()
+        return pd.Series(canonical, index=leagues.index, name=leagues.name)
+
+    def _lookup(self, level: str) -> pd.Series:
+        if level not in self._index:
+            raise ValueError("level must be either 'name' or 'code'")
+        return self._index[level]
@@ -0,0 +1,109 @@
+import time
+
+from collections.abc import Hashable
+from typing import Any, Optional, Callable
+
+import _codec as codec
+from _cfg import LIVEPOLL
+
+# States of a followed match
+UPCOMING, LIVE, BREAK, FINAL = "upcoming", "live", "break", "final"
+
+# Seconds between two polls of a match, by state
+LIVE_INTERVALS = {UPCOMING: 60.0, LIVE: LIVEPOLL, BREAK: 60.0}
+
+# Matches that have not finished this long after their kickoff are no longer followed
+MAX_MATCH_SECONDS = 4 * 3600
+
+
+class LiveTracker:
+    """Schedule the polls of the matches in progress and keep track of the events seen so far.
+
+    Each followed match is polled at the interval of its state, taken from its latest payload.
+    Matches are followed from `window` seconds before their kickoff until they are final. The
+    schedule is refreshed every `schedule_interval` seconds to pick up the matches about to start.
+
+    Parameters
+    ----------
+    intervals : dict, optional
+        Seconds between two polls of a match, by state. Missing states default to LIVE_INTERVALS.
+    schedule_interval : float
+        Seconds between two refreshes of the schedule.
+    window : float
+        Seconds before their kickoff from which matches are followed.
+    """
+
+    def __init__(
+            self,
+            intervals: Optional[dict[str, float]] = None,
+            schedule_interval: float = 300.0,
+            window: float = 600.0,
+    ):
+        self.intervals = {**LIVE_INTERVALS, **(intervals or {})}
+        self.schedule_interval = schedule_interval
+        self.window = window
+        self.final: set[str] = set()
+        self._next_poll: dict[str, float] = {}
+        self._seen: dict[str, dict[Hashable, int]] = {}
+        self._next_schedule = 0.0
+
+    def schedule_due(self) -> bool:
+        return time.monotonic() >= self._next_schedule
+
+    def plan(self, kickoffs: dict[str, float]) -> None:
+        """Follow the unfinished matches (matchId to kickoff as UNIX timestamp) in progress or about to start."""
+        self._next_schedule = time.monotonic() + self.schedule_interval
+        now = time.time()
+        for match, kickoff in kickoffs.items():
+            if match in self._next_poll or match in self.final:
+                continue
+            if kickoff - self.window <= now <= kickoff + MAX_MATCH_SECONDS:
+                self._next_poll[match] = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        """True if no match is followed."""
+        return not self._next_poll
+
+    def due(self) -> list[str]:
+        """Return the followed matches that should be polled now."""
+        now = time.monotonic()
+        return [match for match, next_poll in self._next_poll.items() if next_poll <= now]
+
+    def wait(self) -> float:
+        """Return the seconds until the next poll or schedule refresh."""
+        return max(0.0, min([self._next_schedule, *self._next_poll.values()]) - time.monotonic())
+
+    def update(
+            self,
+            match: str,
+            state: str,
+            events: list[dict],
+            key: Callable[[dict], Hashable],
+    ) -> list[dict]:
+        """Record a poll of `match` and return its events that are new or changed since the last poll.
+
+        Events are matched on `key` (their event id) and compared on their serialized content. A
+        final match is no longer followed.
+        """
+        seen = self._seen.setdefault(match, {})
+        changed = []
+        for event in events:
+            event_id, fingerprint = key(event), hash(codec.dumps(event))
+            if seen.get(event_id) != fingerprint:
+                seen[event_id] = fingerprint
+                changed.append(event)
+        if state == FINAL:
+            self.final.add(match)
+            self._next_poll.pop(match, None)
+            self._seen.pop(match, None)
+        else:
+            self._next_poll[match] = time.monotonic() + self.intervals[state]
+        return changed
+
+    def retry(self, match: str) -> None:
+        """Poll `match` again after a failed poll, at the interval of live matches."""
+        self._next_poll[match] = time.monotonic() + self.intervals[LIVE]
+
+    def stats(self) -> dict[str, Any]:
+        return {"followed": len(self._next_poll), "final": len(self.final)}
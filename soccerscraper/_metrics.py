@@ -0,0 +1,210 @@
+import os
+import time
+import bisect
+import threading
+
+from pathlib import Path
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections.abc import Iterator
+from typing import Any, Optional, Union
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Name, type and help text of the metrics kept by the readers
+METRICS = {
+    "requests": ("counter", "HTTP requests sent, including retries."),
+    "responses": ("counter", "HTTP responses received, by status code."),
+    "downloaded_bytes": ("counter", "Bytes of response bodies downloaded."),
+    "cache_hits": ("counter", "Payloads read from the file cache."),
+    "cache_misses": ("counter", "Payloads that had to be downloaded."),
+    "memory_hits": ("counter", "Decoded payloads served from the in-memory cache."),
+    "retries": ("counter", "Download attempts that were retried."),
+    "failures": ("counter", "Downloads that failed after all attempts or with a permanent error."),
+    "circuit_rejections": ("counter", "Downloads rejected by an open circuit breaker."),
+    "live_events": ("counter", "New or changed events emitted by the live mode."),
+    "session_reinits": ("counter", "HTTP sessions dropped from the pool after repeated failures."),
+    "request_seconds": ("histogram", "Latency of HTTP requests."),
+    "throttle_seconds": ("histogram", "Time requests waited for the rate controller of their host."),
+    "parse_seconds": ("histogram", "Time spent decoding, extracting and normalizing payloads, by stage."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Return the cumulative counts of the buckets, keyed by their upper bound."""
+        total, result = 0, []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate quantile `q` as the upper bound of the bucket it falls in."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        for bound, total in zip([*self.buckets, self.max], [c for _, c in self.cumulative()]):
+            if total >= rank:
+                return round(min(bound, self.max), 6)
+        return round(self.max, 6)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+        }
+
+
+class Metrics:
+    """Thread-safe counters and histograms of a reader.
+
+    Every metric can be split by labels, e.g. ``metrics.inc("requests", host="www.fotmob.com")``.
+
+    Parameters
+    ----------
+    source : str
+        Value of the ``source`` label in the OpenMetrics output.
+    """
+
+    def __init__(self, source: str = ""):
+        self.source = source
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Add `value` to counter `name`."""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record `value` in histogram `name`."""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Record the duration of the block in histogram `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the current values of all metrics.
+
+        Metrics without labels map to their value (or histogram summary). Labeled metrics map to a dict
+        keyed by ``"label=value,..."``.
+        """
+        with self._lock:
+            result = {}
+            for name, series in self._counters.items():
+                result[name] = self._unpack({key: value for key, value in series.items()})
+            for name, series in self._histograms.items():
+                result[name] = self._unpack({key: histogram.summary() for key, histogram in series.items()})
+        return result
+
+    @staticmethod
+    def _unpack(series: dict[Labels, Any]) -> Any:
+        if list(series) == [()]:
+            return series[()]
+        return {",".join(f"{k}={v}" for k, v in key): value for key, value in series.items()}
+
+    def openmetrics(self, prefix: str = "soccerscraper") -> str:
+        """Return all metrics in the OpenMetrics text format."""
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                metric = f"{prefix}_{name}"
+                lines.append(f"# HELP {metric} {METRICS.get(name, ('', name))[1]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}_total{self._labels(key)} {value}")
+            for name, series in self._histograms.items():
+                metric = f"{prefix}_{name}"
+                lines.append(f"# HELP {metric} {METRICS.get(name, ('', name))[1]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{metric}_bucket{self._labels(key, le=bound)} {count}")
+                    lines.append(f"{metric}_count{self._labels(key)} {histogram.count}")
+                    lines.append(f"{metric}_sum{self._labels(key)} {histogram.sum}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, key: Labels, **extra: str) -> str:
+        labels = ([("source", self.source)] if self.source else []) + list(key) + list(extra.items())
+        if not labels:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+    def write(self, filepath: Union[str, Path]) -> None:
+        """Write the metrics in the OpenMetrics text format to `filepath`, replacing it atomically."""
+        filepath = Path(filepath)
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        tmp_path.write_text(self.openmetrics(), encoding="utf8")
+        os.replace(tmp_path, filepath)
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the metrics at ``http://{host}:{port}/metrics`` from a background thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.openmetrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.stop()
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop(self) -> None:
+        """Stop serving the metrics."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
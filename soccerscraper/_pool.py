@@ -0,0 +1,188 @@
+import time
+import threading
+
+from urllib.parse import urlsplit
+from typing import Any, Optional, Callable
+
+from _cfg import QUARANTINE
+
+# Responses that count against the health of a session: blocked, proxy refused, throttled, server errors
+UNHEALTHY_STATUS = (403, 407, 429)
+
+# Weight of the latest request in the moving averages of success rate and latency
+EWMA_WEIGHT = 0.2
+
+
+def is_healthy(status_code: Optional[int]) -> bool:
+    """Return whether a response with `status_code` speaks for the session it was sent with.
+
+    None stands for a request that did not get a response at all.
+    """
+    return status_code is not None and status_code < 500 and status_code not in UNHEALTHY_STATUS
+
+
+def redact(proxy: dict[str, str]) -> str:
+    """Return the proxy urls of `proxy` without their credentials."""
+    urls = set()
+    for url in proxy.values():
+        parts = urlsplit(url)
+        urls.add(parts._replace(netloc=parts.netloc.rpartition("@")[2]).geturl())
+    return ", ".join(sorted(urls))
+
+
+class PoolMember:
+    """A session of a :class:`SessionPool` and the health record of its proxy."""
+
+    def __init__(self, index: int, proxy: Callable[[], dict[str, str]]):
+        self.index = index
+        self.proxy = proxy
+        self.proxies: dict[str, str] = {}
+        self.session: Any = None
+        # Dropped sessions that requests in flight may still be using
+        self.retired: list[Any] = []
+        self.requests = 0
+        self.failures = 0
+        self.success_rate = 1.0
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+        self.lock = threading.Lock()
+
+    def score(self) -> float:
+        """Return the routing score of the member: high success rate, low latency and few requests in flight."""
+        return self.success_rate / (1 + (self.latency or 0.0)) / (1 + self.in_flight)
+
+    def is_quarantined(self, now: float) -> bool:
+        return self.quarantined_until > now
+
+
+class SessionPool:
+    """Pool of warm HTTP sessions, each bound to one proxy.
+
+    Requests are routed to the healthiest member that is not quarantined. A member that fails
+    `max_failures` times in a row is quarantined for `quarantine` seconds, doubling with every repeat,
+    and keeps its session. Only a member that is quarantined again without a success in between has
+    its session dropped, so that it is rebuilt on its next request. If all members are quarantined,
+    the one released first is used.
+
+    Parameters
+    ----------
+    factory : callable
+        Builds the session of a member from its proxy dict.
+    proxies : list of callable
+        One callable per member, returning the proxy dict of the member. Called when its session is built.
+    max_failures : int
+        Consecutive failures after which a member is quarantined.
+    quarantine : float
+        Initial quarantine in seconds.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[dict[str, str]], Any],
+            proxies: list[Callable[[], dict[str, str]]],
+            max_failures: int = 2,
+            quarantine: float = QUARANTINE,
+    ):
+        if not proxies:
+            raise ValueError("A session pool needs at least one member")
+        self.factory = factory
+        self.members = [PoolMember(i, proxy) for i, proxy in enumerate(proxies)]
+        self.max_failures = max_failures
+        self.quarantine = quarantine
+        self._lock = threading.Lock()
+
+    def pick(self) -> PoolMember:
+        """Return the member the next request should be sent with."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [m for m in self.members if not m.is_quarantined(now)]
+            if not healthy:
+                return min(self.members, key=lambda m: m.quarantined_until)
+            return max(healthy, key=lambda m: m.score())
+
+    def acquire(self) -> PoolMember:
+        """Pick a member and count the request as in flight. Pair every call with :meth:`release`."""
+        member = self.pick()
+        with self._lock:
+            member.in_flight += 1
+        return member
+
+    def session(self, member: PoolMember) -> Any:
+        """Return the session of `member`, building it on first use."""
+        if member.session is None:
+            with member.lock:
+                if member.session is None:
+                    member.proxies = member.proxy()
+                    member.session = self.factory(member.proxies)
+        return member.session
+
+    def release(self, member: PoolMember, status_code: Optional[int], seconds: float) -> list[Any]:
+        """Record the outcome of a request sent with `member`.
+
+        Returns the dropped sessions of the member once no request is in flight with it, so that the
+        caller can close them.
+        """
+        ok = is_healthy(status_code)
+        with self._lock:
+            member.in_flight -= 1
+            member.requests += 1
+            member.success_rate += EWMA_WEIGHT * (ok - member.success_rate)
+            if member.latency is None:
+                member.latency = seconds
+            else:
+                member.latency += EWMA_WEIGHT * (seconds - member.latency)
+            if ok:
+                member.consecutive_failures = 0
+                member.quarantines = 0
+            else:
+                member.failures += 1
+                member.consecutive_failures += 1
+                if member.consecutive_failures >= self.max_failures:
+                    self._quarantine(member)
+            if member.in_flight > 0 or not member.retired:
+                return []
+            retired, member.retired = member.retired, []
+            return retired
+
+    def _quarantine(self, member: PoolMember) -> None:
+        member.consecutive_failures = 0
+        member.quarantines += 1
+        member.quarantined_until = time.monotonic() + self.quarantine * 2 ** (member.quarantines - 1)
+        if member.quarantines < 2:
+            return
+        # Requests in flight keep using the dropped session, it is closed when the last one is released
+        with member.lock:
+            if member.session is not None:
+                member.retired.append(member.session)
+            member.session = None
+
+    def clear(self) -> list[Any]:
+        """Drop the sessions of all members and return them, so that the caller can close them."""
+        dropped = []
+        for member in self.members:
+            with member.lock:
+                if member.session is not None:
+                    dropped.append(member.session)
+                dropped.extend(member.retired)
+                member.session, member.retired = None, []
+        return dropped
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Return the health record of every member."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "proxy": redact(m.proxies) if m.proxies else None,
+                    "requests": m.requests,
+                    "failures": m.failures,
+                    "success_rate": round(m.success_rate, 3),
+                    "latency": round(m.latency, 3) if m.latency is not None else None,
+                    "in_flight": m.in_flight,
+                    "quarantined": round(max(0.0, m.quarantined_until - now), 1),
+                }
+                for m in self.members
+            ]
@@ -0,0 +1,108 @@
+import time
+import threading
+
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from _cfg import RATE, MAXRATE
+
+# Responses that mean the host wants fewer requests: forbidden (Cloudflare), throttled, overloaded
+THROTTLE_STATUS = (403, 429, 503)
+
+
+def is_throttled(status_code: Optional[int], headers: Optional[Mapping[str, str]] = None) -> bool:
+    """Return whether a response asks the client to slow down, including Cloudflare challenges."""
+    if headers is not None and headers.get("cf-mitigated", "").lower() == "challenge":
+        return True
+    return status_code in THROTTLE_STATUS
+
+
+class RateController:
+    """Request rate of one host, adapted with additive increase and multiplicative decrease (AIMD).
+
+    Every healthy response raises the rate by `increase` requests per second, up to `max_rate`. A
+    throttled response cuts it by `decrease`, down to `min_rate`, at most once per interval between
+    two requests, so that the responses to requests that were already in flight do not cut it again.
+    Requests are spaced evenly at the current rate.
+
+    Parameters
+    ----------
+    rate : float
+        Initial rate in requests per second.
+    min_rate, max_rate : float
+        Bounds of the rate.
+    increase : float
+        Requests per second added for every healthy response.
+    decrease : float
+        Factor applied to the rate on a throttled response.
+    """
+
+    def __init__(
+            self,
+            rate: float = RATE,
+            min_rate: float = 0.1,
+            max_rate: float = MAXRATE,
+            increase: float = 0.1,
+            decrease: float = 0.5,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.cuts = 0
+        self._next = 0.0
+        self._last_cut = float("-inf")
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserve the next request slot and return the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + 1 / self.rate
+            return slot - now
+
+    def record(self, status_code: Optional[int], headers: Optional[Mapping[str, str]] = None) -> None:
+        """Adapt the rate to a response. None (no response) leaves the rate unchanged."""
+        if status_code is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if is_throttled(status_code, headers):
+                if now - self._last_cut >= 1 / self.rate:
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self.cuts += 1
+                    self._last_cut = now
+                    self._next = max(self._next, now + 1 / self.rate)
+            elif status_code < 500:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def pause(self, seconds: float) -> None:
+        """Hold all requests to the host for `seconds`, e.g. for a Retry-After."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"rate": round(self.rate, 2), "cuts": self.cuts}
+
+
+class RateControllers:
+    """Rate controllers by host, created on first use with the keyword arguments of :class:`RateController`."""
+
+    def __init__(self, **kwargs: Any):
+        self.kwargs = kwargs
+        self._controllers: dict[str, RateController] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, host: str) -> RateController:
+        with self._lock:
+            if host not in self._controllers:
+                self._controllers[host] = RateController(**self.kwargs)
+            return self._controllers[host]
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            controllers = dict(self._controllers)
+        return {host: controller.stats() for host, controller in controllers.items()}
@@ -0,0 +1,268 @@
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+
+from requests import PreparedRequest, Response, exceptions
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from pathlib import Path
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote, unquote
+from typing import Any, Optional, Union
+
+# Query parameter holding the random JSONP callback name of the Opta feeds
+CALLBACK_PARAM = "_clbk"
+
+
+def replay_key(url: str) -> str:
+    """Return the lookup key of `url`: the url with sorted query parameters and without the JSONP callback."""
+    parts = urlsplit(url)
+    # requests percent-encodes non-ASCII paths (e.g. "primera-división"), recorded urls may not be
+    path = quote(unquote(parts.path), safe="/-._~!$&'()*+,;=:@")
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != CALLBACK_PARAM)
+    return urlunsplit((parts.scheme, parts.netloc, path, urlencode(query), ""))
+
+
+def _callback(url: str) -> Optional[str]:
+    return dict(parse_qsl(urlsplit(url).query)).get(CALLBACK_PARAM)
+
+
+class ResponseStore:
+    """Directory of recorded HTTP responses, keyed by :func:`replay_key`.
+
+    JSONP responses are stored without their callback, so that they can be replayed for any
+    ``_clbk`` value.
+
+    Parameters
+    ----------
+    root : Path
+        Directory of the store. Bodies are kept in ``root/bodies`` and the index in ``root/index.json``.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        if self.index_path.exists():
+            with self.index_path.open(encoding="utf8") as fh:
+                self.index: dict[str, dict] = json.load(fh)
+        else:
+            self.index = {}
+
+    def add(
+            self,
+            url: str,
+            body: bytes,
+            status: int = 200,
+            headers: Optional[dict[str, str]] = None,
+            jsonp: bool = False,
+    ) -> None:
+        """Record the response to `url`. Call :meth:`save` to write the index."""
+        key = replay_key(url)
+        name = hashlib.sha1(key.encode()).hexdigest()
+        path = self.root / "bodies" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        with self._lock:
+            self.index[key] = {"body": name, "status": status, "headers": headers or {}, "jsonp": jsonp}
+
+    def lookup(self, url: str) -> Optional[tuple[int, dict[str, str], bytes]]:
+        """Return the status, headers and body recorded for `url`, or None if it was not recorded."""
+        entry = self.index.get(replay_key(url))
+        if entry is None:
+            return None
+        body = (self.root / "bodies" / entry["body"]).read_bytes()
+        if entry["jsonp"]:
+            body = (_callback(url) or "callback").encode() + b"(" + body + b")"
+        return entry["status"], dict(entry["headers"]), body
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock, self.index_path.open("w", encoding="utf8") as fh:
+            json.dump(self.index, fh)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class _Replay:
+    """Response selection and fault injection shared by the sync and async replay transports."""
+
+    def __init__(
+            self,
+            store: Union[ResponseStore, Path, str],
+            latency: Union[float, tuple[float, float]] = 0.0,
+            throttle_rate: float = 0.0,
+            error_rate: float = 0.0,
+            reset_rate: float = 0.0,
+            retry_after: Optional[int] = None,
+            seed: Optional[int] = None,
+    ):
+        self.store = store if isinstance(store, ResponseStore) else ResponseStore(Path(store))
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.retry_after = retry_after
+        self.counts: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            with self._lock:
+                return self._rng.uniform(*self.latency)
+        return self.latency
+
+    def _timed_out(self, delay: float, timeout: Optional[float]) -> bool:
+        if timeout is None or delay <= timeout:
+            return False
+        self._count("timeouts")
+        return True
+
+    def _respond(self, url: str) -> Optional[tuple[int, dict[str, str], bytes]]:
+        """Return the status, headers and body to send for `url`, or None to reset the connection."""
+        with self._lock:
+            draw = self._rng.random()
+            self.counts["requests"] += 1
+        if draw < self.reset_rate:
+            self._count("resets")
+            return None
+        draw -= self.reset_rate
+        if draw < self.throttle_rate:
+            self._count("throttled")
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return 429, headers, b""
+        draw -= self.throttle_rate
+        if draw < self.error_rate:
+            self._count("errors")
+            with self._lock:
+                status = self._rng.choice((500, 502, 503, 504))
+            return status, {}, b""
+        recorded = self.store.lookup(url)
+        if recorded is None:
+            self._count("missing")
+            return 404, {}, b""
+        self._count("served")
+        return recorded
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of requests, served responses and injected faults."""
+        with self._lock:
+            return dict(self.counts)
+
+
+class ReplayAdapter(_Replay, BaseAdapter):
+    """Transport that serves recorded responses instead of the network.
+
+    It is both a requests transport adapter and an httpx transport. Mount it on a session, or pass
+    it as the `transport` of a (sync or asyncio) reader::
+
+        replay = ReplayAdapter("fixtures/responses/scoresway", latency=(0.05, 0.2), throttle_rate=0.05)
+        sw = Scoresway(leagues="DEN-Superliga", no_store=True, transport=replay)
+
+    Urls are matched by :func:`replay_key`, so the random ``_clbk`` callback of the Opta feeds is
+    ignored and JSONP responses are wrapped in the requested callback. Unrecorded urls return 404.
+
+    Parameters
+    ----------
+    store : ResponseStore or path
+        Recorded responses.
+    latency : float or (float, float)
+        Delay in seconds before each response, or the bounds of a uniformly distributed delay. A
+        delay beyond the read timeout of the request raises a timeout error after the timeout.
+    throttle_rate, error_rate, reset_rate : float
+        Fraction of requests answered with 429, with a 5xx status or with a connection reset.
+    retry_after : int, optional
+        Retry-After header of the 429 responses.
+    seed : int, optional
+        Seed of the fault and latency generator.
+    """
+
+    def __init__(self, store: Union[ResponseStore, Path, str], **faults: Any):
+        BaseAdapter.__init__(self)
+        _Replay.__init__(self, store, **faults)
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        delay = self._delay()
+        timeout = kwargs.get("timeout")
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if self._timed_out(delay, read_timeout):
+            time.sleep(read_timeout)
+            raise exceptions.ReadTimeout(f"Read timed out after {read_timeout}s", request=request)
+        time.sleep(delay)
+        recorded = self._respond(request.url)
+        if recorded is None:
+            raise exceptions.ConnectionError(ConnectionResetError(104, "Connection reset by peer"), request=request)
+        status, headers, body = recorded
+        response = Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status < 400 else "Replayed error"
+        response.encoding = "utf-8"
+        return response
+
+    def close(self) -> None:
+        pass
+
+    async def handle_async_request(self, request):
+        """Serve a request of an httpx client, so that the adapter is also an httpx transport."""
+        import httpx
+
+        delay = self._delay()
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        if self._timed_out(delay, read_timeout):
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout(f"Read timed out after {read_timeout}s", request=request)
+        await asyncio.sleep(delay)
+        recorded = self._respond(str(request.url))
+        if recorded is None:
+            raise httpx.ReadError("Connection reset by peer", request=request)
+        status, headers, body = recorded
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that forwards requests to the network and records the successful responses.
+
+    Parameters
+    ----------
+    store : ResponseStore or path
+        Store the responses are added to. Call ``store.save()`` when done.
+    """
+
+    def __init__(self, store: Union[ResponseStore, Path, str], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.store = store if isinstance(store, ResponseStore) else ResponseStore(Path(store))
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            body = response.content
+            callback = _callback(request.url)
+            jsonp = callback is not None and body.startswith(callback.encode() + b"(")
+            if jsonp:
+                body = body[len(callback) + 1:body.rfind(b")")]
+            headers = {k: v for k, v in response.headers.items() if k in ("Content-Type", "ETag", "Last-Modified")}
+            self.store.add(request.url, body, headers=headers, jsonp=jsonp)
+        return response
@@ -0,0 +1,178 @@
+import time
+import random
+import threading
+
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+from _cfg import RETRIES, BACKOFF, BACKOFFMAX
+
+# Status codes worth another attempt. 403 is how Cloudflare rejects a session, which the next attempt
+# may replace with another member of the session pool.
+RETRY_STATUS = (403, 408, 425, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """When and how long to wait before downloading a url again.
+
+    Parameters
+    ----------
+    attempts : int
+        Maximum number of attempts per url.
+    backoff : float
+        Base delay in seconds. Attempt `n` waits a random time between 0 and ``backoff * 2**n``.
+    max_delay : float
+        Upper bound of a single delay. A Retry-After beyond it trips the circuit breaker of the host
+        instead of blocking the download.
+    retry_status : tuple of int
+        Status codes that are retried. Any other error status is permanent.
+    """
+
+    def __init__(
+            self,
+            attempts: int = RETRIES,
+            backoff: float = BACKOFF,
+            max_delay: float = BACKOFFMAX,
+            retry_status: tuple[int, ...] = RETRY_STATUS,
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.retry_status = retry_status
+
+    def is_retryable(self, status_code: int) -> bool:
+        return status_code in self.retry_status
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the seconds to wait after failed attempt `attempt` (counted from 0), with full jitter."""
+        delay = random.uniform(0, min(self.max_delay, self.backoff * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+
+class CircuitBreaker:
+    """Stop sending requests to a host when most of its recent requests failed.
+
+    The breaker opens when at least `min_requests` requests were sent in the last `window` seconds
+    and at least `failure_ratio` of them failed. An open breaker rejects requests for `cooldown`
+    seconds, doubling every time it opens again without closing in between, up to `max_cooldown`.
+    After the cooldown one probe request is let through: its success closes the breaker, its failure
+    opens it again.
+    """
+
+    def __init__(
+            self,
+            window: float = 60.0,
+            min_requests: int = 10,
+            failure_ratio: float = 0.5,
+            cooldown: float = 30.0,
+            max_cooldown: float = 600.0,
+    ):
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self.opened_until = 0.0
+        self.trips = 0
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str = "") -> None:
+        """Raise :class:`CircuitOpenError` if no request may be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if now < self.opened_until or self._probing:
+                wait = max(0.0, self.opened_until - now)
+                raise CircuitOpenError(f"Circuit breaker of {host} is open. Retry in {wait:.0f}s.")
+            self.state = "half-open"
+            self._probing = True
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of a request."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "half-open":
+                self._probing = False
+                if ok:
+                    self.state, self.trips = "closed", 0
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            self._outcomes.append((now, ok))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            failures = sum(not outcome for _, outcome in self._outcomes)
+            if (self.state == "closed" and len(self._outcomes) >= self.min_requests
+                    and failures >= self.failure_ratio * len(self._outcomes)):
+                self._open(now)
+
+    def trip(self, seconds: float) -> None:
+        """Open the breaker for `seconds`, e.g. when the host asked for a long pause with Retry-After."""
+        with self._lock:
+            self.state = "open"
+            self._probing = False
+            self.opened_until = max(self.opened_until, time.monotonic() + seconds)
+
+    def _open(self, now: float) -> None:
+        self.trips += 1
+        self.state = "open"
+        self.opened_until = now + min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+        self._outcomes.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "open_for": round(max(0.0, self.opened_until - time.monotonic()), 1),
+            }
+
+
+class CircuitBreakers:
+    """Circuit breakers by host, created on first use with the keyword arguments of :class:`CircuitBreaker`."""
+
+    def __init__(self, **kwargs: Any):
+        self.kwargs = kwargs
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(**self.kwargs)
+            return self._breakers[host]
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in breakers.items()}
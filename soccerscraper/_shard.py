@@ -0,0 +1,37 @@
+import hashlib
+
+from collections.abc import Iterable
+from typing import Optional, Union
+
+from _cfg import SHARD
+
+Shard = tuple[int, int]
+
+
+def parse_shard(shard: Optional[Union[str, Shard]] = SHARD) -> Optional[Shard]:
+    """Return the (index, count) of a shard given as a tuple or as "index/count", e.g. "0/4"."""
+    if shard is None or shard == "":
+        return None
+    if isinstance(shard, str):
+        try:
+            index, count = (int(part) for part in shard.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{shard}'. Use 'index/count', e.g. '0/4'.")
+    else:
+        index, count = shard
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index}/{count}. The index must be in [0, count).")
+    return (index, count) if count > 1 else None
+
+
+def shard_of(key: str, count: int) -> int:
+    """Return the shard of `key`. Stable across processes, machines and Python versions."""
+    return int(hashlib.sha1(key.encode("utf8")).hexdigest()[:8], 16) % count
+
+
+def in_shard(keys: Iterable[str], shard: Optional[Shard]) -> list[bool]:
+    """Return for each key whether it belongs to `shard`. All keys belong to no shard (None)."""
+    if shard is None:
+        return [True for _ in keys]
+    index, count = shard
+    return [shard_of(str(key), count) == index for key in keys]
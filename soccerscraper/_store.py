@@ -0,0 +1,104 @@
+from functools import lru_cache
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Optional, Callable, Union
+
+import pandas as pd
+
+from _cfg import STORECACHE
+
+
+def _as_list(values: Union[str, Iterable[str]]) -> list[str]:
+    return [values] if isinstance(values, str) else list(values)
+
+
+class MatchStore(Sequence):
+    """Lazy, read-only collection of match payloads, e.g. the match details of FotMob.read_games.
+
+    Payloads stay in the file cache and are only decoded when accessed. The most recently used ones
+    are kept in a bounded LRU cache, shared by all stores selected from this one.
+
+    Items are accessed by position like a list (``store[0]``, ``store[-10:]``) or by matchId
+    (``store["4193490"]``, ``store.get(4193490)``). :meth:`select` narrows the store down to leagues,
+    seasons or a date range without decoding any payload.
+
+    Parameters
+    ----------
+    catalog : pd.DataFrame
+        One row per match, indexed by matchId (str), with the columns league, season and matchDate.
+    loader : callable
+        Returns the decoded payload of a matchId.
+    cache_size : int
+        Number of decoded payloads kept in memory.
+    """
+
+    def __init__(self, catalog: pd.DataFrame, loader: Callable[[str], Any], cache_size: int = STORECACHE):
+        self.catalog = catalog
+        self._load = lru_cache(maxsize=max(0, cache_size))(loader)
+
+    def _subset(self, catalog: pd.DataFrame) -> "MatchStore":
+        store = MatchStore.__new__(MatchStore)
+        store.catalog = catalog
+        store._load = self._load
+        return store
+
+    @property
+    def ids(self) -> list[str]:
+        """Return the matchIds of the store, in order."""
+        return list(self.catalog.index)
+
+    def __len__(self) -> int:
+        return len(self.catalog)
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Any:
+        if isinstance(key, slice):
+            return self._subset(self.catalog.iloc[key])
+        if isinstance(key, str):
+            if key not in self.catalog.index:
+                raise KeyError(key)
+            return self._load(key)
+        return self._load(self.catalog.index[key])
+
+    def __iter__(self) -> Iterator[Any]:
+        for match_id in self.catalog.index:
+            yield self._load(match_id)
+
+    def __contains__(self, match_id: object) -> bool:
+        return str(match_id) in self.catalog.index
+
+    def get(self, match_id: Union[int, str], default: Any = None) -> Any:
+        """Return the payload of `match_id`, or `default` if the match is not in the store."""
+        match_id = str(match_id)
+        return self._load(match_id) if match_id in self.catalog.index else default
+
+    def select(
+            self,
+            league: Optional[Union[str, Iterable[str]]] = None,
+            season: Optional[Union[str, Iterable[str]]] = None,
+            start: Optional[Union[str, pd.Timestamp]] = None,
+            end: Optional[Union[str, pd.Timestamp]] = None,
+    ) -> "MatchStore":
+        """Return the matches of the given leagues and seasons played from `start` to `end` (dates, inclusive)."""
+        mask = pd.Series(True, index=self.catalog.index)
+        if league is not None:
+            mask &= self.catalog["league"].isin(_as_list(league))
+        if season is not None:
+            mask &= self.catalog["season"].astype(str).isin(_as_list(season))
+        if start is not None or end is not None:
+            dates = pd.to_datetime(self.catalog["matchDate"], utc=True).dt.date
+            if start is not None:
+                mask &= dates >= pd.Timestamp(start).date()
+            if end is not None:
+                mask &= dates <= pd.Timestamp(end).date()
+        return self._subset(self.catalog[mask.values])
+
+    def cache_info(self) -> dict[str, int]:
+        """Return the hits, misses and size of the LRU cache of decoded payloads."""
+        info = self._load.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    def clear_cache(self) -> None:
+        """Drop all decoded payloads from memory."""
+        self._load.cache_clear()
+
+    def __repr__(self) -> str:
+        return f"<MatchStore of {len(self)} matches>"
@@ -0,0 +1,166 @@
+import os
+import json
+import uuid
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Any, Optional
+from collections.abc import Iterable
+
+SOURCE_COLUMN = "sourceFile"
+
+
+def _restore(value: Any) -> Any:
+    """Convert the arrays that Parquet returns for list values back to lists."""
+    if isinstance(value, np.ndarray):
+        return [_restore(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _restore(item) for key, item in value.items()}
+    return value
+
+
+def _restore_lists(df: pd.DataFrame) -> pd.DataFrame:
+    """Restore the list values of the object columns of `df`, so that they match the parsed rows."""
+    for column in df.columns:
+        if df[column].dtype == object and df[column].map(lambda value: isinstance(value, np.ndarray)).any():
+            df[column] = df[column].map(_restore)
+    return df
+
+
+class MaterializedTable:
+    """Columnar copy of parsed cache files, partitioned by league and season.
+
+    Rows are written to ``root/league=<league>/season=<season>/*.parquet`` together with the name of
+    the cache file they were parsed from. The state file records the download time and size of every
+    materialized cache file, so that only new or changed files have to be parsed on the next update.
+
+    Parameters
+    ----------
+    root : Path
+        Directory of the table.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.state_path = self.root / "_state.json"
+        self._state: Optional[dict[str, list]] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Return True if a Parquet engine (pyarrow) is installed."""
+        return importlib.util.find_spec("pyarrow") is not None
+
+    @property
+    def state(self) -> dict[str, list]:
+        """Map of materialized file names to their [fetched_at, size, league, season]."""
+        if self._state is None:
+            if self.state_path.exists():
+                with self.state_path.open(encoding="utf8") as fh:
+                    self._state = json.load(fh)
+            else:
+                self._state = {}
+        return self._state
+
+    def pending(self, stamps: dict[str, tuple[float, int]]) -> list[str]:
+        """Return the files in `stamps` that are new or changed since they were materialized."""
+        state = self.state
+        return [file for file, stamp in stamps.items()
+                if file not in state or tuple(state[file][:2]) != tuple(stamp)]
+
+    def update(
+            self,
+            df: Optional[pd.DataFrame],
+            stamps: dict[str, tuple[float, int]],
+            partitions: dict[str, tuple[str, str]],
+    ) -> None:
+        """Add the rows parsed from the files in `stamps` to the table.
+
+        Parameters
+        ----------
+        df : pd.DataFrame, optional
+            Parsed rows, with the name of their cache file in the ``sourceFile`` column.
+        stamps : dict
+            Download time and size of each parsed file.
+        partitions : dict
+            League and season of each parsed file.
+        """
+        state = self.state
+        changed = {file for file in stamps if file in state}
+        # Rows of changed files are replaced in the partition they were written to
+        stale_partitions = {tuple(state[file][2:]) for file in changed}
+
+        groups = {}
+        if df is not None and len(df) > 0:
+            keys = df[SOURCE_COLUMN].map(partitions)
+            groups = {key: group for key, group in df.groupby(keys, sort=False)}
+
+        for key in set(groups) | stale_partitions:
+            directory = self._partition_dir(*key)
+            directory.mkdir(parents=True, exist_ok=True)
+            new_rows = groups.get(key)
+            if key in stale_partitions:
+                self._rewrite(directory, changed, new_rows)
+            elif new_rows is not None:
+                self._write(new_rows, directory)
+
+        for file, stamp in stamps.items():
+            state[file] = [*stamp, *partitions[file]]
+        self._save_state()
+
+    def remove(self, files: Iterable[str]) -> None:
+        """Remove the rows parsed from `files` from the table, e.g. after they were deleted from the cache."""
+        state = self.state
+        files = {file for file in files if file in state}
+        if not files:
+            return
+        for key in {tuple(state[file][2:]) for file in files}:
+            self._rewrite(self._partition_dir(*key), files)
+        for file in files:
+            del state[file]
+        self._save_state()
+
+    def read(self, leagues: Optional[Iterable[str]] = None) -> Optional[pd.DataFrame]:
+        """Read the table, optionally restricted to `leagues`. Returns None if the table is empty."""
+        if leagues is None:
+            directories = sorted(self.root.glob("league=*"))
+        else:
+            directories = [self._partition_dir(league) for league in leagues]
+        parts = [part for directory in directories for part in sorted(directory.glob("*/*.parquet"))]
+        if not parts:
+            return None
+        df = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        return _restore_lists(df).sort_values(SOURCE_COLUMN, kind="stable")
+
+    def _partition_dir(self, league: str, season: Optional[str] = None) -> Path:
+        directory = self.root / f"league={league}"
+        if season is not None:
+            directory = directory / f"season={season}"
+        return directory
+
+    def _rewrite(self, directory: Path, files: set[str], new_rows: Optional[pd.DataFrame] = None) -> None:
+        """Replace the parts of a partition with its rows that were not parsed from `files`, plus `new_rows`."""
+        parts = sorted(directory.glob("*.parquet"))
+        rows = [pd.read_parquet(part) for part in parts]
+        rows = [part_rows[~part_rows[SOURCE_COLUMN].isin(files)] for part_rows in rows]
+        if new_rows is not None:
+            rows.append(new_rows)
+        rows = [part_rows for part_rows in rows if len(part_rows) > 0]
+        if rows:
+            self._write(pd.concat(rows, ignore_index=True), directory)
+        for part in parts:
+            part.unlink()
+
+    @staticmethod
+    def _write(rows: pd.DataFrame, directory: Path) -> None:
+        filepath = directory / f"part-{uuid.uuid4().hex}.parquet"
+        rows.reset_index(drop=True).to_parquet(filepath, index=False)
+
+    def _save_state(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf8") as fh:
+            json.dump(self.state, fh)
+        os.replace(tmp_path, self.state_path)
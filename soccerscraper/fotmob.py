@@ -1,20 +1,43 @@
-import os
-import re
-import json
-import time
 import random
+import asyncio
 
 import pandas as pd
 
 from pathlib import Path
-from typing import Optional, Callable, Union
-from collections.abc import Iterable
+from typing import Any, Optional, Callable, Union, TYPE_CHECKING
+from collections.abc import Iterable, Iterator, AsyncIterator
 
-from _classes import RequestReader
-from _cfg import DATA_DIR, NOCACHE, NOSTORE, TOR_PROXIES, HEADERS, LEAGUE_DICT, logger
+from _classes import RequestReader, AsyncRequestReader, make_game_ids
+from _dtypes import check_dtypes
+from _live import UPCOMING, LIVE, BREAK, FINAL
+from _store import MatchStore
+from _shard import Shard
+from _cfg import DATA_DIR, SHARD, NOCACHE, NOSTORE, HEADERS, teamname_replacements
+
+if TYPE_CHECKING:
+    import requests
 
 FOTMOB_DATADIR = DATA_DIR / "FotMob"
 FOTMOB_API = "https://www.fotmob.com/api/"
+COOKIE_SERVER = "http://46.101.91.154:6006/"
+
+# Column dtypes of read_schedule(dtypes="compact")
+SCHEDULE_DTYPES = {
+    "league": "category",
+    "leagueId": "int",
+    "season": "category",
+    "seasonId": "category",
+    "matchId": "int",
+    "matchRound": "category",
+    "matchDate": "ISO8601",
+    "matchStatus": "category",
+    "homeTeam": "category",
+    "homeTeamId": "int",
+    "awayTeam": "category",
+    "awayTeamId": "int",
+    "scoreHomeFullTime": "int",
+    "scoreAwayFullTime": "int",
+}
 
 random.seed(159)
 
@@ -24,6 +47,8 @@ HEADERS["Origin"] = "https://www.fotmob.com",
 
 class FotMob(RequestReader):
 
+    cache_dirs = ("leagues", "seasons", "matches")
+
     def __init__(
             self,
             leagues: Optional[Union[str, list[str]]] = None,
@@ -37,6 +62,8 @@ class FotMob(RequestReader):
             no_cache: bool = NOCACHE,
             no_store: bool = NOSTORE,
             data_dir: Path = FOTMOB_DATADIR,
+            transport: Optional[Any] = None,
+            shard: Optional[Union[str, Shard]] = SHARD,
     ):
         """Initialize the FotMob reader."""
         super().__init__(
@@ -46,20 +73,23 @@ class FotMob(RequestReader):
             no_cache=no_cache,
             no_store=no_store,
             data_dir=data_dir,
+            transport=transport,
+            shard=shard,
         )
         self.seasons = seasons  # type: ignore
-        if not self.no_store:
-            (self.data_dir / "leagues").mkdir(parents=True, exist_ok=True)
-            (self.data_dir / "seasons").mkdir(parents=True, exist_ok=True)
-            (self.data_dir / "matches").mkdir(parents=True, exist_ok=True)
-
-    def _init_session(self) -> requests.Session:
-        session = super()._init_session()
-        try:
-            r = requests.get("http://46.101.91.154:6006/")
-            r.raise_for_status()
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError("Unable to connect to the session cookie server.")
+
+    def _init_session(self, proxy: Optional[dict[str, str]] = None) -> "requests.Session":
+        import requests
+
+        session = super()._init_session(proxy)
+        # Fetched without the proxy and headers of the reader session, but through its transport
+        with requests.Session() as cookie_session:
+            self._mount_transport(cookie_session)
+            try:
+                r = cookie_session.get(COOKIE_SERVER, timeout=self.timeout)
+                r.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                raise ConnectionError("Unable to connect to the session cookie server.")
         result = r.json()
         session.headers.update(result)
         return session
@@ -71,10 +101,14 @@ class FotMob(RequestReader):
         -------
         pd.DataFrame
         """
+        return self._parse_leagues(self.get_json(**self._leagues_request()))
+
+    def _leagues_request(self) -> dict:
         url = FOTMOB_API + "allLeagues"
         filepath = self.data_dir / "allLeagues.json"
-        reader = self.get(url, filepath)
-        data = json.load(reader)
+        return {"url": url, "filepath": filepath}
+
+    def _parse_leagues(self, data: dict) -> pd.DataFrame:
         leagues = []
         for k, v in data.items():
             if k == "international":
@@ -116,16 +150,24 @@ class FotMob(RequestReader):
         -------
         pd.DataFrame
         """
+        return self._read_seasons(self.shard)
+
+    def _read_seasons(self, shard: Optional[Shard]) -> pd.DataFrame:
+        df_leagues = self._shard_frame(self.read_leagues(), ["league"], shard)
+        payloads = self.get_many_json(self._seasons_requests(df_leagues))
+        return self._parse_seasons(df_leagues, payloads)
+
+    def _seasons_requests(self, df_leagues: pd.DataFrame) -> list[dict]:
         filemask = "leagues/{}.json"
         urlmask = FOTMOB_API + "leagues?id={}"
-        df_leagues = self.read_leagues()
+        return [
+            {"url": urlmask.format(league.leagueId), "filepath": self.data_dir / filemask.format(lkey)}
+            for lkey, league in df_leagues.iterrows()
+        ]
+
+    def _parse_seasons(self, df_leagues: pd.DataFrame, payloads: list) -> pd.DataFrame:
         seasons = []
-        for lkey, league in df_leagues.iterrows():
-            print(lkey)
-            url = urlmask.format(league.leagueId)
-            filepath = self.data_dir / filemask.format(lkey)
-            reader = self.get(url, filepath)
-            data = json.load(reader)
+        for (lkey, league), data in zip(df_leagues.iterrows(), payloads):
             avail_seasons = data["allAvailableSeasons"]
             for season in avail_seasons:
                 seasons.append(
@@ -140,11 +182,48 @@ class FotMob(RequestReader):
         df = pd.DataFrame(seasons).set_index(["league", "seasonId"]).sort_index()
         return df
 
-    def read_schedule(self, force_cache: bool = False) -> pd.DataFrame:
+    def read_schedule(self, force_cache: bool = False, dtypes: str = "object") -> pd.DataFrame:
+        """Retrieve the matches of the selected seasons.
 
+        Parameters
+        ----------
+        force_cache : bool
+            Re-download season payloads that may still change.
+        dtypes : str
+            "object" returns the columns as parsed. "compact" returns categoricals for repeated
+            strings, nullable integers for IDs and scores and UTC datetimes, and logs the memory saved.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        check_dtypes(dtypes)
+        df = self._read_schedule(force_cache, self.shard)
+        return self._apply_dtypes(df, dtypes, SCHEDULE_DTYPES, "schedule")
+
+    def _read_schedule(self, force_cache: bool, shard: Optional[Shard]) -> pd.DataFrame:
+        # The seasons of all shards, since the schedules are sharded by season
+        df_seasons = self._shard_frame(self._read_seasons(None), ["league", "seasonId"], shard)
+        to_fetch = self._schedule_requests(df_seasons, force_cache)
+        payloads = self.get_many_json(to_fetch)
+        return self._parse_schedule(df_seasons, to_fetch, payloads)
+
+    def _schedule_requests(self, df_seasons: pd.DataFrame, force_cache: bool = False) -> list[dict]:
         filemask = "seasons/{}_{}.html"
         urlmask = FOTMOB_API + "leagues?id={}&season={}"
+        to_fetch = []
+        for (lkey, skey), season in df_seasons.iterrows():
+            filepath = self.data_dir / filemask.format(lkey, skey.replace('/', '-'))
+            to_fetch.append(
+                {
+                    "url": urlmask.format(season.leagueId, skey),
+                    "filepath": filepath,
+                    **self._freshness(filepath, force_cache),
+                }
+            )
+        return to_fetch
 
+    def _parse_schedule(self, df_seasons: pd.DataFrame, to_fetch: list[dict], payloads: list) -> pd.DataFrame:
         cols = [
             "league",
             "leagueId",
@@ -164,17 +243,12 @@ class FotMob(RequestReader):
             "url",
         ]
 
-        df_seasons = self.read_seasons()
         all_schedules = []
-        for (lkey, skey), season in df_seasons.iterrows():
-            season_string = skey.replace('/', '-')
-
-            filepath = self.data_dir / filemask.format(lkey, season_string)
-            url = urlmask.format(season.leagueId, skey)
-            reader = self.get(url, filepath, no_cache=force_cache)
-            season_data = json.load(reader)
+        for ((lkey, skey), season), request, season_data in zip(df_seasons.iterrows(), to_fetch, payloads):
 
             df = pd.json_normalize(season_data["matches"]["allMatches"])
+            if self.freshness.season_is_final(statuses=df.get("status.reason.short", [])):
+                self._freeze(request["filepath"])
             df["league"] = lkey
             df["leagueId"] = season["leagueId"]
             df["seasonId"] = skey
@@ -197,11 +271,11 @@ class FotMob(RequestReader):
                     "away.id": "awayTeamId",
                 }
             )
-            .replace({"homeTeam": TEAMNAME_REPLACEMENTS, "awayTeam": TEAMNAME_REPLACEMENTS,})
+            .replace({"homeTeam": teamname_replacements(), "awayTeam": teamname_replacements(),})
             .assign(matchDate=lambda x: pd.to_datetime(x["status.utcTime"], format="mixed"))
             .drop(columns=['matchWeek',])
         )
-        df["matchDescription"] = df.apply(make_game_id, axis=1)
+        df["matchDescription"] = make_game_ids(df)
         df["match"] = df['matchDescription'].copy()
         df["url"] = "https://fotmob.com" + df["url"]
         df[["scoreHomeFullTime", "scoreAwayFullTime"]] = df["status.scoreStr"].str.split("-", expand=True)
@@ -213,41 +287,335 @@ class FotMob(RequestReader):
     def read_games(self,
                    team: Optional[Union[str, list[str]]] = None,
                    force_cache: bool = False,
-                   ) -> list: 
+                   ) -> MatchStore:
+        """Retrieve the match details of all completed games.
+
+        The match details are downloaded to the cache and returned as a lazy :class:`_store.MatchStore`:
+        a payload is only decoded when it is accessed, by position or by matchId, and only the most
+        recently used payloads are kept in memory (``SOCCERSCRAPER_STORECACHE``).
 
+        Parameters
+        ----------
+        team : str or list of str, optional
+            Only retrieve games of these teams.
+        force_cache : bool
+            Re-download season payloads that may still change.
+
+        Returns
+        -------
+        MatchStore
+            Match details in schedule order. Use ``select(league=..., season=..., start=..., end=...)``
+            to narrow it down.
+        """
+        df_matches = self._read_schedule(force_cache, None)
+        to_fetch = self._games_requests(df_matches, team, force_cache)
+        errors, payloads = self._download_items("games", to_fetch)
+        return self._match_store(df_matches, to_fetch, errors, payloads)
+
+    def iter_games(self,
+                   team: Optional[Union[str, list[str]]] = None,
+                   force_cache: bool = False,
+                   batch_size: int = 50,
+                   ) -> Iterator[list]:
+        """Retrieve the match details of all completed games in batches.
+
+        Each batch is downloaded when it is needed and yielded before the next one is downloaded.
+
+        Parameters
+        ----------
+        team : str or list of str, optional
+            Only retrieve games of these teams.
+        force_cache : bool
+            Re-download season payloads that may still change.
+        batch_size : int
+            Number of games per yielded batch.
+
+        Yields
+        ------
+        list
+            Match details of up to `batch_size` games, in schedule order.
+        """
+        df_matches = self._read_schedule(force_cache, None)
+        to_fetch = self._games_requests(df_matches, team, force_cache)
+        for batch in self._batches(to_fetch, batch_size):
+            games = self._games_batch(batch, *self._download_items("games", batch))
+            if games:
+                yield games
+
+    def _games_batch(self,
+                     batch: dict[str, dict],
+                     errors: dict[str, str],
+                     payloads: Optional[dict[str, Any]] = None,
+                     ) -> list:
+        """Return the match details of a downloaded batch of games that did not fail, in order."""
+        if payloads is not None:
+            return [payloads[item] for item in batch if item not in errors]
+        return self._load_many(request["filepath"] for item, request in batch.items() if item not in errors)
+
+    def _match_store(self,
+                     df_matches: pd.DataFrame,
+                     to_fetch: dict[str, dict],
+                     errors: dict[str, str],
+                     payloads: Optional[dict[str, Any]] = None,
+                     ) -> MatchStore:
+        """Return a lazy store of the match details in `to_fetch` that did not fail, keyed by matchId.
+
+        Readers that do not store data pass the downloaded `payloads`, which are then kept in memory.
+        """
+        to_read = {item: request for item, request in to_fetch.items() if item not in errors}
+        catalog = (
+            df_matches.assign(matchId=df_matches["matchId"].astype(str))
+            .drop_duplicates("matchId")
+            .set_index("matchId")
+            .loc[list(to_read), ["league", "season", "match", "matchDate"]]
+        )
+        if payloads is not None:
+            return MatchStore(catalog, payloads.__getitem__)
+        filepaths = {match_id: request["filepath"] for match_id, request in to_read.items()}
+        return MatchStore(catalog, lambda match_id: self._load_payload(filepaths[match_id]))
+
+    def _games_requests(self,
+                        df_matches: pd.DataFrame,
+                        team: Optional[Union[str, list[str]]] = None,
+                        force_cache: bool = False,
+                        ) -> dict[str, dict]:
+        """Return the requests of the match details of completed games, keyed by matchId."""
         filemask = "matches/{}_{}_{}.html"
         urlmask = FOTMOB_API + "matchDetails?matchId={}"
 
         # Retrieve games for which a match report is available
-        df_matches = self.read_schedule(force_cache)
         df_complete = df_matches.loc[df_matches["matchStatus"].isin(["FT", "AET", "Pen"])]
 
         if team is not None:
+            if isinstance(team, str):
+                team = [team]
             iterator = df_complete.loc[
                 (
-                        df_complete.home_team.isin(team)
-                        | df_complete.away_team.isin(team)
+                        df_complete.homeTeam.isin(team)
+                        | df_complete.awayTeam.isin(team)
                 )
             ]
             if len(iterator) == 0:
                 raise ValueError("No data found for the given teams in the selected seasons.")
         else:
             iterator = df_complete
+        iterator = self._shard_frame(iterator, ["matchId"], self.shard)
 
-        stats = []
-        for i, game in iterator.reset_index().iterrows():
-            lkey, skey, gkey = game["league"], game["season"], game["match"]
-
+        to_fetch = {}
+        for i, game in iterator.reset_index(drop=True).iterrows():
+            lkey, skey = game["league"], game["season"]
             season_string = skey.replace('/', '-')
-
-            url = urlmask.format(game.gameId)
-            filepath = self.data_dir / filemask.format(lkey, season_string, game.gameId)
-            reader = self.get(url, filepath, no_cache=force_cache)
-            print(f"[{i + 1}/{len(iterator)}] Retrieving game with id={game['gameId']}")
-
-            game_data = json.load(reader)
-
-            stats.append(game_data)
-
-        return stats
-
+            filepath = self.data_dir / filemask.format(lkey, season_string, game.matchId)
+            to_fetch[str(game.matchId)] = {
+                "url": urlmask.format(game.matchId),
+                "filepath": filepath,
+                **self._freshness(filepath, force_cache, final=self.freshness.match_is_final(game.matchStatus)),
+                "message": f"[{i + 1}/{len(iterator)}] Retrieving game with id={game['matchId']}",
+            }
+        return to_fetch
+
+    def iter_live_events(self,
+                         intervals: Optional[dict[str, float]] = None,
+                         stop_when_idle: bool = True,
+                         ) -> Iterator[pd.DataFrame]:
+        """Follow the matches in progress and yield their new or changed events as they arrive.
+
+        Only the match details of matches in progress or about to start are polled, each at the
+        interval of its state. Every poll is diffed against the previous poll of the match by event
+        id. The schedule of the seasons in progress is refreshed every few minutes to pick up the
+        matches about to start. Final match details are saved to the cache, where :meth:`read_games`
+        finds them.
+
+        Parameters
+        ----------
+        intervals : dict, optional
+            Seconds between two polls of a match by state: "upcoming", "live" or "break". Defaults
+            to :data:`_live.LIVE_INTERVALS`.
+        stop_when_idle : bool
+            Return once no match is in progress or about to start. Otherwise keep refreshing the schedule.
+
+        Yields
+        ------
+        pd.DataFrame
+            New or changed match events (goals, cards, substitutions) of the matches polled in one round.
+        """
+        yield from self._iter_live(lambda: self._read_schedule(True, None), intervals, stop_when_idle)
+
+    def _live_matches(self, df_matches: pd.DataFrame) -> dict[str, dict]:
+        """Return the kickoff (UNIX timestamp), league, season and name of the unfinished matches, keyed by matchId."""
+        done = df_matches["matchStatus"].map(self.freshness.match_is_done).astype(bool)
+        pending = self._shard_frame(df_matches[~done & df_matches["matchDate"].notna()], ["matchId"], self.shard)
+        return {
+            str(match["matchId"]): {
+                "kickoff": pd.Timestamp(match["matchDate"]).timestamp(),
+                "league": match["league"],
+                "season": match["season"],
+                "match": match["match"],
+                "matchId": str(match["matchId"]),
+            }
+            for match in pending.to_dict("records")
+        }
+
+    def _live_requests(self, matches: dict[str, dict], match_ids: list[str]) -> dict[str, dict]:
+        """Return the requests of the match details of `match_ids`, with the cache path of their final payload."""
+        filemask = "matches/{}_{}_{}.html"
+        urlmask = FOTMOB_API + "matchDetails?matchId={}"
+        return {
+            match_id: {
+                "url": urlmask.format(match_id),
+                "filepath": self.data_dir / filemask.format(
+                    matches[match_id]["league"], str(matches[match_id]["season"]).replace('/', '-'), match_id
+                ),
+            }
+            for match_id in match_ids
+        }
+
+    @staticmethod
+    def _live_state(data: dict) -> str:
+        status = (data.get("header") or {}).get("status") or {}
+        if status.get("finished") or status.get("cancelled"):
+            return FINAL
+        if not status.get("started"):
+            return UPCOMING
+        if "HT" in ((status.get("liveTime") or {}).get("short"), (status.get("reason") or {}).get("short")):
+            return BREAK
+        return LIVE
+
+    @staticmethod
+    def _live_events(data: dict) -> list[dict]:
+        match_facts = (data.get("content") or {}).get("matchFacts") or {}
+        return ((match_facts.get("events") or {}).get("events")) or []
+
+    @staticmethod
+    def _live_event_key(event: dict) -> Any:
+        return event.get("eventId", event.get("reactKey"))
+
+    @staticmethod
+    def _live_final_payload(data: dict) -> Optional[dict]:
+        """Return the match details of a finished match, or None if it was cancelled."""
+        status = (data.get("header") or {}).get("status") or {}
+        return None if status.get("cancelled") else data
+
+    def _live_frame(self, match: dict, events: list[dict]) -> pd.DataFrame:
+        event_df = pd.json_normalize(events)
+        for col in ("league", "season", "match", "matchId"):
+            event_df[col] = match[col]
+        return event_df[["league", "season", "match", "matchId"] + [
+            col for col in event_df.columns if col not in ("league", "season", "match", "matchId")
+        ]]
+
+
+class _BorrowedTransport:
+    """httpx transport that sends through `transport` and leaves it open when the client is closed."""
+
+    def __init__(self, transport: Any):
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+
+class AsyncFotMob(FotMob, AsyncRequestReader):
+    """FotMob reader with asyncio ``read_*`` methods.
+
+    Usage::
+
+        async with AsyncFotMob(leagues="DEN-Superliga") as fm:
+            schedule = await fm.read_schedule()
+    """
+
+    source = "FotMob"
+
+    # Headers from the cookie server, fetched before the first request
+    _cookie_headers: Optional[dict[str, str]] = None
+    _cookie_lock: Optional[asyncio.Lock] = None
+
+    def _init_session(self, proxy: Optional[dict[str, str]] = None):
+        # Built synchronously by the session pool, so the cookies have been fetched by _send
+        client = AsyncRequestReader._init_session(self, proxy)
+        client.headers.update(self._cookie_headers or {})
+        return client
+
+    async def _send(self, url: str, filepath: Optional[Path], host: str):
+        if self._cookie_headers is None:
+            await self._fetch_cookies()
+        return await super()._send(url, filepath, host)
+
+    async def _fetch_cookies(self) -> None:
+        import httpx
+
+        if self._cookie_lock is None:
+            self._cookie_lock = asyncio.Lock()
+        async with self._cookie_lock:
+            if self._cookie_headers is not None:
+                return
+            # Fetched without the proxy and headers of the reader session, but through its transport,
+            # which stays open for the clients of the reader
+            transport = _BorrowedTransport(self.transport) if self.transport is not None else None
+            async with httpx.AsyncClient(transport=transport) as client:
+                try:
+                    r = await client.get(COOKIE_SERVER, timeout=self._httpx_timeout())
+                    r.raise_for_status()
+                except httpx.TransportError:
+                    raise ConnectionError("Unable to connect to the session cookie server.")
+            self._cookie_headers = r.json()
+
+    async def read_leagues(self) -> pd.DataFrame:
+        return self._parse_leagues(await self.get_json(**self._leagues_request()))
+
+    async def read_seasons(self) -> pd.DataFrame:
+        return await self._read_seasons(self.shard)
+
+    async def _read_seasons(self, shard: Optional[Shard]) -> pd.DataFrame:
+        df_leagues = self._shard_frame(await self.read_leagues(), ["league"], shard)
+        payloads = await self.get_many_json(self._seasons_requests(df_leagues))
+        return self._parse_seasons(df_leagues, payloads)
+
+    async def read_schedule(self, force_cache: bool = False, dtypes: str = "object") -> pd.DataFrame:
+        check_dtypes(dtypes)
+        df = await self._read_schedule(force_cache, self.shard)
+        return self._apply_dtypes(df, dtypes, SCHEDULE_DTYPES, "schedule")
+
+    async def _read_schedule(self, force_cache: bool, shard: Optional[Shard]) -> pd.DataFrame:
+        df_seasons = self._shard_frame(await self._read_seasons(None), ["league", "seasonId"], shard)
+        to_fetch = self._schedule_requests(df_seasons, force_cache)
+        payloads = await self.get_many_json(to_fetch)
+        return self._parse_schedule(df_seasons, to_fetch, payloads)
+
+    async def read_games(self,
+                         team: Optional[Union[str, list[str]]] = None,
+                         force_cache: bool = False,
+                         ) -> MatchStore:
+
+        df_matches = await self._read_schedule(force_cache, None)
+        to_fetch = self._games_requests(df_matches, team, force_cache)
+        errors, payloads = await self._download_items("games", to_fetch)
+        return self._match_store(df_matches, to_fetch, errors, payloads)
+
+    async def iter_games(self,
+                         team: Optional[Union[str, list[str]]] = None,
+                         force_cache: bool = False,
+                         batch_size: int = 50,
+                         ) -> AsyncIterator[list]:
+        df_matches = await self._read_schedule(force_cache, None)
+        to_fetch = self._games_requests(df_matches, team, force_cache)
+        for batch in self._batches(to_fetch, batch_size):
+            games = self._games_batch(batch, *await self._download_items("games", batch))
+            if games:
+                yield games
+
+    async def iter_live_events(self,
+                               intervals: Optional[dict[str, float]] = None,
+                               stop_when_idle: bool = True,
+                               ) -> AsyncIterator[pd.DataFrame]:
+        async for events in self._iter_live(lambda: self._read_schedule(True, None), intervals, stop_when_idle):
+            yield events
@@ -1,22 +1,66 @@
 import os
 import re
-import json
 import time
 import random
 
 import pandas as pd
 
 from pathlib import Path
-from typing import Optional, Callable, Union
-from collections.abc import Iterable
-
-from _classes import RequestReader
-from _cfg import DATA_DIR, NOCACHE, NOSTORE, TOR_PROXIES, HEADERS, LEAGUE_DICT, logger
+from typing import Any, Optional, Callable, Union
+from collections.abc import Iterable, Iterator, AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+
+import _codec as codec
+from _classes import RequestReader, AsyncRequestReader
+from _dtypes import check_dtypes, expand
+from _cache import TABLES_DIRNAME
+from _table import MaterializedTable, SOURCE_COLUMN
+from _live import UPCOMING, LIVE, BREAK, FINAL
+from _shard import Shard
+from _cfg import DATA_DIR, SHARD, NOCACHE, NOSTORE, HEADERS, LEAGUE_DICT, logger
 
 SCORESWAY_DATADIR = DATA_DIR / "scoresway"
 SCORESWAY_URL = "https://www.scoresway.com"
 SCORESWAY_API = "https://api.performfeeds.com/soccerdata"
 
+# Column dtypes of read_matches(dtypes="compact")
+MATCH_DTYPES = {
+    "league": "category", "leagueId": "category", "leagueFormat": "category",
+    "matchStatus": "category", "matchDate": "%Y-%m-%d", "matchTime": "category", "matchRound": "int",
+    "matchWinner": "category", "matchAttendance": "int", "matchPeriods": "int", "matchPeriodLength": "int",
+    "matchLengthMin": "int", "matchLengthSec": "int", "matchLeg": "category", "matchOvertimeLength": "int",
+    "matchAggregateWinnerId": "category", "matchPeriod": "int",
+    "season": "category", "seasonId": "category", "seasonStartDate": "%Y-%m-%d", "seasonEndDate": "%Y-%m-%d",
+    "stage": "category", "stageId": "category", "stageFormatId": "category", "stageStartDate": "%Y-%m-%d",
+    "stageEndDate": "%Y-%m-%d", "stageGroup": "category",
+    "venue": "category", "venueId": "category", "venueShortName": "category",
+    "homeTeam": "category", "homeTeamId": "category", "homeTeamShort": "category",
+    "homeTeamOfficial": "category", "homeTeamCode": "category", "homeTeamCountryName": "category",
+    "awayTeam": "category", "awayTeamId": "category", "awayTeamShort": "category",
+    "awayTeamOfficial": "category", "awayTeamCode": "category", "awayTeamCountryName": "category",
+    "teamId": "category", "player": "category", "playerId": "category", "type": "category",
+    "decision": "category", "outcome": "category", "url": "category",
+    **{f"score{side}{score}": "int" for side in ("Home", "Away")
+       for score in ("FullTime", "HalfTime", "Total", "Aggregate", "ExtraTime", "Penalty")},
+    **{f"matchPeriod{i}{field}": "ISO8601" for i in range(1, 5) for field in ("StartTime", "EndTime")},
+    **{f"matchPeriod{i}{field}": "int" for i in range(1, 5) for field in ("LengthMin", "LengthSec")},
+    **{f"{ref}{field}": "category" for ref in ("refMain", "refAss1", "refereeAss2", "refAss2", "refFourth",
+                                              "refAssVar", "refAssVar2")
+       for field in ("Id", "FirstName", "LastName")},
+}
+
+# Column dtypes of read_events(dtypes="compact")
+EVENT_DTYPES = {
+    "league": "category", "match": "category", "matchId": "category", "matchDate": "%Y-%m-%d",
+    "id": "int", "eventId": "int", "typeId": "int", "periodId": "int", "timeMin": "int", "timeSec": "int",
+    "contestantId": "category", "playerId": "category", "playerName": "category", "outcome": "int",
+    "x": "float", "y": "float", "timeStamp": "ISO8601", "lastModified": "ISO8601",
+    "keyPass": "int", "assist": "int",
+}
+
+# Match statuses of the matches followed by iter_live_events
+LIVE_STATUSES = ("Fixture", "Playing", "Suspended")
+
 random.seed(159)
 
 HEADERS["Referer"] = "https://www.scoresway.com/",
@@ -25,6 +69,8 @@ HEADERS["Origin"] = "https://www.scoresway.com",
 
 class Scoresway(RequestReader):
 
+    cache_dirs = ("leagues", "seasons", "matches", "events")
+
     def __init__(
             self,
             leagues: Optional[Union[str, list[str]]] = None,
@@ -38,6 +84,8 @@ class Scoresway(RequestReader):
             no_cache: bool = NOCACHE,
             no_store: bool = NOSTORE,
             data_dir: Path = SCORESWAY_DATADIR,
+            transport: Optional[Any] = None,
+            shard: Optional[Union[str, Shard]] = SHARD,
     ):
         """Initialize the FotMob reader."""
         super().__init__(
@@ -47,12 +95,11 @@ class Scoresway(RequestReader):
             no_cache=no_cache,
             no_store=no_store,
             data_dir=data_dir,
+            transport=transport,
+            shard=shard,
         )
         self.seasons = seasons  # type: ignore
-        if not self.no_store:
-            (self.data_dir / "leagues").mkdir(parents=True, exist_ok=True)
-            (self.data_dir / "seasons").mkdir(parents=True, exist_ok=True)
-            (self.data_dir / "matches").mkdir(parents=True, exist_ok=True)
+        self.event_table = MaterializedTable(self.data_dir / TABLES_DIRNAME / "events")
 
     def read_leagues(self):
         """Retrieve the selected leagues from the datasource.
@@ -61,7 +108,9 @@ class Scoresway(RequestReader):
         -------
         pd.DataFrame
         """
-        data = self._read_leagues()
+        return self._parse_leagues(self._read_leagues())
+
+    def _parse_leagues(self, data: dict) -> pd.DataFrame:
         leagues = {}
 
         continent_data = data["continents"]
@@ -114,10 +163,12 @@ class Scoresway(RequestReader):
 
     
     def _read_leagues(self, no_cache: bool = False) -> dict:
+        return self.get_json(**self._leagues_request(no_cache))
+
+    def _leagues_request(self, no_cache: bool = False) -> dict:
         url = SCORESWAY_URL + "/en_GB/soccer/competitions"
         filepath = self.data_dir / "leagues.json"
-        response = self.get(url, filepath, no_cache=no_cache, var="continents")
-        return json.load(response)
+        return {"url": url, "filepath": filepath, "no_cache": no_cache, "var": "continents"}
 
     
     def read_seasons(self) -> pd.DataFrame:
@@ -127,16 +178,28 @@ class Scoresway(RequestReader):
         -------
         pd.DataFrame
         """
+        return self._read_seasons(self.shard)
+
+    def _read_seasons(self, shard: Optional[Shard]) -> pd.DataFrame:
+        df_leagues = self._shard_frame(self.read_leagues(), ["league"], shard)
+        payloads = self.get_many_json(self._seasons_requests(df_leagues))
+        return self._parse_seasons(df_leagues, payloads)
+
+    def _seasons_requests(self, df_leagues: pd.DataFrame) -> list[dict]:
         filemask = "leagues/{}.json"
         urlmask = SCORESWAY_URL + "{}"
-        df_leagues = self.read_leagues()
-        seasons = []
-        for lkey, league in df_leagues.iterrows():
+        return [
+            {
+                "url": urlmask.format(league.url.replace('fixtures', 'results')),
+                "filepath": self.data_dir / filemask.format(lkey),
+                "var": "allAvailableSeasons",
+            }
+            for lkey, league in df_leagues.iterrows()
+        ]
 
-            url = urlmask.format(league.url.replace('fixtures', 'results'))
-            filepath = self.data_dir / filemask.format(lkey)
-            reader = self.get(url, filepath, var="allAvailableSeasons")
-            data = json.load(reader)
+    def _parse_seasons(self, df_leagues: pd.DataFrame, payloads: list) -> pd.DataFrame:
+        seasons = []
+        for (lkey, league), data in zip(df_leagues.iterrows(), payloads):
 
             avail_seasons = data["allAvailableSeasons"]
             for season in avail_seasons:
@@ -173,22 +236,72 @@ class Scoresway(RequestReader):
     def read_matches(self, force_cache: bool = False,
                      truncated: bool = False,
                      var: bool = False,
+                     dtypes: str = "object",
                      ) -> pd.DataFrame:
+        """Retrieve the matches of the selected seasons.
+
+        Parameters
+        ----------
+        force_cache : bool
+            Re-download season payloads that may still change.
+        truncated : bool
+            Only return the main match columns.
+        var : bool
+            Return the VAR decisions instead of the matches.
+        dtypes : str
+            "object" returns the columns as parsed. "compact" returns categoricals for repeated
+            strings, nullable integers for counts and scores and UTC datetimes, and logs the memory saved.
 
+        Returns
+        -------
+        pd.DataFrame
+        """
+        check_dtypes(dtypes)
+        df = self._read_matches(force_cache, self.shard, truncated=truncated, var=var)
+        return self._apply_dtypes(df, dtypes, MATCH_DTYPES, "matches")
+
+    def _read_matches(self,
+                      force_cache: bool,
+                      shard: Optional[Shard],
+                      truncated: bool = False,
+                      var: bool = False,
+                      ) -> pd.DataFrame:
+        # The seasons of all shards, since the matches are sharded by season
+        df_seasons = self._shard_frame(self._read_seasons(None), ["league", "seasonId"], shard)
+        to_fetch = self._matches_requests(df_seasons, force_cache)
+        payloads = self.get_many_json(to_fetch)
+        return self._parse_matches(df_seasons, to_fetch, payloads, truncated=truncated, var=var)
+
+    def _matches_requests(self, df_seasons: pd.DataFrame, force_cache: bool = False) -> list[dict]:
         filemask = "seasons/{}_{}.html"
         urlmask = SCORESWAY_API + "/{}/ft1tiv1inq7v1sk3y9tv12yh5/?_rt=c&tmcl={}&live=yes&_pgSz=400&_lcl=en&_fmt=jsonp&sps=widgets&_clbk={}"
 
-        df_seasons = self.read_seasons()
-        all_schedules = []
+        to_fetch = []
         for (lkey, skey), season in df_seasons.iterrows():
-            season_string = season['season']
             callback_id = self.generate_callback_id(k=40)
+            filepath = self.data_dir / filemask.format(lkey, season['season'])
+            to_fetch.append(
+                {
+                    "url": urlmask.format('match', skey, callback_id),
+                    "filepath": filepath,
+                    **self._freshness(filepath, force_cache),
+                    "var": 'allMatches',
+                    "clbk": callback_id,
+                }
+            )
+        return to_fetch
 
+    def _parse_matches(self,
+                       df_seasons: pd.DataFrame,
+                       to_fetch: list[dict],
+                       payloads: list,
+                       truncated: bool = False,
+                       var: bool = False,
+                       ) -> pd.DataFrame:
 
-            url = urlmask.format('match', skey, callback_id)
-            filepath = self.data_dir / filemask.format(lkey, season_string)
-            reader = self.get(url, filepath, no_cache=force_cache, var='allMatches', clbk=callback_id)
-            season_data = json.load(reader)
+        all_schedules = []
+        for ((lkey, skey), season), request, season_data in zip(df_seasons.iterrows(), to_fetch, payloads):
+            url = request["url"]
 
             df = pd.json_normalize(season_data['allMatches'])
             df["league"] = lkey
@@ -201,10 +314,15 @@ class Scoresway(RequestReader):
 
             df = df.rename(columns=lambda col: re.sub(r"^(matchInfo\.|liveData\.)", "", col))
 
-            teams_data = df['contestant'].apply(pd.Series)
-            teams_data.columns = ['home', 'away']
-            team_data = pd.concat(objs=[pd.json_normalize(teams_data['home']).add_prefix('homeTeam'),
-                                        pd.json_normalize(teams_data['away']).add_prefix('awayTeam')], axis=1)
+            end_dates = df.get('tournamentCalendar.endDate', pd.Series(dtype=object)).dropna()
+            if self.freshness.season_is_final(end_date=end_dates.max() if len(end_dates) else None,
+                                              statuses=df.get('matchDetails.matchStatus', [])):
+                self._freeze(request["filepath"])
+
+            home, away = _split_contestants(df['contestant'])
+            team_data = pd.concat(objs=[pd.json_normalize(home).add_prefix('homeTeam'),
+                                        pd.json_normalize(away).add_prefix('awayTeam')], axis=1)
+            team_data.index = df.index
 
 
             team_data = team_data.rename(columns={
@@ -229,7 +347,7 @@ class Scoresway(RequestReader):
 
             all_schedules.append(pd.concat(objs=[df, team_data[cols]], axis=1))
 
-        print(f"All matches are loaded. Preprocess data into dataframe.")
+        print("All matches are loaded. Preprocess data into dataframe.")
 
         df = pd.concat(all_schedules)
 
@@ -293,42 +411,11 @@ class Scoresway(RequestReader):
                              })
         )
 
-        # Mapping of referee types to column name prefixes
-        def nested(dictionary: list, val: str):
-            """Process match officials into a structured dictionary while handling missing fields dynamically."""
-            d_ = {}
-            if isinstance(dictionary, list) and val == 'official':  
-                type_mapping = {
-                    "Main": "refMain",
-                    "Assistant referee 1": "refAss1",
-                    "Assistant referee 2": "refAss2",
-                    "Fourth official": "refFourth",
-                    "Video Assistant Referee": "refVar",
-                    "Assistant VAR Official": "refAssVar"
-                }
-                for d in dictionary:
-                    ref_type = type_mapping.get(d.get('type', ''), d.get('type', '').replace(" ", ""))
-                    for k in ['id', 'firstName', 'lastName']:
-                        if k in d:
-                            norm_k = k[0].upper() + k[1:]
-                            d_[f"{ref_type}{norm_k}"] = d[k]
-
-            elif isinstance(dictionary, list) and val == 'period':
-                for i, d in enumerate(dictionary):
-                    for k in ['start', 'end', 'lengthMin', 'lengthSec']:
-                        if k in d:
-                            norm_k = k[0].upper() + k[1:]
-                            if 'Start' in norm_k or 'End' in norm_k:
-                                norm_k += 'Time'
-                            d_[f"matchPeriod{i + 1}{norm_k}"] = d[k]
-
-            return d_
-
-        df_period = df['matchDetails.period'].apply(
-            lambda x: nested(x, val='period') if isinstance(x, list) else {}).apply(pd.Series)
-
-        df_ref = df['matchDetailsExtra.matchOfficial'].apply(
-            lambda x: nested(x, val='official') if isinstance(x, list) else {}).apply(pd.Series)
+        df_period = pd.DataFrame.from_records(
+            [_flatten_periods(x) for x in df['matchDetails.period']], index=df.index)
+
+        df_ref = pd.DataFrame.from_records(
+            [_flatten_officials(x) for x in df['matchDetailsExtra.matchOfficial']], index=df.index)
 
         df = (pd.concat([df, df_ref, df_period], axis=1).
               drop(columns=['matchDetailsExtra.matchOfficial', 'matchDetails.period']))
@@ -342,24 +429,14 @@ class Scoresway(RequestReader):
 
         if var:
             var_list = []
-            for i, row in df.iterrows():
-                if isinstance(row['VAR'], list):
-                    for r in row['VAR']:
-                        r['league'] = row['league']
-                        r['leagueId'] = row['leagueId']
-                        r['match'] = row['match']
-                        r['matchId'] = row['matchId']
-                        r['matchDate'] = row['matchDate']
-                        r['season'] = row['season']
-                        r['seasonId'] = row['seasonId']
-                        var_list += [r]
-
-                elif row['matchVar']:
-                    r = {'league': row['league'], 'leagueId': row['leagueId'], 'match': row['match'],
-                         'matchId': row['matchId'],
-                         'matchDate': row['matchDate'], 'season': row['season'],
-                         'seasonId': row['seasonId']}
-                    var_list += [r]
+            match_cols = ['league', 'leagueId', 'match', 'matchId', 'matchDate', 'season', 'seasonId']
+            var_records = df['VAR'] if 'VAR' in df.columns else [None] * len(df)
+            for match, records, has_var in zip(df[match_cols].to_dict('records'), var_records, df['matchVar']):
+                if isinstance(records, list):
+                    # Copy the records so that the cached payload is not modified
+                    var_list += [{**r, **match} for r in records]
+                elif has_var:
+                    var_list.append(match)
 
             df_var = (pd.DataFrame(var_list)
                       .rename(columns={'contestantId': 'teamId',
@@ -434,100 +511,385 @@ class Scoresway(RequestReader):
 
     def _opta_event_files_(self):
         event_leagues = list(self._selected_leagues.keys())
-        event_files = os.listdir(self.data_dir / 'events')
-        latest_dates = {}
-        league_events = []
-
-        for file in event_files:
-            for league in event_leagues:
-                if league in file:
-                    league_events.append(file)
-                    rematch = re.search(pattern=r'_(\d{4}-\d{2}-\d{2})', string=file)
-                    if rematch:
-                        date_str = rematch.group(1)
-                        if league not in latest_dates or date_str > latest_dates[league]:
-                            latest_dates[league] = date_str
-        return latest_dates, league_events
+        if self.manifest is not None:
+            league_events = self.manifest.files('events', event_leagues)
+        else:
+            league_events = [file for file in os.listdir(self.data_dir / 'events')
+                             if file.split('_')[0] in event_leagues and not file.startswith('.')]
+        return league_events
 
     def read_events(self,
                     force_cache: bool = False,
                     dataframe: Optional[pd.DataFrame] = None,
+                    materialize: bool = False,
+                    parse_workers: Optional[int] = None,
+                    dtypes: str = "object",
                     ):
-        pass
-        filemask = "events/{}_{}_{}.html"
-        urlmask = SCORESWAY_API + "/{}/ft1tiv1inq7v1sk3y9tv12yh5/{}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets&_clbk={}"
+        """Retrieve the Opta events of all played matches.
+
+        Parameters
+        ----------
+        force_cache : bool
+            Re-download season payloads that may still change.
+        dataframe : pd.DataFrame, optional
+            Matches as returned by :meth:`read_matches`. Read if not given.
+        materialize : bool
+            Keep a Parquet copy of the parsed events (requires pyarrow) and only parse event files
+            that are new or changed since the last call. Events of files that were deleted from the
+            cache are removed from the copy.
+        parse_workers : int, optional
+            Number of processes used to decode and normalize the event files. Defaults to
+            ``self.parse_workers``. With a single worker the files are parsed in this process.
+        dtypes : str
+            "object" returns the columns as parsed. "compact" returns categoricals for repeated
+            strings, nullable integers for IDs and counters and UTC datetimes, and logs the memory saved.
 
+        Returns
+        -------
+        pd.DataFrame
+        """
+        check_dtypes(dtypes)
         # Retrieve games for which a match report is available
         if not isinstance(dataframe, pd.DataFrame):
-            dataframe = self.read_matches(force_cache)
+            dataframe = self._read_matches(force_cache, None)
 
+        self._fetch_events(self._events_requests(dataframe, force_cache))
+        return self._read_event_files(dataframe, force_cache, materialize, parse_workers, dtypes)
+
+    def iter_events(self,
+                    batch_size: int = 50,
+                    force_cache: bool = False,
+                    dataframe: Optional[pd.DataFrame] = None,
+                    dtypes: str = "object",
+                    ) -> Iterator[pd.DataFrame]:
+        """Retrieve the Opta events of all played matches in batches.
+
+        The event files are parsed and yielded `batch_size` matches at a time, so memory use does
+        not grow with the number of matches. The missing event files of a batch are downloaded just
+        before it is yielded, so the first batch arrives without waiting for the whole crawl.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of matches per yielded dataframe.
+        force_cache : bool
+            Re-download season payloads that may still change.
+        dataframe : pd.DataFrame, optional
+            Matches as returned by :meth:`read_matches`. Read if not given.
+        dtypes : str
+            "object" or "compact", see :meth:`read_events`.
+
+        Yields
+        ------
+        pd.DataFrame
+        """
+        check_dtypes(dtypes)
+        if not isinstance(dataframe, pd.DataFrame):
+            dataframe = self._read_matches(force_cache, None)
+
+        for batch, event_files in self._event_batches(self._events_requests(dataframe, force_cache), batch_size):
+            self._fetch_events(batch)
+            events = self._parse_event_batch(event_files)
+            if events is not None:
+                yield self._apply_dtypes(events, dtypes, EVENT_DTYPES, "events")
+
+    def _read_event_files(self,
+                          dataframe: pd.DataFrame,
+                          force_cache: bool,
+                          materialize: bool,
+                          parse_workers: Optional[int],
+                          dtypes: str,
+                          ) -> pd.DataFrame:
+        """Parse the cached event files of the selected leagues. See :meth:`read_events`."""
+        parse_workers = self.parse_workers if parse_workers is None else parse_workers
+        event_files, to_read = self._event_files_requests(force_cache)
+        materialize = self._use_event_table(materialize)
+        stamps = None
+        if materialize:
+            self._prune_event_table(event_files)
+            stamps, to_read = self._pending_event_files(event_files, to_read)
+            event_files = list(stamps)
+
+        if parse_workers > 1:
+            events = self._parse_events_parallel(event_files, to_read, parse_workers, source=materialize)
+        else:
+            payloads = self._load_many(request["filepath"] for request in to_read)
+            events = self._parse_events(event_files, payloads, source=materialize)
+
+        if materialize:
+            events = self._materialize_events(dataframe, stamps, events)
+        return self._apply_dtypes(events, dtypes, EVENT_DTYPES, "events")
+
+    def _fetch_events(self, to_fetch: dict[str, dict]) -> None:
+        # Paced by the rate controller of the host
+        self._crawl("events", to_fetch)
+
+    def _events_requests(self, dataframe: pd.DataFrame, force_cache: bool = False) -> dict[str, dict]:
+        """Return the requests of the event files that are not cached yet, keyed by matchId."""
+        filemask = "events/{}_{}_{}.html"
+        urlmask = SCORESWAY_API + "/{}/ft1tiv1inq7v1sk3y9tv12yh5/{}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets&_clbk={}"
+
+        # Match IDs are built from the plain string columns
+        dataframe = expand(dataframe, {'matchDate': '%Y-%m-%d'})
         opta_event_availability = dataframe['league'].map(self._opta_event_availability)
         df_complete = dataframe[
             (dataframe['season'] >= opta_event_availability) & (dataframe["matchStatus"] == "Played")]
 
         df_complete = df_complete.sort_values(['league', 'season', 'matchDate', 'matchTime', 'match'])
+        df_complete = self._shard_frame(df_complete, ['matchId'], self.shard)
 
-        latest_dates, event_files = self._opta_event_files_()
+        event_files = set(self._opta_event_files_())
 
-        df_missing = df_complete[
-            df_complete.apply(lambda row: row['matchDate'] >= latest_dates.get(row['league'], row['matchDate']),
-                              axis=1)]
-                              
-        iterator = df_missing
-        events = []
+        # All played matches are checked against the cache. Matches that failed before are retried
+        # according to the crawl journal.
+        iterator = df_complete
         N = len(iterator)
+        to_fetch = {}
         for i, match in iterator.reset_index().iterrows():
 
             match_name = match["match"].replace('/', '')
-            lkey, skey, gkey = match["league"], match["seasonId"], match["matchDate"] + ' ' + match_name
-            callback_id = self.generate_callback_id(k=40)
-            url = urlmask.format('matchevent', match['matchId'], callback_id)
+            lkey, gkey = match["league"], match["matchDate"] + ' ' + match_name
             filename = filemask.format(lkey, gkey, match['matchId'])
-            filepath = self.data_dir / filename
             if filename.split('events/')[-1] in event_files:
-                i -= 1
                 continue
+            filepath = self.data_dir / filename
+            callback_id = self.generate_callback_id(k=40)
+            url = urlmask.format('matchevent', match['matchId'], callback_id)
 
             print(f"[{i + 1}/{N}] Retrieving match {match_name} at {match['matchDate']} with id={match['matchId']}")
-            _ = self.get(url, filepath, no_cache=force_cache, var='allEvents', clbk=callback_id)
-
-            time.sleep(random.uniform(0.01, 0.25))
-
-            if i % 50 == 0:
-                time.sleep(random.uniform(2, 8))
+            to_fetch[str(match['matchId'])] = {
+                "url": url, "filepath": filepath, "var": 'allEvents', "clbk": callback_id,
+                **self._freshness(filepath, force_cache, final=True),
+            }
+        return to_fetch
+
+    def _event_files(self) -> list[str]:
+        """Return the names of the cached event files of the selected leagues in the shard of the reader."""
+        # Event files are named after their matchId, which is the shard key of the event downloads
+        return sorted(file for file in self._opta_event_files_() if self._in_shard(file.split('_')[-1].split('.')[0]))
+
+    def _event_batches(self,
+                       to_fetch: dict[str, dict],
+                       batch_size: int,
+                       ) -> Iterator[tuple[dict[str, dict], list[str]]]:
+        """Split the cached and missing event files into batches of `batch_size` matches, in file order.
+
+        Yields the requests of the missing files of each batch, keyed by matchId, and the names of all
+        its files.
+        """
+        missing = {request["filepath"].name: (match_id, request) for match_id, request in to_fetch.items()}
+        event_files = sorted(set(self._event_files()) | set(missing))
+        for start in range(0, len(event_files), batch_size):
+            files = event_files[start:start + batch_size]
+            yield dict(missing[file] for file in files if file in missing), files
+
+    def _parse_event_batch(self, event_files: list[str]) -> Optional[pd.DataFrame]:
+        """Parse a batch of event files, or return None if none of them is cached (e.g. all downloads failed)."""
+        payloads = self._load_many(self.data_dir / "events" / file for file in event_files)
+        cached = [i for i, payload in enumerate(payloads) if payload is not None]
+        if not cached:
+            return None
+        return self._parse_events([event_files[i] for i in cached], [payloads[i] for i in cached])
 
+    def _event_files_requests(self, force_cache: bool = False) -> tuple[list[str], list[dict]]:
         filemask = "events/{}"
-        _, event_files = self._opta_event_files_()
+        event_files = self._event_files()
         N = len(event_files)
-        for i, file in enumerate(sorted(event_files)):
-
-            print(f"[{i + 1}/{N}] Retrieving {file}")
-
-            filepath = self.data_dir / filemask.format(file)
-            try:
-                reader = self.get(url='placeholder', filepath=filepath, no_cache=force_cache)
-            except (TypeError, json.JSONDecodeError):
-                continue
+        to_read = [
+            {
+                "url": 'placeholder',
+                "filepath": self.data_dir / filemask.format(file),
+                "message": f"[{i + 1}/{N}] Retrieving {file}",
+                **self._freshness(self.data_dir / filemask.format(file), force_cache, final=True),
+            }
+            for i, file in enumerate(event_files)
+        ]
+        return event_files, to_read
+
+    def _use_event_table(self, materialize: bool = True) -> bool:
+        if not materialize or self.manifest is None:
+            return False
+        if self.shard is not None:
+            # The event table holds the events of all shards
+            return False
+        if not MaterializedTable.available():
+            logger.info("pyarrow is not installed. Parsing all event files.")
+            return False
+        return True
+
+    def _prune_event_table(self, event_files: list[str]) -> None:
+        """Remove the events of the selected leagues whose files are no longer cached from the event table."""
+        current = set(event_files)
+        leagues = set(self.leagues)
+        gone = [file for file, entry in self.event_table.state.items() if entry[2] in leagues and file not in current]
+        if gone:
+            print(f"Removing {len(gone)} deleted event files from the event table")
+            self.event_table.remove(gone)
+
+    def _pending_event_files(self,
+                             event_files: list[str],
+                             to_read: list[dict],
+                             ) -> tuple[dict[str, tuple[float, int]], list[dict]]:
+        """Return the stamps and read requests of the event files that are not materialized yet."""
+        stamps = self.manifest.stamps('events', self.leagues)
+        pending = set(self.event_table.pending({file: stamps[file] for file in event_files if file in stamps}))
+        stamps = {file: stamps[file] for file in event_files if file in pending}
+        return stamps, [request for file, request in zip(event_files, to_read) if file in pending]
+
+    def _materialize_events(self,
+                            dataframe: pd.DataFrame,
+                            stamps: dict[str, tuple[float, int]],
+                            new_events: pd.DataFrame,
+                            ) -> pd.DataFrame:
+        """Add newly parsed event files to the event table and return the events of the selected leagues."""
+        if stamps:
+            files = list(stamps)
+            seasons = dict(zip(dataframe['matchId'].astype(str), dataframe['season'].astype(str)))
+            partitions = {
+                file: (file.split('_')[0], seasons.get(file.split('_')[-1].split('.')[0], 'unknown'))
+                for file in files
+            }
+            print(f"Materializing {len(files)} new event files")
+            self.event_table.update(new_events, stamps, partitions)
+
+        events = self.event_table.read(self.leagues)
+        if events is None:
+            return self._parse_events([], [])
+        events.index = events.groupby(SOURCE_COLUMN, sort=False).cumcount().values
+        return self._order_event_columns(events.drop(columns=[SOURCE_COLUMN]))
 
-            fspl = file.split('_')
-            league, match_id = fspl[0].split('.')[0], fspl[-1].split('.')[0]
-            rematch = re.search(pattern=r'(\d{4}-\d{2}-\d{2})\s(.*)$', string=fspl[1])
-            date, match = rematch.group(1), rematch.group(2)
-
-            if reader:
-                event_data = json.load(reader)
-                event_df = pd.json_normalize(event_data['allEvents'])
-                event_df['league'] = league
-                event_df['match'] = match
-                event_df['matchId'] = match_id
-                event_df['matchDate'] = date
-                events.append(event_df)
-
-        events = pd.concat(events)
+    @staticmethod
+    def _order_event_columns(events: pd.DataFrame) -> pd.DataFrame:
         metacols = ['league', 'match', 'matchId', 'matchDate']
         cols = [x for x in events.columns if x not in metacols]
-        events = events[[col for col in metacols + cols if col in events.columns]]
-        return events
+        return events[[col for col in metacols + cols if col in events.columns]]
+
+    def _parse_events(self, event_files: list[str], payloads: list, source: bool = False) -> pd.DataFrame:
+        with self.metrics.timer("parse_seconds", stage="events"):
+            events = [_normalize_events(file, event_data, source) for file, event_data in zip(event_files, payloads)]
+            return self._concat_events(events)
+
+    def _parse_events_parallel(self,
+                               event_files: list[str],
+                               to_read: list[dict],
+                               workers: int,
+                               source: bool = False,
+                               ) -> pd.DataFrame:
+        """Decode and normalize cached event files on a process pool."""
+        print(f"Parsing {len(event_files)} event files on {workers} processes")
+        filepaths = [str(request["filepath"]) for request in to_read]
+        chunksize = max(1, len(event_files) // (workers * 4))
+        with self.metrics.timer("parse_seconds", stage="events"):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                events = list(executor.map(_read_events, filepaths, event_files, [source] * len(event_files),
+                                           chunksize=chunksize))
+            return self._concat_events(events)
+
+    def _concat_events(self, events: list[Optional[pd.DataFrame]]) -> pd.DataFrame:
+        events = [event_df for event_df in events if event_df is not None]
+        if not events:
+            return pd.DataFrame(columns=['league', 'match', 'matchId', 'matchDate'])
+        return self._order_event_columns(pd.concat(events))
+
+    def iter_live_events(self,
+                         intervals: Optional[dict[str, float]] = None,
+                         stop_when_idle: bool = True,
+                         dtypes: str = "object",
+                         ) -> Iterator[pd.DataFrame]:
+        """Follow the matches in progress and yield their new or changed events as they arrive.
+
+        Only matches in progress or about to start are polled, each at the interval of its state.
+        Every poll is diffed against the previous poll of the match by event id. The schedule of the
+        seasons in progress is refreshed every few minutes to pick up the matches about to start.
+        Final event files are saved to the cache, where :meth:`read_events` finds them.
+
+        Parameters
+        ----------
+        intervals : dict, optional
+            Seconds between two polls of a match by state: "upcoming", "live" or "break". Defaults
+            to :data:`_live.LIVE_INTERVALS`.
+        stop_when_idle : bool
+            Return once no match is in progress or about to start. Otherwise keep refreshing the schedule.
+        dtypes : str
+            "object" or "compact", see :meth:`read_events`.
+
+        Yields
+        ------
+        pd.DataFrame
+            New or changed events of the matches polled in one round.
+        """
+        check_dtypes(dtypes)
+        for events in self._iter_live(lambda: self._read_matches(True, None), intervals, stop_when_idle):
+            yield self._apply_dtypes(events, dtypes, EVENT_DTYPES, "events")
+
+    def _live_matches(self, dataframe: pd.DataFrame) -> dict[str, dict]:
+        """Return the kickoff (UNIX timestamp), league, date and name of the unfinished matches, keyed by matchId."""
+        dataframe = expand(dataframe, {'matchDate': '%Y-%m-%d'})
+        pending = self._shard_frame(dataframe[dataframe['matchStatus'].isin(LIVE_STATUSES)], ['matchId'], self.shard)
+        kickoffs = pd.to_datetime(pending['matchDate'] + ' ' + pending['matchTime'].astype(str).str.rstrip('Z'),
+                                  utc=True, errors='coerce')
+        return {
+            str(match['matchId']): {
+                "kickoff": kickoff.timestamp(),
+                "league": match['league'],
+                "match": match['match'],
+                "matchId": str(match['matchId']),
+                "matchDate": match['matchDate'],
+            }
+            for match, kickoff in zip(pending.to_dict('records'), kickoffs)
+            if not pd.isnull(kickoff)
+        }
+
+    def _live_requests(self, matches: dict[str, dict], match_ids: list[str]) -> dict[str, dict]:
+        """Return the requests of the live event feeds of `match_ids`, with the cache path of their final payload."""
+        filemask = "events/{}_{}_{}.html"
+        urlmask = SCORESWAY_API + "/{}/ft1tiv1inq7v1sk3y9tv12yh5/{}?_rt=c&_lcl=en&_fmt=jsonp&sps=widgets&_clbk={}"
+        to_fetch = {}
+        for match_id in match_ids:
+            match = matches[match_id]
+            gkey = match['matchDate'] + ' ' + match['match'].replace('/', '')
+            callback_id = self.generate_callback_id(k=40)
+            to_fetch[match_id] = {
+                "url": urlmask.format('matchevent', match_id, callback_id),
+                "filepath": self.data_dir / filemask.format(match['league'], gkey, match_id),
+                "var": 'liveData',
+                "clbk": callback_id,
+            }
+        return to_fetch
+
+    @staticmethod
+    def _live_state(data: dict) -> str:
+        details = data['liveData'].get('matchDetails', {})
+        status, period = details.get('matchStatus'), details.get('periodId')
+        if status in ('Played', 'Postponed', 'Cancelled', 'Awarded') or period == 14:
+            return FINAL
+        if status == 'Suspended' or period in (10, 11, 12, 13):
+            # Half time, end of regular time, extra time half time, end of extra time
+            return BREAK
+        if status == 'Playing':
+            return LIVE
+        return UPCOMING
+
+    @staticmethod
+    def _live_events(data: dict) -> list[dict]:
+        return data['liveData'].get('event', [])
+
+    @staticmethod
+    def _live_event_key(event: dict) -> Any:
+        return event.get('id')
+
+    @staticmethod
+    def _live_final_payload(data: dict) -> Optional[dict]:
+        """Return the event file of a final match, or None if it was not played."""
+        if data['liveData'].get('matchDetails', {}).get('matchStatus') != 'Played':
+            return None
+        return {'allEvents': data['liveData'].get('event', [])}
+
+    def _live_frame(self, match: dict, events: list[dict]) -> pd.DataFrame:
+        event_df = pd.json_normalize(events)
+        for col in ('league', 'match', 'matchId', 'matchDate'):
+            event_df[col] = match[col]
+        return self._order_event_columns(event_df)
 
     def read_player_stats(self):
         pass
@@ -539,3 +901,168 @@ class Scoresway(RequestReader):
         pass
 
 
+
+
+class AsyncScoresway(Scoresway, AsyncRequestReader):
+    """Scoresway reader with asyncio ``read_*`` methods.
+
+    Usage::
+
+        async with AsyncScoresway(leagues="DEN-Superliga") as sw:
+            events = await sw.read_events()
+    """
+
+    source = "Scoresway"
+
+    async def read_leagues(self) -> pd.DataFrame:
+        return self._parse_leagues(await self._read_leagues())
+
+    async def _read_leagues(self, no_cache: bool = False) -> dict:
+        return await self.get_json(**self._leagues_request(no_cache))
+
+    async def read_seasons(self) -> pd.DataFrame:
+        return await self._read_seasons(self.shard)
+
+    async def _read_seasons(self, shard: Optional[Shard]) -> pd.DataFrame:
+        df_leagues = self._shard_frame(await self.read_leagues(), ["league"], shard)
+        payloads = await self.get_many_json(self._seasons_requests(df_leagues))
+        return self._parse_seasons(df_leagues, payloads)
+
+    async def read_matches(self, force_cache: bool = False,
+                           truncated: bool = False,
+                           var: bool = False,
+                           dtypes: str = "object",
+                           ) -> pd.DataFrame:
+        check_dtypes(dtypes)
+        df = await self._read_matches(force_cache, self.shard, truncated=truncated, var=var)
+        return self._apply_dtypes(df, dtypes, MATCH_DTYPES, "matches")
+
+    async def _read_matches(self,
+                            force_cache: bool,
+                            shard: Optional[Shard],
+                            truncated: bool = False,
+                            var: bool = False,
+                            ) -> pd.DataFrame:
+        df_seasons = self._shard_frame(await self._read_seasons(None), ["league", "seasonId"], shard)
+        to_fetch = self._matches_requests(df_seasons, force_cache)
+        payloads = await self.get_many_json(to_fetch)
+        return self._parse_matches(df_seasons, to_fetch, payloads, truncated=truncated, var=var)
+
+    async def read_events(self,
+                          force_cache: bool = False,
+                          dataframe: Optional[pd.DataFrame] = None,
+                          materialize: bool = False,
+                          parse_workers: Optional[int] = None,
+                          dtypes: str = "object",
+                          ):
+        check_dtypes(dtypes)
+        if not isinstance(dataframe, pd.DataFrame):
+            dataframe = await self._read_matches(force_cache, None)
+
+        await self._fetch_events(self._events_requests(dataframe, force_cache))
+        return self._read_event_files(dataframe, force_cache, materialize, parse_workers, dtypes)
+
+    async def iter_events(self,
+                          batch_size: int = 50,
+                          force_cache: bool = False,
+                          dataframe: Optional[pd.DataFrame] = None,
+                          dtypes: str = "object",
+                          ) -> AsyncIterator[pd.DataFrame]:
+        check_dtypes(dtypes)
+        if not isinstance(dataframe, pd.DataFrame):
+            dataframe = await self._read_matches(force_cache, None)
+
+        for batch, event_files in self._event_batches(self._events_requests(dataframe, force_cache), batch_size):
+            await self._fetch_events(batch)
+            events = self._parse_event_batch(event_files)
+            if events is not None:
+                yield self._apply_dtypes(events, dtypes, EVENT_DTYPES, "events")
+
+    async def _fetch_events(self, to_fetch: dict[str, dict]) -> None:
+        await self._crawl("events", to_fetch)
+
+    async def iter_live_events(self,
+                               intervals: Optional[dict[str, float]] = None,
+                               stop_when_idle: bool = True,
+                               dtypes: str = "object",
+                               ) -> AsyncIterator[pd.DataFrame]:
+        check_dtypes(dtypes)
+        async for events in self._iter_live(lambda: self._read_matches(True, None), intervals, stop_when_idle):
+            yield self._apply_dtypes(events, dtypes, EVENT_DTYPES, "events")
+
+
+def _normalize_events(file: str, event_data: Optional[dict], source: bool = False) -> Optional[pd.DataFrame]:
+    """Normalize the events of a cached event file into a dataframe."""
+    if not event_data:
+        return None
+
+    fspl = file.split('_')
+    league, match_id = fspl[0].split('.')[0], fspl[-1].split('.')[0]
+    rematch = re.search(pattern=r'(\d{4}-\d{2}-\d{2})\s(.*)$', string=fspl[1])
+    date, match = rematch.group(1), rematch.group(2)
+
+    event_df = pd.json_normalize(event_data['allEvents'])
+    event_df['league'] = league
+    event_df['match'] = match
+    event_df['matchId'] = match_id
+    event_df['matchDate'] = date
+    if source:
+        event_df[SOURCE_COLUMN] = file
+    return event_df
+
+
+def _read_events(filepath: str, file: str, source: bool = False) -> Optional[pd.DataFrame]:
+    """Read and normalize a cached event file. Runs in a worker process."""
+    try:
+        with open(filepath, "rb") as fh:
+            event_data = codec.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    return _normalize_events(file, event_data, source)
+
+
+# Column name prefixes of the match official types
+OFFICIAL_TYPES = {
+    "Main": "refMain",
+    "Assistant referee 1": "refAss1",
+    "Assistant referee 2": "refAss2",
+    "Fourth official": "refFourth",
+    "Video Assistant Referee": "refVar",
+    "Assistant VAR Official": "refAssVar"
+}
+
+
+def _split_contestants(contestants: pd.Series) -> tuple[list[dict], list[dict]]:
+    """Split the [home, away] contestant lists of the matches into home and away records."""
+    home, away = [], []
+    for teams in contestants:
+        teams = teams if isinstance(teams, list) else []
+        home.append(teams[0] if len(teams) > 0 else {})
+        away.append(teams[1] if len(teams) > 1 else {})
+    return home, away
+
+
+def _flatten_officials(officials: Optional[list]) -> dict:
+    """Flatten the match officials of a match into refMainId, refMainFirstName, ... fields."""
+    record = {}
+    if not isinstance(officials, list):
+        return record
+    for official in officials:
+        ref_type = OFFICIAL_TYPES.get(official.get('type', ''), official.get('type', '').replace(" ", ""))
+        for k, norm_k in (('id', 'Id'), ('firstName', 'FirstName'), ('lastName', 'LastName')):
+            if k in official:
+                record[f"{ref_type}{norm_k}"] = official[k]
+    return record
+
+
+def _flatten_periods(periods: Optional[list]) -> dict:
+    """Flatten the periods of a match into matchPeriod1StartTime, matchPeriod1EndTime, ... fields."""
+    record = {}
+    if not isinstance(periods, list):
+        return record
+    for i, period in enumerate(periods, start=1):
+        for k, norm_k in (('start', 'StartTime'), ('end', 'EndTime'), ('lengthMin', 'LengthMin'),
+                          ('lengthSec', 'LengthSec')):
+            if k in period:
+                record[f"matchPeriod{i}{norm_k}"] = period[k]
+    return record
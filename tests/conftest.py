@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "soccerscraper"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+# Keep the logs and default data directory of the tests out of the configured one
+os.environ["SOCCERSCRAPER_DIR"] = tempfile.mkdtemp(prefix="soccerscraper-tests-")
+# Replayed responses need no pacing
+os.environ["SOCCERSCRAPER_RATE"] = os.environ["SOCCERSCRAPER_MAXRATE"] = "1000"
+
+# The live tests scrape the real sites when they are imported
+collect_ignore = [] if os.environ.get("SOCCERSCRAPER_LIVE_TESTS") else ["test_FotMob.py", "test_scoresway.py"]
+
+N_MATCHES = 6
+N_EVENTS = 20
+
+
+@pytest.fixture(scope="session")
+def fixture_dir(tmp_path_factory) -> Path:
+    """Synthetic fixture with the cache files and recorded responses of one league and season."""
+    from fixtures import synthesize
+
+    return synthesize(tmp_path_factory.mktemp("fixture"), n_matches=N_MATCHES, n_events=N_EVENTS)
+
+
+@pytest.fixture
+def replay_reader(fixture_dir, tmp_path):
+    """Return a factory of readers with an empty cache that download from the recorded responses."""
+    from _replay import ReplayAdapter
+    from fixtures import SOURCES, fixture_leagues
+
+    def make(reader_class, **kwargs):
+        source = reader_class.source or reader_class.__name__
+        transport = ReplayAdapter(fixture_dir / "responses" / SOURCES[source])
+        kwargs.setdefault("data_dir", tmp_path / "data" / source)
+        return reader_class(leagues=fixture_leagues(1), transport=transport, **kwargs)
+
+    return make
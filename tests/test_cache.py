@@ -0,0 +1,136 @@
+import os
+
+from _cache import CacheManifest, FreshnessPolicy, ParsedCache, path_fields
+
+
+def _cache_file(root, relpath, payload=b"{}"):
+    filepath = root / relpath
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_bytes(payload)
+    return filepath
+
+
+def test_path_fields():
+    assert path_fields("matches/ENG-Premier League_2324_123.json") == {
+        "folder": "matches", "league": "ENG-Premier League", "season": "2324", "matchId": "123",
+    }
+    assert path_fields("events/DEN-Superliga_2024-05-01 AGF-FCK_9.json") == {
+        "folder": "events", "league": "DEN-Superliga", "season": None, "matchId": "9",
+    }
+    assert path_fields("leagues/allLeagues.json")["season"] is None
+
+
+def test_lookup_files_and_stamps(tmp_path):
+    manifest = CacheManifest(tmp_path)
+    eng = _cache_file(tmp_path, "seasons/ENG-Premier League_2324.json")
+    den = _cache_file(tmp_path, "seasons/DEN-Superliga_2324.json")
+    failed = _cache_file(tmp_path, "seasons/DEN-Superliga_2223.json")
+    manifest.record(eng, size=2, fetched_at=100.0)
+    manifest.record(den, size=3, fetched_at=200.0)
+    manifest.record(failed, status="failed")
+    assert manifest.lookup(eng) == (100.0, 2, "ok", 0)
+    assert manifest.lookup(tmp_path / "seasons/missing.json") is None
+    # Failed downloads are indexed, but not listed as cached files
+    assert sorted(manifest.files("seasons")) == ["DEN-Superliga_2324.json", "ENG-Premier League_2324.json"]
+    assert manifest.files("seasons", leagues=["DEN-Superliga"]) == ["DEN-Superliga_2324.json"]
+    assert manifest.files("matches") == []
+    assert manifest.stamps("seasons", leagues=["ENG-Premier League"]) == {"ENG-Premier League_2324.json": (100.0, 2)}
+    manifest.remove(eng)
+    assert manifest.lookup(eng) is None
+
+
+def test_record_keeps_validators(tmp_path):
+    manifest = CacheManifest(tmp_path)
+    filepath = _cache_file(tmp_path, "seasons/ENG-Premier League_2324.json")
+    manifest.record(filepath, url="https://example.com/a", size=2, etag='"v1"', last_modified="Mon")
+    manifest.record(filepath, size=2)
+    assert manifest.validators(filepath) == ('"v1"', "Mon")
+    manifest.record(filepath, size=2, etag='"v2"')
+    assert manifest.validators(filepath) == ('"v2"', "Mon")
+
+
+def test_rebuild_keeps_indexed_entries(tmp_path):
+    manifest = CacheManifest(tmp_path)
+    frozen = _cache_file(tmp_path, "matches/ENG-Premier League_2324_1.json")
+    other = _cache_file(tmp_path, "matches/ENG-Premier League_2324_2.json")
+    manifest.record(frozen, url="https://example.com/1", size=2, etag='"v1"')
+    manifest.freeze(frozen)
+    manifest.remove(other)
+    assert manifest.rebuild() == 2
+    assert manifest.is_frozen(frozen)
+    assert manifest.validators(frozen) == ('"v1"', None)
+    assert not manifest.is_frozen(other)
+    assert sorted(manifest.files("matches")) == ["ENG-Premier League_2324_1.json", "ENG-Premier League_2324_2.json"]
+
+
+def test_rebuild_keeps_concurrent_records(tmp_path, monkeypatch):
+    manifest = CacheManifest(tmp_path)
+    scanned = _cache_file(tmp_path, "seasons/ENG-Premier League_2324.json")
+    manifest.record(tmp_path / "seasons/DEN-Superliga_2021.json", size=2, fetched_at=1.0)
+    walk = os.walk
+
+    def walk_and_record(root):
+        # Another reader downloads two files while the directory is scanned
+        yield from walk(root)
+        manifest.record(scanned, url="https://example.com/eng", size=2)
+        manifest.record(_cache_file(tmp_path, "seasons/DEN-Superliga_2324.json"), size=2)
+
+    monkeypatch.setattr(os, "walk", walk_and_record)
+    assert manifest.rebuild() == 1
+    assert sorted(manifest.files("seasons")) == ["DEN-Superliga_2324.json", "ENG-Premier League_2324.json"]
+    assert manifest.lookup(scanned)[1] == 2
+    # Entries of files that no longer exist are removed
+    assert manifest.lookup(tmp_path / "seasons/DEN-Superliga_2021.json") is None
+
+
+def test_rebuild_skips_tables(tmp_path):
+    manifest = CacheManifest(tmp_path)
+    _cache_file(tmp_path, "events/ENG-Premier League_1.json")
+    _cache_file(tmp_path, "tables/events/_state.json")
+    _cache_file(tmp_path, "tables/events/league=ENG-Premier League/season=2324/part-1.parquet")
+    assert manifest.rebuild() == 1
+    assert manifest.lookup(tmp_path / "tables/events/_state.json") is None
+
+
+def test_record_keeps_frozen(tmp_path):
+    manifest = CacheManifest(tmp_path)
+    filepath = _cache_file(tmp_path, "matches/ENG-Premier League_2324_1.json")
+    manifest.record(filepath, size=2)
+    manifest.freeze(filepath)
+    manifest.record(filepath, size=2)
+    assert manifest.is_frozen(filepath)
+
+
+def test_season_with_cancelled_matches_is_final():
+    policy = FreshnessPolicy()
+    assert policy.season_is_final(statuses=["FT", "FT", "Canc", "PP"])
+    assert not policy.season_is_final(statuses=["FT", "NS"])
+    assert not policy.season_is_final(statuses=["PP"])
+    assert not policy.season_is_final(statuses=[])
+    assert policy.season_is_final(end_date="2020-05-31", statuses=["NS"])
+
+
+def test_parsed_cache_evicts_least_recently_used():
+    cache = ParsedCache(max_bytes=10)
+    cache.put("a", {"a": 1}, 4)
+    cache.put("b", {"b": 1}, 4)
+    assert cache.get("a") == {"a": 1}
+    cache.put("c", {"c": 1}, 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"a": 1} and cache.get("c") == {"c": 1}
+    assert cache.currsize == 8 and len(cache) == 2
+    # Payloads beyond the budget are not kept at all
+    cache.put("d", {"d": 1}, 11)
+    assert cache.get("d") is None and len(cache) == 2
+    assert ParsedCache().get("a") is None
+
+
+def test_parsed_cache_drops_modified_files(tmp_path):
+    cache = ParsedCache(max_bytes=100)
+    filepath = _cache_file(tmp_path, "leagues/allLeagues.json", b'{"a": 1}')
+    cache.put(str(filepath), {"a": 1}, 8, filepath)
+    assert cache.get(str(filepath), filepath) == {"a": 1}
+    filepath.write_bytes(b'{"a": 2}')
+    os.utime(filepath, ns=(0, 0))
+    assert cache.get(str(filepath), filepath) is None
+    assert cache.currsize == 0
@@ -0,0 +1,44 @@
+import importlib.util
+
+import pytest
+
+import _codec as codec
+
+
+def _missing():
+    raise ImportError
+
+
+def test_loads_accepts_buffers():
+    assert codec.loads(b'{"a": [1]}') == codec.loads(memoryview(b'x{"a": [1]}x')[1:-1]) == {"a": [1]}
+    assert codec.loads('{"a": [1]}') == {"a": [1]}
+    assert codec.loads(bytearray(b"[]")) == []
+
+
+def test_fallback_to_stdlib():
+    # Integers beyond 64 bits are rejected by orjson and msgspec, but not by the standard library
+    big = 2 ** 70
+    assert codec.loads(f'{{"id": {big}}}'.encode()) == {"id": big}
+    assert codec.loads(codec.dumps({"id": big})) == {"id": big}
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+def test_select(monkeypatch):
+    assert codec._select("json")[0] == "json"
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        codec._select("simplejson")
+    monkeypatch.setitem(codec._BACKENDS, "orjson", _missing)
+    monkeypatch.setitem(codec._BACKENDS, "msgspec", _missing)
+    with pytest.raises(ImportError, match="not installed"):
+        codec._select("orjson")
+    # Without any of the fast backends, "auto" selects the standard library
+    assert codec._select("auto")[0] == "json"
+
+
+@pytest.mark.skipif(importlib.util.find_spec("orjson") is None, reason="orjson is not installed")
+def test_auto_prefers_orjson():
+    assert codec._select("auto")[0] == "orjson"
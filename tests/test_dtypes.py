@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from _dtypes import check_dtypes, compact, expand
+
+SPEC = {"league": "category", "matchId": "int", "xG": "float", "matchDate": "%Y-%m-%d", "missing": "int"}
+
+
+def _frame():
+    return pd.DataFrame({
+        "league": ["ENG-Premier League"] * 3,
+        "matchId": ["1", "2", None],
+        "xG": ["0.5", "1.25", "x"],
+        "matchDate": ["2023-08-11", "2023-08-12", "unknown"],
+    })
+
+
+def test_check_dtypes():
+    check_dtypes("compact")
+    with pytest.raises(ValueError):
+        check_dtypes("small")
+
+
+def test_compact():
+    df = compact(_frame(), SPEC)
+    assert isinstance(df["league"].dtype, pd.CategoricalDtype)
+    assert str(df["matchId"].dtype) == "Int32"
+    assert df["matchId"].isna().tolist() == [False, False, True]
+    assert str(df["xG"].dtype) == "float32"
+    assert str(df["matchDate"].dt.tz) == "UTC"
+    assert df["matchDate"].isna().tolist() == [False, False, True]
+    assert set(df.attrs["memory"]) == {"before", "after"}
+
+
+def test_expand_undoes_compact():
+    df = expand(compact(_frame(), SPEC), {"matchDate": "%Y-%m-%d"})
+    assert df["league"].dtype == object
+    assert df["matchDate"].tolist()[:2] == ["2023-08-11", "2023-08-12"]
+    assert (df["league"] + "/" + df["matchDate"].fillna("")).iloc[0] == "ENG-Premier League/2023-08-11"
+
+
+def test_duplicate_columns_are_left_as_they_are():
+    df = compact(_frame(), SPEC)
+    df = pd.concat([df, df[["league"]]], axis=1)
+    assert df.columns.tolist().count("league") == 2
+    assert expand(df, {"matchDate": "%Y-%m-%d"}).equals(df.assign(matchDate=df["matchDate"].dt.strftime("%Y-%m-%d")))
+    assert compact(df, SPEC).columns.tolist() == df.columns.tolist()
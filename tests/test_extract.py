@@ -0,0 +1,50 @@
+from _extract import extract, jsonp_body, json_scripts, option_values
+
+SEASON_PAGE = b"""<html><body>
+<div class="season-select" id="seasonlist">
+<select>
+  <option value="/soccer/denmark/superliga-2023-2024/">2023/2024</option>
+  <option value='/soccer/denmark/superliga-2022-2023/' selected>2022/2023</option>
+  <option value=/soccer/denmark/superliga-2021-2022/>2021/2022</option>
+  <option value="/soccer/denmark/a&amp;b/">A&amp;B</option>
+</select>
+</div>
+<div id="other"><option value="/elsewhere/"></div>
+</body></html>"""
+
+
+def test_jsonp_body():
+    raw = b'/**/ cb_123({"match": [1, 2], "text": "(a)"});'
+    assert bytes(jsonp_body(raw, "cb_123")) == b'{"match": [1, 2], "text": "(a)"}'
+    assert jsonp_body(raw, "other") is None
+    assert jsonp_body(b"cb(", "cb") is None
+
+
+def test_extract_jsonp_vars():
+    raw = b'cb({"liveData": {"event": [{"id": 1}], "matchDetails": {}}, "matchInfo": {}})'
+    assert extract(raw, "allEvents", clbk="cb") == {"allEvents": [{"id": 1}]}
+    assert extract(raw, "liveData", clbk="cb") == {"liveData": {"event": [{"id": 1}], "matchDetails": {}}}
+    assert extract(raw, "allEvents", clbk="other") is None
+    assert extract(b"cb({not json})", "allEvents", clbk="cb") is None
+
+
+def test_option_values():
+    assert option_values(SEASON_PAGE, "seasonlist") == [
+        "/soccer/denmark/superliga-2023-2024/",
+        "/soccer/denmark/superliga-2022-2023/",
+        "/soccer/denmark/superliga-2021-2022/",
+        "/soccer/denmark/a&b/",
+    ]
+    assert option_values(SEASON_PAGE, "missing") == []
+    assert extract(SEASON_PAGE, "seasons")["seasons"][0] == "/soccer/denmark/superliga-2023-2024/"
+
+
+def test_script_vars():
+    raw = b"""<script>var x = 1;</script>
+<script type="application/json">{"broken": </script>
+<SCRIPT TYPE='application/json' id="a">{"seasons": [2023], "name": "a"}</SCRIPT>
+<script type="application/json">{"teams": ["b"]}</script>"""
+    assert len(list(json_scripts(raw))) == 3
+    # Only the blocks that define the variable are merged
+    assert extract(raw, "seasons") == {"seasons": [2023], "name": "a"}
+    assert extract(raw, "missing") is None
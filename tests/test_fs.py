@@ -0,0 +1,35 @@
+from _fs import atomic_write, connect, file_lock, lock_path, written_since
+
+
+def test_atomic_write(tmp_path):
+    filepath = tmp_path / "a.json"
+    atomic_write(filepath, b"{}")
+    atomic_write(filepath, b"[]")
+    assert filepath.read_bytes() == b"[]"
+    assert [path.name for path in tmp_path.iterdir()] == ["a.json"]
+    assert written_since(filepath, 0)
+    assert not written_since(tmp_path / "b.json", 0)
+
+
+def test_locks_are_per_file(tmp_path):
+    paths = [lock_path(tmp_path, tmp_path / "matches" / f"{i}.json") for i in range(2000)]
+    assert len(set(paths)) == len(paths)
+    assert lock_path(tmp_path, tmp_path / "matches" / "0.json") == paths[0]
+    with file_lock(paths[0]) as acquired:
+        assert acquired
+        # Another file can be downloaded meanwhile, the same file cannot
+        with file_lock(paths[1], blocking=False) as acquired:
+            assert acquired
+        with file_lock(paths[0], blocking=False) as acquired:
+            assert not acquired
+
+
+def test_locks_do_not_depend_on_the_mount_point(tmp_path):
+    # The same cache directory mounted at two paths, e.g. on two machines
+    assert lock_path(tmp_path / "a", tmp_path / "a" / "matches" / "0.json").relative_to(tmp_path / "a") == \
+        lock_path(tmp_path / "b", tmp_path / "b" / "matches" / "0.json").relative_to(tmp_path / "b")
+
+
+def test_shared_databases_keep_the_rollback_journal(tmp_path):
+    assert connect(tmp_path / "local.sqlite").execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert connect(tmp_path / "shared.sqlite", shared=True).execute("PRAGMA journal_mode").fetchone() == ("delete",)
@@ -0,0 +1,39 @@
+import sys
+import subprocess
+
+from conftest import ROOT
+
+NETWORK_MODULES = ["requests", "cloudscraper", "httpx", "bs4", "rich"]
+
+
+def _imported(statement):
+    code = f"import sys; sys.path.insert(0, {str(ROOT / 'soccerscraper')!r}); {statement}; print(*sorted(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_readers_import_no_network_clients():
+    modules = _imported("import fotmob, scoresway")
+    assert not modules & set(NETWORK_MODULES)
+
+
+def test_cache_tools_import_no_pandas():
+    # The manifest and journal command lines start without pandas, numpy or pyarrow
+    modules = _imported("import _cache, _journal, _fs, _shard, _live")
+    assert not modules & {"pandas", "numpy", "pyarrow", *NETWORK_MODULES}
+
+
+def test_teamname_replacements_constant():
+    from _cfg import TEAMNAME_REPLACEMENTS, teamname_replacements
+
+    assert TEAMNAME_REPLACEMENTS == teamname_replacements()
+
+
+def test_creating_a_reader_touches_no_files(replay_reader, tmp_path):
+    from fotmob import FotMob
+
+    fm = replay_reader(FotMob, data_dir=tmp_path / "FotMob")
+    assert not (tmp_path / "FotMob").exists()
+    assert fm.transport.stats().get("served", 0) == 0
+    fm.read_leagues()
+    assert (tmp_path / "FotMob" / "manifest.sqlite").exists()
@@ -0,0 +1,58 @@
+import time
+
+from _journal import CrawlJournal, PENDING, DONE, FAILED
+
+REQUESTS = {str(i): {"url": f"https://example.com/{i}"} for i in range(5)}
+
+
+def test_claim_and_finish(tmp_path):
+    journal = CrawlJournal(tmp_path, max_attempts=2)
+    plan = journal.plan("games", REQUESTS)
+    started = time.time()
+    claimed = journal.claim("games", plan, limit=3, retry_before=started)
+    assert [(item, request["url"]) for item, request in claimed] == [
+        ("0", "https://example.com/0"), ("1", "https://example.com/1"), ("2", "https://example.com/2"),
+    ]
+    journal.complete("games", "0")
+    journal.fail("games", "1", "HTTPError")
+    journal.release("games", "2")
+    assert journal.counts("games") == {PENDING: 3, DONE: 1, FAILED: 1}
+    assert journal.unfinished("games", plan) == {"1": "HTTPError", "2": PENDING, "3": PENDING, "4": PENDING}
+    # Failures of this run are not retried right away
+    assert [item for item, _ in journal.claim("games", plan, limit=10, retry_before=started)] == ["2", "3", "4"]
+
+
+def test_claim_only_planned_items(tmp_path):
+    journal = CrawlJournal(tmp_path)
+    journal.plan("games", {"0": REQUESTS["0"]})
+    plan = journal.plan("games", {"1": REQUESTS["1"]})
+    assert [item for item, _ in journal.claim("games", plan, limit=10)] == ["1"]
+    journal.discard(plan)
+    assert journal.claim("games", plan, limit=10) == []
+
+
+def test_resume_after_interrupt(tmp_path):
+    journal = CrawlJournal(tmp_path)
+    plan = journal.plan("games", REQUESTS)
+    for item, _ in journal.claim("games", plan, limit=2):
+        journal.complete("games", item)
+    journal.claim("games", plan, limit=1)
+    journal.release_all("games", plan)
+    journal.close()
+
+    # A new run plans the same items and only gets those that are not done
+    journal = CrawlJournal(tmp_path)
+    plan = journal.plan("games", {item: REQUESTS[item] for item in ("2", "3", "4")})
+    assert [item for item, _ in journal.claim("games", plan, limit=10)] == ["2", "3", "4"]
+
+
+def test_failed_items_run_out_of_attempts(tmp_path):
+    journal = CrawlJournal(tmp_path, max_attempts=2)
+    plan = journal.plan("games", {"0": REQUESTS["0"]})
+    for _ in range(2):
+        assert journal.claim("games", plan, limit=1, retry_before=float("inf"))
+        journal.fail("games", "0", "timeout")
+    assert journal.claim("games", plan, limit=1, retry_before=float("inf")) == []
+    assert journal.failed("games", exhausted=True) == {"0": "timeout"}
+    assert journal.reset("games") == 1
+    assert journal.claim("games", plan, limit=1)
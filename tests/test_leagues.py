@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+import _leagues
+from _leagues import LeagueRegistry
+
+LEAGUE_DICT = {
+    "GER-Bundesliga": {"FotMob": "Bundesliga", "countryName": "Germany", "countryCode": "GER"},
+    "AUT-Bundesliga": {"FotMob": "Bundesliga", "countryName": "Austria", "countryCode": "AUT"},
+    "ITA-Serie A": {"FotMob": "Serie A", "countryName": "Italy", "countryCode": "ITA"},
+    "ENG-Premier League": {"Scoresway": "Premier League", "countryName": "England", "countryCode": "ENG"},
+}
+
+
+@pytest.fixture
+def registry(monkeypatch) -> LeagueRegistry:
+    monkeypatch.setattr(_leagues, "LEAGUE_DICT", LEAGUE_DICT)
+    return LeagueRegistry("FotMob")
+
+
+def test_available(registry):
+    assert registry.available == ["AUT-Bundesliga", "GER-Bundesliga", "ITA-Serie A"]
+
+
+def test_same_league_name_in_two_countries(registry):
+    assert registry.canonical("Bundesliga", "Germany") == "GER-Bundesliga"
+    assert registry.canonical("Bundesliga", "Austria") == "AUT-Bundesliga"
+    assert registry.canonical("Bundesliga", "AUT", level="code") == "AUT-Bundesliga"
+    assert registry.canonical("Bundesliga", "Switzerland") is None
+
+
+def test_translate(registry):
+    leagues = pd.Series(["Bundesliga", "Bundesliga", "Serie A", "Premier League"], index=[3, 5, 7, 9], name="league")
+    countries = pd.Series(["AUT", "GER", "ITA", "ENG"], index=leagues.index)
+    translated = registry.translate(leagues, countries, level="code")
+    assert translated.name == "league"
+    assert list(translated.index) == [3, 5, 7, 9]
+    assert translated.iloc[:3].tolist() == ["AUT-Bundesliga", "GER-Bundesliga", "ITA-Serie A"]
+    assert pd.isna(translated.iloc[3])
+
+
+def test_invalid_level(registry):
+    with pytest.raises(ValueError):
+        registry.canonical("Bundesliga", "Germany", level="continent")
@@ -0,0 +1,133 @@
+import time
+import asyncio
+
+import pytest
+
+import _live
+from _live import BREAK, FINAL, LIVE, UPCOMING, LiveTracker
+from fotmob import FotMob, AsyncFotMob
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the tracker by a list holding the current time."""
+    now = [1000.0]
+    monkeypatch.setattr(_live.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _key(event):
+    return event["id"]
+
+
+def test_plan_follows_matches_in_progress_or_about_to_start(clock):
+    tracker = LiveTracker(window=600)
+    now = time.time()
+    tracker.plan({"started": now - 3600, "soon": now + 300, "later": now + 3600, "old": now - 5 * 3600})
+    assert tracker.due() == ["started", "soon"]
+    assert not tracker.schedule_due()
+    clock[0] += 300
+    assert tracker.schedule_due()
+
+
+def test_update_returns_new_and_changed_events(clock):
+    tracker = LiveTracker(intervals={LIVE: 20})
+    tracker.plan({"m": time.time()})
+    goal = {"id": 1, "type": "Goal", "player": "A"}
+    assert tracker.update("m", LIVE, [goal], key=_key) == [goal]
+    assert tracker.due() == []
+    assert tracker.wait() == 20
+    clock[0] += 20
+    card = {"id": 2, "type": "Card"}
+    corrected = {**goal, "player": "B"}
+    assert tracker.update("m", BREAK, [corrected, card], key=_key) == [corrected, card]
+    assert tracker.update("m", BREAK, [corrected, card], key=_key) == []
+    assert tracker.update("m", FINAL, [corrected, card], key=_key) == []
+    assert tracker.idle and tracker.final == {"m"}
+    # Final matches are not followed again when the schedule is refreshed
+    tracker.plan({"m": time.time()})
+    assert tracker.idle
+
+
+def test_retry_polls_at_the_live_interval(clock):
+    tracker = LiveTracker(intervals={LIVE: 15, UPCOMING: 60})
+    tracker.plan({"m": time.time() + 60})
+    tracker.retry("m")
+    clock[0] += 15
+    assert tracker.due() == ["m"]
+    assert tracker.stats() == {"followed": 1, "final": 0}
+
+
+def _details(match_id, status, events):
+    return {
+        "general": {"matchId": match_id},
+        "header": {"status": status},
+        "content": {"matchFacts": {"events": {"events": events}}},
+    }
+
+
+def test_fotmob_live_state():
+    assert FotMob._live_state(_details(1, {"started": False}, [])) == UPCOMING
+    assert FotMob._live_state(_details(1, {"started": True, "liveTime": {"short": "23'"}}, [])) == LIVE
+    assert FotMob._live_state(_details(1, {"started": True, "liveTime": {"short": "HT"}}, [])) == BREAK
+    assert FotMob._live_state(_details(1, {"started": True, "finished": True}, [])) == FINAL
+    assert FotMob._live_state(_details(1, {"cancelled": True}, [])) == FINAL
+    assert FotMob._live_state({}) == UPCOMING
+
+
+def test_fotmob_live_round(replay_reader):
+    fm = replay_reader(FotMob)
+    tracker = LiveTracker()
+    matches = {
+        match_id: {"kickoff": time.time(), "league": "ENG-Premier League", "season": "2425", "match": match_id,
+                   "matchId": match_id}
+        for match_id in ("1", "2", "3")
+    }
+    tracker.plan({match_id: match["kickoff"] for match_id, match in matches.items()})
+    requests = fm._live_requests(matches, ["1", "2", "3"])
+    goal = {"eventId": 7, "type": "Goal", "time": 12}
+    payloads = [
+        _details(1, {"started": True, "liveTime": {"short": "12'"}}, [goal]),
+        _details(2, {"started": True, "finished": True}, [{"eventId": 9, "type": "Card", "time": 80}]),
+        None,
+    ]
+    events = fm._live_round(tracker, matches, requests, payloads)
+    assert events[["matchId", "eventId", "type"]].values.tolist() == [["1", 7, "Goal"], ["2", 9, "Card"]]
+    assert fm.stats()["live_events"] == 2
+    # The final payload is saved to the cache and frozen
+    assert requests["2"]["filepath"].exists()
+    assert fm.manifest.is_frozen(requests["2"]["filepath"])
+    assert not requests["1"]["filepath"].exists()
+    assert fm._live_round(tracker, matches, {"1": requests["1"]}, payloads[:1]) is None
+    assert tracker.final == {"2"}
+
+
+def _follow_one_final_match(fm, monkeypatch):
+    match = {"kickoff": time.time(), "league": "ENG-Premier League", "season": "2425", "match": "1", "matchId": "1"}
+    final = _details(1, {"started": True, "finished": True}, [{"eventId": 9, "type": "Card", "time": 80}])
+    monkeypatch.setattr(fm, "_live_matches", lambda df_matches: {"1": match})
+    return [final]
+
+
+def test_iter_live_events(replay_reader, monkeypatch):
+    fm = replay_reader(FotMob)
+    payloads = _follow_one_final_match(fm, monkeypatch)
+    monkeypatch.setattr(fm, "_poll", lambda requests: payloads)
+    rounds = list(fm.iter_live_events())
+    assert [events["eventId"].tolist() for events in rounds] == [[9]]
+
+
+def test_async_iter_live_events(replay_reader, monkeypatch):
+    fm = replay_reader(AsyncFotMob)
+    payloads = _follow_one_final_match(fm, monkeypatch)
+
+    async def poll(requests):
+        return payloads
+
+    async def follow():
+        async with fm:
+            return [events async for events in fm.iter_live_events()]
+
+    monkeypatch.setattr(fm, "_poll", poll)
+    rounds = asyncio.run(follow())
+    assert [events["eventId"].tolist() for events in rounds] == [[9]]
@@ -0,0 +1,68 @@
+import urllib.request
+
+from _metrics import Histogram, Metrics
+from scoresway import Scoresway
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [("0.1", 1), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.99) == 3.0
+    assert histogram.summary()["count"] == 4 and histogram.summary()["max"] == 3.0
+    assert Histogram().quantile(0.5) == 0.0
+
+
+def test_snapshot():
+    metrics = Metrics()
+    metrics.inc("cache_hits")
+    metrics.inc("cache_hits", 2)
+    metrics.inc("responses", host="a", code=200)
+    metrics.inc("responses", host="a", code=404)
+    with metrics.timer("parse_seconds", stage="decode"):
+        pass
+    snapshot = metrics.snapshot()
+    assert snapshot["cache_hits"] == 3
+    assert snapshot["responses"] == {"code=200,host=a": 1, "code=404,host=a": 1}
+    assert snapshot["parse_seconds"]["stage=decode"]["count"] == 1
+
+
+def test_openmetrics(tmp_path):
+    metrics = Metrics("Scoresway")
+    metrics.inc("requests", host='a"b')
+    metrics.observe("request_seconds", 0.02, host="a")
+    text = metrics.openmetrics()
+    assert '# TYPE soccerscraper_requests counter' in text
+    assert 'soccerscraper_requests_total{source="Scoresway",host="a\\"b"} 1' in text
+    assert 'soccerscraper_request_seconds_bucket{source="Scoresway",host="a",le="0.025"} 1' in text
+    assert 'soccerscraper_request_seconds_count{source="Scoresway",host="a"} 1' in text
+    assert text.endswith("# EOF\n")
+    metrics.write(tmp_path / "metrics.txt")
+    assert (tmp_path / "metrics.txt").read_text(encoding="utf8") == text
+
+
+def test_serve():
+    metrics = Metrics()
+    metrics.inc("retries")
+    server = metrics.serve(port=0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert "soccerscraper_retries_total 1" in response.read().decode()
+    finally:
+        metrics.stop()
+
+
+def test_reader_stats(replay_reader):
+    sw = replay_reader(Scoresway)
+    sw.read_matches()
+    stats = sw.stats()
+    served = sw.transport.stats()["served"]
+    assert sum(stats["requests"].values()) == served
+    assert sum(stats["responses"].values()) == served
+    assert stats["cache_misses"] == served
+    assert stats["sessions"][0]["requests"] == served
+    assert set(stats["circuits"]) == set(stats["rates"]) == set(host.partition("=")[2] for host in stats["requests"])
+    sw.read_matches()
+    assert sw.stats()["cache_hits"] == served
@@ -0,0 +1,97 @@
+import pytest
+
+import _pool
+from _pool import SessionPool, is_healthy, redact
+
+
+class Session:
+    def __init__(self, proxies):
+        self.proxies = proxies
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the pool by a list holding the current time."""
+    now = [1000.0]
+    monkeypatch.setattr(_pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _pool_of(n: int, **kwargs) -> SessionPool:
+    return SessionPool(Session, [lambda i=i: {"https": f"http://user:pw@proxy{i}:8080"} for i in range(n)], **kwargs)
+
+
+def _request(pool: SessionPool, member, status_code):
+    """Send a request with `member` and return the sessions to close."""
+    member.in_flight += 1
+    return pool.release(member, status_code, 0.1)
+
+
+def test_is_healthy():
+    assert is_healthy(200) and is_healthy(404)
+    assert not any(is_healthy(status) for status in (None, 403, 407, 429, 500, 503))
+
+
+def test_redact():
+    assert redact({"http": "http://user:pw@proxy:8080", "https": "http://user:pw@proxy:8080"}) == "http://proxy:8080"
+
+
+def test_session_is_built_once_with_the_proxy_of_the_member():
+    pool = _pool_of(1)
+    member = pool.pick()
+    session = pool.session(member)
+    assert session is pool.session(member)
+    assert session.proxies == {"https": "http://user:pw@proxy0:8080"}
+
+
+def test_requests_are_routed_away_from_failing_and_busy_members():
+    pool = _pool_of(2)
+    first = pool.acquire()
+    # The idle member scores higher than the one with a request in flight
+    assert pool.acquire() is not first
+    pool.release(first, 200, 0.1)
+    second = pool.members[1 - first.index]
+    pool.release(second, 500, 0.1)
+    assert pool.pick() is first
+
+
+def test_failing_member_is_quarantined_with_doubling_duration(clock):
+    pool = _pool_of(2, max_failures=2, quarantine=10)
+    member = pool.members[0]
+    for _ in range(2):
+        _request(pool, member, 429)
+    assert member.quarantined_until == clock[0] + 10
+    assert pool.pick() is pool.members[1]
+    # All members quarantined: the one released first is used
+    for _ in range(2):
+        _request(pool, pool.members[1], None)
+    assert pool.pick() is member
+    clock[0] += 10
+    for _ in range(2):
+        _request(pool, member, 503)
+    assert member.quarantined_until == clock[0] + 20
+
+
+def test_dropped_session_is_closed_after_the_last_request_in_flight():
+    pool = _pool_of(1, max_failures=1)
+    member = pool.members[0]
+    old = pool.session(member)
+    assert pool.acquire() is member and pool.acquire() is member
+    assert pool.release(member, 403, 0.1) == []
+    # Quarantined a second time: the session is replaced, but the other request is still using it
+    assert _request(pool, member, 403) == []
+    assert pool.session(member) is not old
+    assert pool.release(member, 200, 0.1) == [old]
+    assert member.retired == []
+
+
+def test_clear_returns_all_sessions():
+    pool = _pool_of(1, max_failures=1)
+    member = pool.members[0]
+    old = pool.session(member)
+    member.in_flight += 1
+    _request(pool, member, 403)
+    _request(pool, member, 403)
+    new = pool.session(member)
+    assert set(map(id, pool.clear())) == {id(old), id(new)}
+    assert member.session is None and member.retired == []
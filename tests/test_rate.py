@@ -0,0 +1,71 @@
+import pytest
+
+import _rate
+from _rate import RateController, RateControllers, is_throttled
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the rate controllers by a list holding the current time."""
+    now = [1000.0]
+    monkeypatch.setattr(_rate.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_is_throttled():
+    assert all(is_throttled(status) for status in (403, 429, 503))
+    assert not any(is_throttled(status) for status in (None, 200, 404, 500))
+    assert is_throttled(200, {"cf-mitigated": "Challenge"})
+
+
+def test_requests_are_spaced_at_the_rate(clock):
+    controller = RateController(rate=4)
+    assert [controller.reserve() for _ in range(3)] == [0, 0.25, 0.5]
+    clock[0] += 1
+    assert controller.reserve() == 0
+
+
+def test_additive_increase_up_to_max_rate(clock):
+    controller = RateController(rate=1, max_rate=1.25, increase=0.1)
+    controller.record(200)
+    controller.record(404)
+    assert controller.rate == pytest.approx(1.2)
+    # Server errors and missing responses leave the rate unchanged
+    controller.record(500)
+    controller.record(None)
+    assert controller.rate == pytest.approx(1.2)
+    controller.record(200)
+    assert controller.rate == 1.25
+
+
+def test_multiplicative_decrease_once_per_interval(clock):
+    controller = RateController(rate=2, min_rate=0.4, decrease=0.5)
+    controller.record(429)
+    assert controller.rate == 1
+    # The responses to requests already in flight do not cut the rate again
+    clock[0] += 0.5
+    controller.record(429)
+    assert controller.rate == 1 and controller.cuts == 1
+    # A cut holds the requests for one interval at the new rate
+    assert controller.reserve() == 0.5
+    clock[0] += 1
+    controller.record(503)
+    clock[0] += 2
+    controller.record(403, {})
+    assert controller.rate == 0.4 and controller.cuts == 3
+
+
+def test_pause(clock):
+    controller = RateController(rate=10)
+    controller.pause(30)
+    assert controller.reserve() == 30
+    # A shorter pause does not shorten the pending one
+    controller.pause(5)
+    assert controller.reserve() == pytest.approx(30.1)
+
+
+def test_controllers_by_host():
+    controllers = RateControllers(rate=3)
+    assert controllers["a"] is controllers["a"]
+    assert controllers["a"] is not controllers["b"]
+    assert controllers.stats() == {"a": {"rate": 3, "cuts": 0}, "b": {"rate": 3, "cuts": 0}}
@@ -0,0 +1,268 @@
+import os
+import sys
+import socket
+import asyncio
+import subprocess
+
+import pytest
+import numpy as np
+import pandas as pd
+import requests
+
+from conftest import N_MATCHES, N_EVENTS
+
+import _codec as codec
+from _cache import ParsedCache
+from _journal import CrawlJournal
+from _table import MaterializedTable
+from _classes import make_game_id, make_game_ids
+from fotmob import FotMob, AsyncFotMob
+from scoresway import Scoresway, AsyncScoresway, _flatten_officials, _flatten_periods, _split_contestants
+
+
+def test_read_events(replay_reader):
+    sw = replay_reader(Scoresway)
+    events = sw.read_events()
+    assert len(events) == N_MATCHES * N_EVENTS
+    assert events["matchId"].nunique() == N_MATCHES
+
+
+def test_read_events_compact(replay_reader):
+    sw = replay_reader(Scoresway)
+    matches = sw.read_matches(dtypes="compact")
+    events = sw.read_events(dataframe=matches, dtypes="compact")
+    assert events["matchId"].nunique() == N_MATCHES
+
+
+@pytest.mark.skipif(not MaterializedTable.available(), reason="pyarrow is not installed")
+def test_read_events_materialized(replay_reader):
+    sw = replay_reader(Scoresway)
+    matches = sw.read_matches()
+    events = sw.read_events(dataframe=matches)
+    # The Parquet copy returns the same events, with lists in the list columns
+    pd.testing.assert_frame_equal(sw.read_events(materialize=True), events)
+    pd.testing.assert_frame_equal(sw.read_events(materialize=True), events)
+    # Events of deleted files are removed from the copy (read_events would download them again)
+    (sw.data_dir / "events" / sorted(os.listdir(sw.data_dir / "events"))[-1]).unlink()
+    sw.manifest.rebuild()
+    assert sw._read_event_files(matches, False, True, 1, "object")["matchId"].nunique() == N_MATCHES - 1
+    assert len(sw.event_table.state) == N_MATCHES - 1
+
+
+def test_iter_events(replay_reader):
+    sw = replay_reader(Scoresway)
+    batches = sw.iter_events(batch_size=4)
+    first = next(batches)
+    # Competitions page, season selector and match feed, then only the event feeds of the first batch
+    assert sw.transport.stats()["served"] == 3 + 4
+    assert [batch["matchId"].nunique() for batch in [first, *batches]] == [4, N_MATCHES - 4]
+    assert sw.transport.stats()["served"] == 3 + N_MATCHES
+    # Cached and missing event files are batched together
+    (sw.data_dir / "events" / sorted(os.listdir(sw.data_dir / "events"))[-1]).unlink()
+    sw.manifest.rebuild()
+    assert [batch["matchId"].nunique() for batch in sw.iter_events(batch_size=4)] == [4, N_MATCHES - 4]
+    assert sw.transport.stats()["served"] == 3 + N_MATCHES + 1
+
+
+def test_async_iter_events(replay_reader):
+    sw = replay_reader(AsyncScoresway)
+
+    async def first_batch():
+        async with sw:
+            async for batch in sw.iter_events(batch_size=4):
+                return batch
+
+    assert asyncio.run(first_batch())["matchId"].nunique() == 4
+    assert sw.transport.stats()["served"] == 3 + 4
+
+
+def test_read_events_no_cache_downloads_once(replay_reader):
+    sw = replay_reader(Scoresway, no_cache=True)
+    events = sw.read_events()
+    assert events["matchId"].nunique() == N_MATCHES
+    # Competitions page, season selector and match feed, then one event feed per match
+    assert sw.transport.stats()["served"] == 3 + N_MATCHES
+
+
+def test_read_games_no_store_downloads_once(replay_reader):
+    fm = replay_reader(FotMob, no_store=True)
+    games = fm.read_games()
+    assert len(games) == N_MATCHES
+    assert all(game["general"]["matchId"] == match_id for match_id, game in zip(games.ids, games))
+    # Cookie server, leagues, league and season, then one matchDetails per match
+    assert fm.transport.stats()["served"] == 4 + N_MATCHES
+
+
+def test_read_games(replay_reader):
+    fm = replay_reader(FotMob)
+    games = fm.read_games()
+    assert len(games) == N_MATCHES
+    assert [str(game["general"]["matchId"]) for game in games[:2]] == games.ids[:2]
+    served = fm.transport.stats()["served"]
+    # Finished matches are served from the cache
+    assert len(fm.read_games()) == N_MATCHES
+    assert fm.transport.stats()["served"] == served
+
+
+def test_iter_games(replay_reader):
+    fm = replay_reader(FotMob)
+    batches = fm.iter_games(batch_size=4)
+    first = next(batches)
+    assert fm.transport.stats()["served"] == 4 + 4
+    assert [len(batch) for batch in [first, *batches]] == [4, N_MATCHES - 4]
+    assert fm.transport.stats()["served"] == 4 + N_MATCHES
+
+
+def test_iter_games_no_store(replay_reader):
+    fm = replay_reader(FotMob, no_store=True)
+    assert [len(batch) for batch in fm.iter_games(batch_size=4)] == [4, N_MATCHES - 4]
+
+
+def test_async_iter_games(replay_reader):
+    fm = replay_reader(AsyncFotMob)
+
+    async def read():
+        async with fm:
+            first = None
+            async for batch in fm.iter_games(batch_size=4):
+                if first is None:
+                    first = fm.transport.stats()["served"]
+            return first
+
+    assert asyncio.run(read()) == 4 + 4
+    assert fm.transport.stats()["served"] == 4 + N_MATCHES
+
+
+
+def test_async_read_games_fetches_cookies_without_blocking(replay_reader, monkeypatch):
+    def blocking_get(*args, **kwargs):
+        raise AssertionError("blocking request on the event loop")
+
+    monkeypatch.setattr(requests.Session, "get", blocking_get)
+    fm = replay_reader(AsyncFotMob)
+
+    async def read():
+        async with fm:
+            games = await fm.read_games()
+            return games, fm.session.headers.get("x-mas")
+
+    games, cookie = asyncio.run(read())
+    assert len(games) == N_MATCHES
+    assert cookie == "fixture"
+    assert fm.transport.stats()["served"] == 4 + N_MATCHES
+
+
+def test_cookie_sessions_are_closed(replay_reader, monkeypatch):
+    closed = []
+    close = requests.Session.close
+    monkeypatch.setattr(requests.Session, "close", lambda session: closed.append(session) or close(session))
+    fm = replay_reader(FotMob)
+    fm.read_leagues()
+    assert len(closed) == 1 and closed[0] is not fm.session
+
+
+def test_async_cookie_client_leaves_the_transport_open(replay_reader, monkeypatch):
+    import httpx
+
+    clients = []
+    init = httpx.AsyncClient.__init__
+
+    def record_init(client, **kwargs):
+        clients.append(client)
+        init(client, **kwargs)
+
+    monkeypatch.setattr(httpx.AsyncClient, "__init__", record_init)
+    fm = replay_reader(AsyncFotMob)
+    transport_closed = []
+    fm.transport.aclose = lambda: transport_closed.append(True) or asyncio.sleep(0)
+
+    async def read():
+        async with fm:
+            await fm.read_leagues()
+            # The cookie client is closed, the transport still serves the client of the reader
+            assert [client.is_closed for client in clients] == [True, False]
+            assert not transport_closed
+            await fm.read_seasons()
+
+    asyncio.run(read())
+    assert all(client.is_closed for client in clients) and transport_closed
+
+
+def _crash_worker(journal, pid, item):
+    """Claim `item` of the games crawl in a worker of process `pid` that never reports back."""
+    other = CrawlJournal(journal.root)
+    other.worker = f"{socket.gethostname()}:{pid}:crashed"
+    plan = other.plan("games", {item: {"url": "https://example.invalid"}})
+    assert other.claim("games", plan, limit=1)
+
+
+def test_read_games_reports_games_in_flight(replay_reader):
+    fm = replay_reader(FotMob)
+    match_id = str(fm.read_schedule()["matchId"].iloc[0])
+    # The worker still runs, so its lease holds
+    _crash_worker(fm.journal, os.getpid(), match_id)
+    games = fm.read_games()
+    assert len(games) == N_MATCHES - 1
+    assert match_id not in [str(i) for i in games.ids]
+
+
+def test_read_games_reclaims_games_of_dead_process(replay_reader):
+    fm = replay_reader(FotMob)
+    match_id = str(fm.read_schedule()["matchId"].iloc[0])
+    process = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    _crash_worker(fm.journal, int(process.stdout), match_id)
+    games = fm.read_games()
+    assert len(games) == N_MATCHES
+
+
+def test_get_many_keeps_request_order(replay_reader):
+    fm = replay_reader(FotMob)
+    requests = list(fm._games_requests(fm.read_schedule()).values())[::-1]
+    payloads = fm.get_many_json(requests)
+    assert [str(payload["general"]["matchId"]) for payload in payloads] == [
+        request["url"].rpartition("=")[2] for request in requests
+    ]
+    readers = fm.get_many(requests[:2])
+    assert [codec.load(reader) for reader in readers] == payloads[:2]
+
+
+def test_get_json_is_served_from_memory(replay_reader):
+    fm = replay_reader(FotMob)
+    fm.memory_cache = ParsedCache(10 ** 6)
+    request = fm._leagues_request()
+    data = fm.get_json(**request)
+    assert fm.get_json(**request) is data
+    assert fm.metrics.snapshot()["memory_hits"] == 1
+
+
+def test_make_game_ids():
+    df = pd.DataFrame({
+        "matchDate": pd.to_datetime(["2024-05-01 18:00", None]),
+        "homeTeam": ["AGF", "FCK"],
+        "awayTeam": ["Brøndby", "OB"],
+    })
+    assert make_game_ids(df).tolist() == [make_game_id(row) for _, row in df.iterrows()]
+    assert make_game_ids(df).tolist() == ["2024-05-01 AGF-Brøndby", "FCK-OB"]
+
+
+def test_flatten_match_details():
+    home, away = _split_contestants(pd.Series([[{"id": "h"}, {"id": "a"}], [{"id": "h"}], np.nan]))
+    assert home == [{"id": "h"}, {"id": "h"}, {}]
+    assert away == [{"id": "a"}, {}, {}]
+    officials = [{"id": "1", "type": "Main", "lastName": "Taylor"}, {"id": "2", "type": "Some Official"}]
+    assert _flatten_officials(officials) == {"refMainId": "1", "refMainLastName": "Taylor", "SomeOfficialId": "2"}
+    assert _flatten_periods([{"start": "a", "lengthMin": 47}, {"end": "b"}]) == {
+        "matchPeriod1StartTime": "a", "matchPeriod1LengthMin": 47, "matchPeriod2EndTime": "b",
+    }
+    assert _flatten_officials(np.nan) == _flatten_periods(None) == {}
+
+
+def test_read_matches(replay_reader):
+    sw = replay_reader(Scoresway)
+    matches = sw.read_matches()
+    assert len(matches) == N_MATCHES
+    assert (matches.index.get_level_values(2) == matches["matchDate"] + " " + matches["match"]).all()
+    assert matches["match"].str.fullmatch(r"\w+ vs \w+").all()
+    assert (matches["homeTeam"] + " vs " + matches["awayTeam"] == matches["match"]).all()
+    assert matches["refMainLastName"].notna().all()
+    assert matches["matchPeriod2LengthMin"].eq(47).all()
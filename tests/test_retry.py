@@ -0,0 +1,145 @@
+import asyncio
+import random
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import _retry
+from _retry import CircuitBreaker, CircuitOpenError, RetryPolicy, parse_retry_after
+from _replay import ReplayAdapter
+from fixtures import SOURCES, fixture_leagues
+from scoresway import Scoresway, AsyncScoresway
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the monotonic clock of the circuit breakers by a list holding the current time."""
+    now = [1000.0]
+    monkeypatch.setattr(_retry.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_delay_is_jittered_below_the_exponential_bound():
+    random.seed(0)
+    policy = RetryPolicy(backoff=1.0, max_delay=60.0)
+    for attempt in range(8):
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert min(delays) >= 0
+        assert max(delays) <= min(60.0, 2 ** attempt)
+    # Full jitter: the delays spread over the whole range instead of clustering at the bound
+    delays = [policy.delay(3) for _ in range(200)]
+    assert min(delays) < 2 < 6 < max(delays)
+
+
+def test_delay_honours_retry_after_up_to_max_delay():
+    policy = RetryPolicy(backoff=0.001, max_delay=10.0)
+    assert policy.delay(0, retry_after=5.0) == 5.0
+    assert policy.delay(0, retry_after=120.0) == 10.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=90)
+    assert 80 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 90
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_breaker_needs_min_requests_in_window(clock):
+    breaker = CircuitBreaker(window=60, min_requests=4, failure_ratio=0.5)
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == "closed"
+    # The failures left the window before the fourth request
+    clock[0] += 61
+    breaker.record(False)
+    assert breaker.state == "closed"
+    for _ in range(3):
+        breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == "closed"
+    # 3 failures out of 6 requests
+    breaker.record(False)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("example.com")
+
+
+def test_breaker_probes_once_when_half_open(clock):
+    breaker = CircuitBreaker(min_requests=1, cooldown=30, max_cooldown=100)
+    breaker.record(False)
+    clock[0] += 30
+    breaker.before_request()
+    assert breaker.state == "half-open"
+    # Only the probe goes through until it has an outcome
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record(False)
+    assert breaker.state == "open"
+    # The cooldown doubles when the probe fails, and is capped by max_cooldown
+    assert breaker.opened_until == clock[0] + 60
+    clock[0] += 60
+    breaker.before_request()
+    breaker.record(False)
+    assert breaker.opened_until == clock[0] + 100
+    clock[0] += 100
+    breaker.before_request()
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.trips == 0
+    breaker.before_request()
+
+
+def test_breaker_trip(clock):
+    breaker = CircuitBreaker()
+    breaker.trip(120)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    # A shorter trip does not shorten the pause
+    breaker.trip(10)
+    clock[0] += 119
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    clock[0] += 1
+    breaker.before_request()
+    breaker.record(True)
+    assert breaker.state == "closed"
+
+
+class SlowFirstResponse(ReplayAdapter):
+    """Replay transport whose first response takes a second."""
+
+    def _delay(self) -> float:
+        self.counts["delays"] += 1
+        return 1.0 if self.counts["delays"] == 1 else 0.0
+
+
+def _slow_reader(reader_class, fixture_dir, tmp_path):
+    transport = SlowFirstResponse(fixture_dir / "responses" / SOURCES["Scoresway"])
+    reader = reader_class(leagues=fixture_leagues(1), transport=transport, data_dir=tmp_path / "Scoresway")
+    reader.timeout = (0.05, 0.05)
+    reader.retry = RetryPolicy(backoff=0.01)
+    return reader
+
+
+def test_timeout_is_retried(fixture_dir, tmp_path):
+    sw = _slow_reader(Scoresway, fixture_dir, tmp_path)
+    assert len(sw.read_leagues()) == 1
+    assert sw.transport.stats()["timeouts"] == 1
+    assert sum(sw.metrics.snapshot()["retries"].values()) == 1
+
+
+def test_async_timeout_is_retried(fixture_dir, tmp_path):
+    sw = _slow_reader(AsyncScoresway, fixture_dir, tmp_path)
+
+    async def read():
+        async with sw:
+            return await sw.read_leagues()
+
+    assert len(asyncio.run(read())) == 1
+    assert sw.transport.stats()["timeouts"] == 1
+    assert sum(sw.metrics.snapshot()["retries"].values()) == 1
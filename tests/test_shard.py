@@ -0,0 +1,38 @@
+import pytest
+
+from conftest import N_MATCHES
+
+from _shard import parse_shard, shard_of, in_shard
+from scoresway import Scoresway
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (1, 4)
+    assert parse_shard((0, 2)) == (0, 2)
+    # A single shard holds everything
+    assert parse_shard("0/1") is None
+    assert parse_shard("") is None
+    with pytest.raises(ValueError):
+        parse_shard("4/4")
+    with pytest.raises(ValueError):
+        parse_shard("a/b")
+
+
+def test_shards_partition_keys():
+    keys = [str(i) for i in range(1000)]
+    members = [in_shard(keys, (index, 4)) for index in range(4)]
+    assert all(sum(flags) == 1 for flags in zip(*members))
+    assert all(200 < sum(flags) < 300 for flags in members)
+    # Stable across processes, machines and Python versions
+    assert [shard_of(key, 4) for key in ("4311593", "ENG-Premier League/2324")] == [2, 3]
+
+
+def test_sharded_read_events(replay_reader):
+    match_ids = []
+    for index in range(2):
+        sw = replay_reader(Scoresway, shard=(index, 2))
+        match_ids.append(set(sw.read_events()["matchId"]))
+        assert sw.shard == (index, 2)
+    assert not match_ids[0] & match_ids[1]
+    assert len(match_ids[0] | match_ids[1]) == N_MATCHES
+
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from _store import MatchStore
+
+
+def _store():
+    catalog = pd.DataFrame(
+        {
+            "league": ["ENG-Premier League", "ENG-Premier League", "ESP-La Liga"],
+            "season": ["2324", "2324", "2324"],
+            "matchDate": ["2023-08-11", "2023-08-12", "2023-08-12"],
+        },
+        index=pd.Index(["1", "2", "3"], name="matchId"),
+    )
+    return MatchStore(catalog, lambda match_id: {"matchId": match_id})
+
+
+def test_access():
+    store = _store()
+    assert len(store) == 3
+    assert store[0] == store["1"] == store.get(1) == {"matchId": "1"}
+    assert store[-2:].ids == ["2", "3"]
+    assert 3 in store and "4" not in store
+    assert store.get("4") is None
+    # Sequence methods are not shadowed by the catalog
+    assert store.index({"matchId": "2"}) == 1
+    assert store.count({"matchId": "3"}) == 1
+
+
+def test_select_shares_cache():
+    store = _store()
+    assert store.select(league="ESP-La Liga").ids == ["3"]
+    assert store.select(start="2023-08-12").ids == ["2", "3"]
+    list(store)
+    list(store.select(season="2324"))
+    assert store.cache_info()["hits"] == 3
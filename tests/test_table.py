@@ -0,0 +1,44 @@
+import pytest
+import pandas as pd
+
+from _table import MaterializedTable, SOURCE_COLUMN
+
+pytestmark = pytest.mark.skipif(not MaterializedTable.available(), reason="pyarrow is not installed")
+
+
+def _events(file, *ids):
+    return pd.DataFrame({
+        "id": list(ids),
+        "qualifier": [[{"qualifierId": i, "value": str(i)}] for i in ids],
+        SOURCE_COLUMN: file,
+    })
+
+
+def test_read_restores_lists(tmp_path):
+    table = MaterializedTable(tmp_path)
+    table.update(_events("ENG_1.json", 1, 2), {"ENG_1.json": (1.0, 10)}, {"ENG_1.json": ("ENG", "2324")})
+    events = table.read()
+    assert events["qualifier"].tolist() == [[{"qualifierId": 1, "value": "1"}], [{"qualifierId": 2, "value": "2"}]]
+    assert isinstance(events["qualifier"].iloc[0], list)
+
+
+def test_update_replaces_changed_files(tmp_path):
+    table = MaterializedTable(tmp_path)
+    partitions = {"ENG_1.json": ("ENG", "2324"), "ENG_2.json": ("ENG", "2324")}
+    table.update(pd.concat([_events("ENG_1.json", 1), _events("ENG_2.json", 2)]),
+                 {"ENG_1.json": (1.0, 10), "ENG_2.json": (1.0, 10)}, partitions)
+    assert table.pending({"ENG_1.json": (1.0, 10), "ENG_2.json": (2.0, 12)}) == ["ENG_2.json"]
+    table.update(_events("ENG_2.json", 3), {"ENG_2.json": (2.0, 12)}, partitions)
+    assert table.read()["id"].tolist() == [1, 3]
+
+
+def test_remove(tmp_path):
+    table = MaterializedTable(tmp_path)
+    stamps = {"ENG_1.json": (1.0, 10), "ENG_2.json": (1.0, 10), "GER_3.json": (1.0, 10)}
+    partitions = {"ENG_1.json": ("ENG", "2324"), "ENG_2.json": ("ENG", "2324"), "GER_3.json": ("GER", "2324")}
+    table.update(pd.concat([_events(file, i) for i, file in enumerate(stamps)]), stamps, partitions)
+    table.remove(["ENG_2.json", "GER_3.json", "ENG_9.json"])
+    assert table.read()["id"].tolist() == [0]
+    assert table.read(["GER"]) is None
+    # The removed files are materialized again on the next update
+    assert MaterializedTable(tmp_path).pending(stamps) == ["ENG_2.json", "GER_3.json"]